@@ -1,70 +1,425 @@
-from typing import List, Dict, Any
+import asyncio
+import time
+from typing import List, Dict, Any, FrozenSet, Iterable, Iterator, Optional, Tuple
 from avantis_trader_sdk import TraderClient
-from src.config.constants import logger
+from eth_abi import decode as abi_decode
+from src.config.constants import BASE_RPC_URL, logger
+from utils.retry import UNKNOWN, CircuitOpenError, classify_error, retry_async
+from src.status import get_status_board
+from src.avantis.ledger import TRANSFER_TOPIC, decode_close_events, get_ledger
 
+# Multicall3 - mesmo endereço em todas as chains EVM (inclui Base)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [{"components": [
+            {"name": "target", "type": "address"},
+            {"name": "allowFailure", "type": "bool"},
+            {"name": "callData", "type": "bytes"}
+        ], "name": "calls", "type": "tuple[]"}],
+        "name": "aggregate3",
+        "outputs": [{"components": [
+            {"name": "success", "type": "bool"},
+            {"name": "returnData", "type": "bytes"}
+        ], "name": "returnData", "type": "tuple[]"}],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [{"name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+MULTICALL_BATCH_SIZE = 400  # Chamadas por eth_call (limite de gas do node)
+USDC_DECIMALS = 6
 
-async def get_open_positions(trader_client: TraderClient) -> List[Dict[str, Any]]:
+
+class OpenTradesABIError(ValueError):
+    """ABI de openTrades sem os campos que as checagens de direção/slot vazio usam."""
+
+
+class Position:
+    """Posição aberta (registro compacto). Aceita acesso estilo dict: pos["is_long"]."""
+    __slots__ = (
+        "pair_index", "trade_index", "collateral", "is_long", "leverage",
+        "open_price", "tp", "sl", "liquidation_price", "margin_fee"
+    )
+
+    def __init__(self, pair_index, trade_index, collateral, is_long, leverage,
+                 open_price, tp, sl, liquidation_price, margin_fee) -> None:
+        self.pair_index = pair_index
+        self.trade_index = trade_index
+        self.collateral = collateral
+        self.is_long = is_long
+        self.leverage = leverage
+        self.open_price = open_price
+        self.tp = tp
+        self.sl = sl
+        self.liquidation_price = liquidation_price
+        self.margin_fee = margin_fee
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    @property
+    def key(self) -> Tuple[int, int, bool]:
+        """Identidade da posição na chain: (pair_index, trade_index, is_long)."""
+        return (self.pair_index, self.trade_index, self.is_long)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        side = "LONG" if self.is_long else "SHORT"
+        return f"Position({side} pair={self.pair_index} index={self.trade_index} collateral={self.collateral})"
+
+
+class PositionSnapshot:
+    """
+    Conjunto de posições abertas em um instante.
+    Contagens long/short, colateral total e índice por par são calculados uma vez,
+    na construção - consumidores não precisam varrer a lista de novo.
+    """
+    __slots__ = ("positions", "long_count", "short_count", "total_collateral", "by_pair", "keys", "taken_at")
+
+    def __init__(self, positions: Optional[List[Position]] = None) -> None:
+        self.positions = positions or []
+        self.long_count = 0
+        self.short_count = 0
+        self.total_collateral = 0.0
+        self.by_pair: Dict[int, List[Position]] = {}
+        for pos in self.positions:
+            if pos.is_long:
+                self.long_count += 1
+            else:
+                self.short_count += 1
+            self.total_collateral += pos.collateral
+            self.by_pair.setdefault(pos.pair_index, []).append(pos)
+        self.keys: FrozenSet[Tuple[int, int, bool]] = frozenset(pos.key for pos in self.positions)
+        self.taken_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[Position]:
+        return iter(self.positions)
+
+    def __getitem__(self, i: int) -> Position:
+        return self.positions[i]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PositionSnapshot):
+            return NotImplemented
+        return self.keys == other.keys
+
+    __hash__ = None
+
+    @property
+    def is_delta_neutral(self) -> bool:
+        """Exatamente 1 LONG + 1 SHORT."""
+        return self.long_count == 1 and self.short_count == 1
+
+    def pair_counts(self, pair_index: int) -> Tuple[int, int]:
+        """(long, short) abertos no par."""
+        pair_positions = self.by_pair.get(pair_index, [])
+        longs = sum(1 for p in pair_positions if p.is_long)
+        return longs, len(pair_positions) - longs
+
+    def diff(self, previous: Optional["PositionSnapshot"]) -> Tuple[List[Position], List[Position]]:
+        """
+        Compara com o snapshot anterior.
+
+        Returns:
+            (posições novas, posições que sumiram)
+        """
+        if previous is None:
+            return list(self.positions), []
+        if self.keys == previous.keys:
+            return [], []
+        opened = [p for p in self.positions if p.key not in previous.keys]
+        closed = [p for p in previous.positions if p.key not in self.keys]
+        return opened, closed
+
+
+async def get_open_positions(trader_client: TraderClient, trader: Optional[str] = None) -> PositionSnapshot:
     """
     Obtém todas as posições abertas da conta.
     
     Args:
         trader_client: Cliente Avantis
+        trader: Conta a ler (default: a do signer do cliente)
         
     Returns:
-        Lista de posições abertas
+        Snapshot das posições abertas (iterável como lista)
+    
+    Raises:
+        CircuitOpenError ou o erro do RPC (rate limit, timeout, rede, revert):
+        RPC fora do ar não é "sem posições" - quem chama pula o tick
     """
-    trader = trader_client.get_signer().get_ethereum_address()
+    trader = trader or trader_client.get_signer().get_ethereum_address()
     
     try:
-        # Tentar obter trades - se falhar, retornar lista vazia (sem erro visual)
-        try:
-            trades, pending_orders = await trader_client.trade.get_trades(trader)
-        except Exception as parse_error:
-            # Erro de parsing é comum quando não há posições
-            logger.debug(f"Nenhuma posição encontrada (parsing error ignorado)")
-            return []
-        
-        positions = []
-        for trade in trades:
-            try:
-                positions.append({
-                    "pair_index": trade.trade.pair_index,
-                    "trade_index": trade.trade.trade_index,
-                    "collateral": trade.trade.open_collateral,
-                    "is_long": trade.trade.is_long,
-                    "leverage": trade.trade.leverage,
-                    "open_price": trade.trade.open_price,
-                    "tp": trade.trade.tp,
-                    "sl": trade.trade.sl,
-                    "liquidation_price": trade.liquidation_price,
-                    "margin_fee": trade.margin_fee
-                })
-            except AttributeError as ae:
-                logger.debug(f"Ignorando trade com estrutura inválida: {ae}")
-                continue
-        
-        return positions
-        
+        trades, pending_orders = await retry_async(
+            trader_client.trade.get_trades, trader, endpoint=BASE_RPC_URL, name="get_trades"
+        )
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        logger.warning(f"Erro ao buscar posições (retornando vazio): {e}")
-        return []
+        if classify_error(e) != UNKNOWN:
+            raise
+        # Erro de parsing do SDK é comum quando não há posições
+        logger.debug(f"Nenhuma posição encontrada (parsing error ignorado): {e}")
+        return PositionSnapshot()
+    
+    positions = []
+    for trade in trades:
+        try:
+            positions.append(Position(
+                pair_index=trade.trade.pair_index,
+                trade_index=trade.trade.trade_index,
+                collateral=trade.trade.open_collateral,
+                is_long=trade.trade.is_long,
+                leverage=trade.trade.leverage,
+                open_price=trade.trade.open_price,
+                tp=trade.trade.tp,
+                sl=trade.trade.sl,
+                liquidation_price=trade.liquidation_price,
+                margin_fee=trade.margin_fee
+            ))
+        except AttributeError as ae:
+            logger.debug(f"Ignorando trade com estrutura inválida: {ae}")
+            continue
+    
+    snapshot = PositionSnapshot(positions)
+    get_status_board().publish_positions(trader, snapshot)  # Status server lê daqui, sem RPC
+    return snapshot
 
 
-async def get_usdc_balance(trader_client: TraderClient) -> float:
+async def get_usdc_balance(trader_client: TraderClient, fresh: bool = False) -> float:
     """
     Obtém o saldo USDC da conta.
+    Vem do livro-razão local (sem RPC) enquanto ele estiver reconciliado;
+    a leitura on-chain reancora o razão. Payouts pendentes (Transfer do keeper)
+    e saldo são lidos no mesmo bloco, para nenhum crédito ser contado duas vezes.
     
     Args:
         trader_client: Cliente Avantis
+        fresh: Se True, sempre lê da chain
         
     Returns:
         Saldo em USDC
     """
     trader = trader_client.get_signer().get_ethereum_address()
+    ledger = get_ledger(trader)
+    if not fresh and not ledger.needs_chain():
+        return ledger.balance
     
     try:
-        balance = await trader_client.get_usdc_balance(trader)
+        web3 = trader_client.async_web3
+        usdc = trader_client.contracts.get("USDC")
+        
+        async def head() -> int:
+            return await web3.eth.block_number
+        
+        block = await retry_async(head, endpoint=BASE_RPC_URL, name="block_number")
+        from_block = ledger.scan_from_block()
+        if from_block is not None:
+            logs = await retry_async(web3.eth.get_logs, {
+                "address": usdc.address,
+                "topics": [TRANSFER_TOPIC, None, "0x" + trader[2:].lower().rjust(64, "0")],
+                "fromBlock": from_block,
+                "toBlock": block,
+            }, endpoint=BASE_RPC_URL, name="get_usdc_payouts")
+            # Receipt da tx do keeper: o MarketExecuted diz qual perna recebeu o payout
+            tx_hashes = ledger.payout_txs(logs)
+            receipts = await asyncio.gather(*[
+                retry_async(web3.eth.get_transaction_receipt, tx_hash, endpoint=BASE_RPC_URL, name="get_payout_receipt")
+                for tx_hash in tx_hashes
+            ])
+            ledger.apply_payout_logs(logs, {
+                tx_hash: decode_close_events(receipt) for tx_hash, receipt in zip(tx_hashes, receipts)
+            })
+        
+        units = await retry_async(
+            usdc.functions.balanceOf(trader).call, block_identifier=block,
+            endpoint=BASE_RPC_URL, name="get_usdc_balance"
+        )
+        balance = units / 10 ** USDC_DECIMALS
+        ledger.anchor(balance, block)
+        get_status_board().update(trader, usdc_balance=balance, balances_at=time.time())
         return balance
     except Exception as e:
         logger.error(f"Erro ao buscar saldo: {e}")
         return 0.0
+
+
+class AccountSnapshot:
+    """Estado on-chain de uma conta em um tick (saldo, allowance, gas e trades por par)."""
+    __slots__ = ("address", "usdc_balance", "allowance", "eth_balance", "open_trades", "taken_at")
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.usdc_balance: Optional[float] = None
+        self.allowance: Optional[float] = None
+        self.eth_balance: Optional[float] = None
+        self.open_trades: Dict[int, int] = {}  # pair_index -> quantidade aberta
+        self.taken_at = time.time()
+
+    @property
+    def total_open(self) -> int:
+        return sum(self.open_trades.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+async def multicall(trader_client: TraderClient, calls: List[Tuple[str, bytes]]) -> List[Tuple[bool, bytes]]:
+    """
+    Executa N view calls em lotes de eth_call via Multicall3.aggregate3.
+
+    Args:
+        calls: Lista de (endereço alvo, calldata)
+
+    Returns:
+        Lista de (sucesso, retorno) na mesma ordem
+    """
+    web3 = trader_client.async_web3
+    multicall3 = web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    results: List[Tuple[bool, bytes]] = []
+
+    for start in range(0, len(calls), MULTICALL_BATCH_SIZE):
+        batch = [(target, True, data) for target, data in calls[start:start + MULTICALL_BATCH_SIZE]]
+        results.extend(await retry_async(
+            multicall3.functions.aggregate3(batch).call, endpoint=BASE_RPC_URL, name="multicall"
+        ))
+    return results
+
+
+def _decode_uint(result: Tuple[bool, bytes]) -> Optional[int]:
+    success, data = result
+    if not success or not data:
+        return None
+    return abi_decode(["uint256"], data)[0]
+
+
+async def get_fleet_snapshots(
+    trader_client: TraderClient,
+    addresses: Iterable[str],
+    pair_indices: Iterable[int] = ()
+) -> Dict[str, AccountSnapshot]:
+    """
+    Lê saldo USDC, allowance, saldo ETH e trades abertas por par de N contas
+    em uma única rodada de Multicall3 (em vez de 3+ chamadas por conta).
+
+    Args:
+        trader_client: Qualquer cliente (usado só para leitura)
+        addresses: Endereços das contas
+        pair_indices: Pares cujas trades abertas devem ser contadas
+
+    Returns:
+        {endereço: AccountSnapshot}
+    """
+    addresses = list(addresses)
+    pair_indices = list(pair_indices)
+    usdc = trader_client.contracts.get("USDC")
+    storage = trader_client.contracts.get("TradingStorage")
+    multicall3 = trader_client.async_web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+    calls: List[Tuple[str, bytes]] = []
+    layout: List[Tuple[str, str, Optional[int]]] = []  # (endereço, campo, par)
+
+    for address in addresses:
+        calls.append((usdc.address, usdc.encodeABI(fn_name="balanceOf", args=[address])))
+        layout.append((address, "usdc_balance", None))
+        calls.append((usdc.address, usdc.encodeABI(fn_name="allowance", args=[address, storage.address])))
+        layout.append((address, "allowance", None))
+        calls.append((MULTICALL3_ADDRESS, multicall3.encodeABI(fn_name="getEthBalance", args=[address])))
+        layout.append((address, "eth_balance", None))
+        for pair_index in pair_indices:
+            calls.append((storage.address, storage.encodeABI(fn_name="openTradesCount", args=[address, pair_index])))
+            layout.append((address, "open_trades", pair_index))
+
+    results = await multicall(trader_client, calls)
+
+    snapshots = {address: AccountSnapshot(address) for address in addresses}
+    for (address, field, pair_index), result in zip(layout, results):
+        value = _decode_uint(result)
+        if value is None:
+            logger.debug(f"Multicall: {field} indisponível para {address[:10]}")
+            continue
+        snapshot = snapshots[address]
+        if field == "open_trades":
+            snapshot.open_trades[pair_index] = value
+        elif field == "eth_balance":
+            snapshot.eth_balance = value / 10 ** 18
+        else:
+            setattr(snapshot, field, value / 10 ** USDC_DECIMALS)
+
+    board = get_status_board()
+    for snapshot in snapshots.values():
+        board.publish_snapshot(snapshot)
+        if snapshot.usdc_balance is not None:
+            get_ledger(snapshot.address).observe(snapshot.usdc_balance)  # Reconciliação sem RPC extra
+    return snapshots
+
+
+def _abi_type(output: Dict[str, Any]) -> str:
+    """Tipo canônico de um output do ABI (tuplas expandidas)."""
+    abi_type = output["type"]
+    if abi_type.startswith("tuple"):
+        inner = ",".join(_abi_type(c) for c in output["components"])
+        return f"({inner}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+async def get_fleet_trades(
+    trader_client: TraderClient,
+    legs: Iterable[Tuple[str, int, int]]
+) -> Dict[Tuple[str, int, int], Optional[Dict[str, Any]]]:
+    """
+    Lê TradingStorage.openTrades(trader, pair, index) de várias contas via Multicall3.
+
+    Args:
+        legs: Lista de (endereço, pair_index, trade_index)
+
+    Returns:
+        {(endereço, par, índice): campos da trade por nome, ou None se vazia/falhou}
+
+    Raises:
+        OpenTradesABIError se o ABI do SDK não tiver os campos buy/leverage
+    """
+    legs = list(legs)
+    if not legs:
+        return {}
+    storage = trader_client.contracts.get("TradingStorage")
+    outputs = storage.get_function_by_name("openTrades").abi["outputs"]
+    # Struct retornada como tupla única, ou getter público de mapping (campos achatados)
+    single_struct = len(outputs) == 1 and outputs[0]["type"] == "tuple"
+    fields = outputs[0]["components"] if single_struct else outputs
+    output_types = [_abi_type(output) for output in outputs]
+    names = [field.get("name") for field in fields]
+    if not all(names) or not {"buy", "leverage"} <= set(names):
+        raise OpenTradesABIError(f"ABI de openTrades inesperado (campos: {names}) - checagens de direção/slot vazio dependem de buy/leverage")
+
+    calls = [
+        (storage.address, storage.encodeABI(fn_name="openTrades", args=[address, pair_index, trade_index]))
+        for address, pair_index, trade_index in legs
+    ]
+    results = await multicall(trader_client, calls)
+
+    trades: Dict[Tuple[str, int, int], Optional[Dict[str, Any]]] = {}
+    for leg, (success, data) in zip(legs, results):
+        if not success or not data:
+            trades[leg] = None
+            continue
+        values = abi_decode(output_types, data)
+        trade = dict(zip(names, values[0] if single_struct else values))
+        # Slot vazio: struct zerada (leverage 0)
+        trades[leg] = trade if trade.get("leverage", 1) else None
+    return trades
@@ -1,25 +1,96 @@
+import copy
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
 from avantis_trader_sdk import TraderClient
+from eth_account import Account
 from src.config.constants import BASE_RPC_URL, logger
+from src.avantis.cassette import configure_cassette
+from src.avantis.ratelimit import install_rate_limiter
+from src.config.settings import process_config
+
+
+class TraderClientRegistry:
+    """
+    Registro de TraderClients por endereço.
+
+    Um único cliente base carrega ABIs, contratos e o transporte HTTP; os clientes
+    de cada conta são cópias rasas dele com signer próprio, então criar um cliente
+    por carteira é barato. Clientes ociosos são removidos (LRU + timeout).
+    """
+
+    def __init__(self, provider_url: str = BASE_RPC_URL, max_clients: int = 256, idle_timeout: float = 1800) -> None:
+        self.provider_url = provider_url
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self._base: Optional[TraderClient] = None
+        self._clients: "OrderedDict[str, Tuple[TraderClient, float]]" = OrderedDict()
+
+    def _get_base(self) -> TraderClient:
+        if self._base is None:
+            logger.info("Inicializando TraderClient Avantis...")
+            self._base = TraderClient(self.provider_url)
+            # Gravação/reprodução fica por baixo do limiter (grava o que foi à rede)
+            configure_cassette(self._base.async_web3, process_config())
+            # Transporte compartilhado: um único limiter para toda a frota
+            install_rate_limiter(self._base.async_web3, self.provider_url)
+        return self._base
+
+    def _derive(self, private_key: str) -> TraderClient:
+        """Cópia rasa do cliente base com signer próprio (contratos/ABIs/transporte compartilhados)."""
+        base = self._get_base()
+        client = copy.copy(base)
+        # Submódulos (trade, pairs_cache, ...) guardam referência ao cliente:
+        # são copiados e religados para usarem o signer desta conta
+        for name, value in vars(base).items():
+            if getattr(value, "client", None) is base:
+                bound = copy.copy(value)
+                bound.client = client
+                setattr(client, name, bound)
+        client.set_local_signer(private_key)
+        return client
+
+    def get(self, private_key: str) -> TraderClient:
+        """Retorna o cliente da conta (criando se necessário)."""
+        address = Account.from_key(private_key).address
+        now = time.monotonic()
+        self.evict_idle(now)
+
+        if address in self._clients:
+            client, _ = self._clients.pop(address)
+        else:
+            client = self._derive(private_key)
+            logger.info(f"Cliente conectado: {address}")
+        self._clients[address] = (client, now)
+
+        while len(self._clients) > self.max_clients:
+            evicted, _ = self._clients.popitem(last=False)
+            logger.debug(f"TraderClient de {evicted[:10]} removido (LRU)")
+        return client
+
+    def evict_idle(self, now: Optional[float] = None) -> None:
+        """Remove clientes sem uso há mais de idle_timeout segundos."""
+        now = now or time.monotonic()
+        for address in [a for a, (_, used) in self._clients.items() if now - used > self.idle_timeout]:
+            del self._clients[address]
+            logger.debug(f"TraderClient de {address[:10]} removido (ocioso)")
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+_registry = TraderClientRegistry()
 
-# Cache global do cliente
-_trader_client = None
 
 def get_trader_client(private_key: str) -> TraderClient:
     """
     Inicializa e retorna o TraderClient da Avantis.
-    
+
     Args:
         private_key: Private key da conta Ethereum
-        
+
     Returns:
-        TraderClient configurado
+        TraderClient configurado (um por endereço, com contratos compartilhados)
     """
-    global _trader_client
-    
-    if _trader_client is None:
-        logger.info("Inicializando TraderClient Avantis...")
-        _trader_client = TraderClient(BASE_RPC_URL)
-        _trader_client.set_local_signer(private_key)
-        logger.info(f"Cliente conectado: {_trader_client.get_signer().get_ethereum_address()}")
-    
-    return _trader_client
+    return _registry.get(private_key)
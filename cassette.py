@@ -0,0 +1,199 @@
+"""
+Cassete de JSON-RPC: grava e reproduz o tráfego do provider assíncrono.
+
+Gravação: cada requisição/resposta vira uma linha JSONL (gzip se o arquivo
+terminar em .gz) com o instante relativo ao início e a latência medida.
+Reprodução: CassetteProvider responde ao TraderClient a partir do cassete, na
+velocidade original ou acelerada - ciclos reais rodam offline, sem rede nem carteira.
+
+Config:
+    "rpc_cassette": {"mode": "record" | "replay" | "off", "path": "data/cassettes/run.jsonl.gz", "speed": 1}
+"""
+import asyncio
+import gzip
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from avantis_trader_sdk import TraderClient
+from web3.providers.async_base import AsyncBaseProvider
+from src.config.constants import BASE_RPC_URL, logger
+from src.config.paths import DATA_DIR
+
+CASSETTE_DIR = DATA_DIR / "cassettes"
+FLUSH_EVERY = 50  # Linhas entre flushes durante a gravação
+
+
+def _encode(value: Any) -> Any:
+    """Serializa bytes/HexBytes e objetos do web3 de forma estável."""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if hasattr(value, "items"):
+        return dict(value)
+    return str(value)
+
+
+def _open(path: Path, mode: str):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _request_key(method: str, params: Any) -> Tuple[str, str]:
+    return method, json.dumps(params, default=_encode, sort_keys=True, separators=(",", ":"))
+
+
+class CassetteRecorder:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open(self.path, "a")
+        self._started = time.monotonic()
+        self._pending_lines = 0
+        self.count = 0
+
+    def install(self, async_web3) -> None:
+        """Grava todas as requisições do provider (por baixo do rate limiter)."""
+        provider = async_web3.provider
+        original_make_request = provider.make_request
+
+        async def make_request(method, params):
+            sent = time.monotonic()
+            try:
+                response = await original_make_request(method, params)
+            except Exception as e:
+                self.write(method, params, sent, {"exception": repr(e)})
+                raise
+            self.write(method, params, sent, response)
+            return response
+
+        provider.make_request = make_request
+        logger.info(f"📼 Gravando JSON-RPC em {self.path}")
+
+    def write(self, method: str, params: Any, sent: float, response: Any) -> None:
+        record = {
+            "t": round(sent - self._started, 4),
+            "dt": round(time.monotonic() - sent, 4),
+            "method": method,
+            "params": params,
+            "response": response,
+        }
+        self._file.write(json.dumps(record, default=_encode, separators=(",", ":")) + "\n")
+        self.count += 1
+        self._pending_lines += 1
+        if self._pending_lines >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._pending_lines = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+class CassetteProvider(AsyncBaseProvider):
+    """
+    Provider assíncrono que responde a partir de um cassete. Herda de
+    AsyncBaseProvider: o RequestManager do web3 chama request_func (middlewares)
+    e este delega para make_request.
+
+    Requisições idênticas (método + params) recebem as respostas na ordem gravada;
+    quando os params diferem (nonce, gas, txs assinadas), usa a próxima resposta
+    gravada do mesmo método.
+    """
+
+    def __init__(self, path: Path, speed: float = 1.0) -> None:
+        """
+        Args:
+            path: Cassete JSONL (.jsonl ou .jsonl.gz)
+            speed: 1 = latência original, 10 = 10x mais rápido, 0 = sem espera
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.speed = speed
+        self._exact: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_method: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.misses = 0
+        with _open(self.path, "r") as f:
+            for line in f:
+                record = json.loads(line)
+                self._exact[_request_key(record["method"], record["params"])].append(record)
+                self._by_method[record["method"]].append(record)
+        logger.info(f"📼 Cassete carregado: {sum(len(q) for q in self._by_method.values())} requisições ({self.path})")
+
+    @staticmethod
+    def _pop_unused(queue: Optional[Deque[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        # O mesmo registro está nas duas filas: marca como consumido em vez de remover da outra
+        while queue:
+            record = queue.popleft()
+            if not record.get("_used"):
+                record["_used"] = True
+                return record
+        return None
+
+    def _take(self, method: str, params: Any) -> Optional[Dict[str, Any]]:
+        record = self._pop_unused(self._exact.get(_request_key(method, params)))
+        if record is None:
+            record = self._pop_unused(self._by_method.get(method))
+        return record
+
+    async def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        record = self._take(method, params)
+        if record is None:
+            self.misses += 1
+            logger.warning(f"📼 Cassete sem resposta para {method}")
+            return {"jsonrpc": "2.0", "id": 0, "error": {"code": -32000, "message": f"cassette miss: {method}"}}
+        if self.speed > 0 and record.get("dt"):
+            await asyncio.sleep(record["dt"] / self.speed)
+        if "exception" in record["response"]:
+            raise ConnectionError(record["response"]["exception"])
+        return record["response"]
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+
+_recorder: Optional[CassetteRecorder] = None
+
+
+def configure_cassette(async_web3, config: Dict[str, Any]) -> None:
+    """Liga gravação ou reprodução no provider do cliente base (config: rpc_cassette)."""
+    global _recorder
+    options = config.get("rpc_cassette", {})
+    mode = options.get("mode", "off")
+    if mode == "off":
+        return
+    path = Path(options.get("path") or CASSETTE_DIR / f"rpc_{time.strftime('%Y%m%d_%H%M%S')}.jsonl.gz")
+    if mode == "record":
+        _recorder = CassetteRecorder(path)
+        _recorder.install(async_web3)
+    elif mode == "replay":
+        async_web3.provider = CassetteProvider(path, float(options.get("speed", 1)))
+    else:
+        logger.warning(f"rpc_cassette.mode inválido: {mode}")
+
+
+def replay_trader_client(path: Path, private_key: str, speed: float = 0) -> TraderClient:
+    """
+    TraderClient isolado servido por um cassete (benchmarks/regressão sem rede).
+
+    Args:
+        private_key: Qualquer chave - as respostas vêm do cassete, nada é transmitido
+    """
+    client = TraderClient(BASE_RPC_URL)
+    client.async_web3.provider = CassetteProvider(path, speed)
+    client.set_local_signer(private_key)
+    return client
+
+
+def close_cassette() -> None:
+    """Fecha o arquivo de gravação (chamar no encerramento do bot)."""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        logger.info(f"📼 Cassete fechado: {_recorder.count} requisições em {_recorder.path}")
+        _recorder = None
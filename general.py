@@ -1,17 +1,24 @@
 import time
 from typing import Callable, Any
 from src.config.constants import logger
+from utils.retry import RETRY_POLICIES, backoff_delay, classify_error
 
 
 def _retry_request(func: Callable, *args, retries: int = 3, delay: int = 1, **kwargs) -> Any:
-    """Tenta executar uma função com retries."""
+    """
+    Tenta executar uma função SÍNCRONA com retries.
+    Bloqueia a thread - código assíncrono deve usar utils.retry.retry_async.
+    Erros que não se beneficiam de retry (ex: revert) são propagados na hora.
+    """
     for attempt in range(1, retries + 1):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            if attempt == retries:
-                logger.error(f"Falha após {retries} tentativas: {e}")
+            error_class = classify_error(e)
+            if attempt == retries or RETRY_POLICIES[error_class]["attempts"] <= 1:
+                logger.error(f"Falha após {attempt} tentativa(s) ({error_class}): {e}")
                 raise
-            logger.warning(f"Tentativa {attempt}/{retries} falhou: {e}")
-            time.sleep(delay)
+            wait = max(delay, backoff_delay(error_class, attempt))
+            logger.warning(f"Tentativa {attempt}/{retries} falhou ({error_class}): {e}")
+            time.sleep(wait)
     return None
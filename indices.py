@@ -0,0 +1,67 @@
+"""
+Alocador local de trade indices por conta e por par.
+Mantém um bitmap de slots ocupados, atualizado pelo snapshot de posições e
+pelos nossos próprios receipts - alocar um índice não faz nenhuma chamada RPC.
+"""
+from typing import Dict, List, Tuple
+
+from src.config.constants import logger
+
+MAX_TRADES_PER_PAIR = 40  # Limite de trades abertas por par/conta no contrato
+
+
+class TradeIndexAllocator:
+    def __init__(self, max_slots: int = MAX_TRADES_PER_PAIR) -> None:
+        self.max_slots = max_slots
+        self._mask = (1 << max_slots) - 1
+        self._occupied: Dict[Tuple[str, int], int] = {}
+        self._synced: set = set()
+
+    def sync(self, trader: str, snapshot) -> None:
+        """Reconstrói os bitmaps da conta a partir de um PositionSnapshot."""
+        for key in [k for k in self._occupied if k[0] == trader]:
+            del self._occupied[key]
+        for pair_index, positions in snapshot.by_pair.items():
+            bitmap = 0
+            for pos in positions:
+                bitmap |= 1 << pos.trade_index
+            self._occupied[(trader, pair_index)] = bitmap
+        self._synced.add(trader)
+
+    def is_synced(self, trader: str) -> bool:
+        return trader in self._synced
+
+    def invalidate(self, trader: str) -> None:
+        """Força nova sincronização (ex: após erro de índice na chain)."""
+        self._synced.discard(trader)
+
+    def has_open(self, trader: str) -> bool:
+        """True se a conta tem algum índice ocupado em qualquer par."""
+        return any(bitmap for (owner, _), bitmap in self._occupied.items() if owner == trader)
+
+    def occupied(self, trader: str, pair_index: int) -> List[int]:
+        bitmap = self._occupied.get((trader, pair_index), 0)
+        return [i for i in range(self.max_slots) if bitmap >> i & 1]
+
+    def allocate(self, trader: str, pair_index: int) -> int:
+        """
+        Reserva o menor índice livre do par.
+
+        Raises:
+            ValueError se todos os slots do par estiverem ocupados
+        """
+        key = (trader, pair_index)
+        bitmap = self._occupied.get(key, 0)
+        free = ~bitmap & self._mask
+        if not free:
+            raise ValueError(f"Sem trade index livre no par {pair_index} ({self.max_slots} ocupados)")
+        index = (free & -free).bit_length() - 1  # Bit livre mais baixo
+        self._occupied[key] = bitmap | (1 << index)
+        return index
+
+    def release(self, trader: str, pair_index: int, trade_index: int) -> None:
+        """Libera o índice (perna falhou ou posição fechada)."""
+        key = (trader, pair_index)
+        if key in self._occupied:
+            self._occupied[key] &= ~(1 << trade_index)
+            logger.debug(f"Índice {trade_index} liberado no par {pair_index}")
@@ -0,0 +1,142 @@
+"""
+Journal write-ahead dos ciclos (data/cycle_journal.jsonl).
+Cada etapa do ciclo é gravada ANTES de ser executada, para que um restart
+saiba se há um par delta neutro válido em andamento (e até quando segurá-lo).
+"""
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from src.config.constants import logger
+from src.config.paths import DATA_DIR
+
+JOURNAL_FILE = DATA_DIR / "cycle_journal.jsonl"
+MAX_JOURNAL_BYTES = 1_000_000  # Compacta o arquivo acima de ~1 MB
+
+
+class CycleJournal:
+    def __init__(self, path=JOURNAL_FILE) -> None:
+        self.path = path
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        record["ts"] = time.time()
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            logger.error(f"Erro ao gravar journal: {e}")
+
+    def begin(
+        self,
+        pair_index: int,
+        symbol: str,
+        long_index: int,
+        short_index: int,
+        trader: str,
+        duration_min: float = 0,
+        partner: Optional[str] = None
+    ) -> str:
+        """
+        Registra a intenção de abrir um ciclo. Retorna o cycle_id.
+        No modo pareado `trader` abre o LONG e `partner` (outra carteira) o SHORT.
+        """
+        cycle_id = uuid.uuid4().hex[:12]
+        self._append({
+            "event": "begin",
+            "cycle_id": cycle_id,
+            "trader": trader,
+            "pair_index": pair_index,
+            "symbol": symbol,
+            "long_index": long_index,
+            "short_index": short_index,
+            "duration_min": duration_min,
+            "partner": partner
+        })
+        return cycle_id
+
+    def leg(self, cycle_id: str, side: str, trade_index: int, tx_hash: Optional[str]) -> None:
+        """Registra o resultado de uma perna (tx_hash None = falhou)."""
+        self._append({
+            "event": "leg",
+            "cycle_id": cycle_id,
+            "side": side,
+            "trade_index": trade_index,
+            "tx_hash": tx_hash
+        })
+
+    def opened(self, cycle_id: str, close_at: float) -> None:
+        """Par validado - registra o horário planejado de fechamento (epoch)."""
+        self._append({"event": "opened", "cycle_id": cycle_id, "close_at": close_at})
+
+    def closed(self, cycle_id: str, reason: str = "deadline") -> None:
+        """Ciclo encerrado (fechado, abortado ou falhou)."""
+        self._append({"event": "closed", "cycle_id": cycle_id, "reason": reason})
+        self._compact_if_needed()
+
+    def _read(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Última linha pode estar truncada por um crash
+                    logger.debug("Journal: linha inválida ignorada")
+        return records
+
+    def in_flight(self, trader: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o último ciclo não encerrado (estado agregado), ou None.
+
+        Returns:
+            {"cycle_id", "pair_index", "symbol", "long_index", "short_index",
+             "legs": {"LONG": tx_hash, "SHORT": tx_hash}, "close_at"}
+        """
+        cycles: Dict[str, Dict[str, Any]] = {}
+        order: List[str] = []
+
+        for record in self._read():
+            cycle_id = record.get("cycle_id")
+            if record["event"] == "begin":
+                cycles[cycle_id] = {**record, "legs": {}, "close_at": None}
+                order.append(cycle_id)
+            elif cycle_id not in cycles:
+                continue
+            elif record["event"] == "leg":
+                cycles[cycle_id]["legs"][record["side"]] = record["tx_hash"]
+                if record["tx_hash"] and cycles[cycle_id]["close_at"] is None:
+                    # Sem "opened" ainda: prazo estimado a partir da primeira perna
+                    cycles[cycle_id]["close_at"] = record["ts"] + cycles[cycle_id].get("duration_min", 0) * 60
+            elif record["event"] == "opened":
+                cycles[cycle_id]["close_at"] = record["close_at"]
+            elif record["event"] == "closed":
+                cycles.pop(cycle_id)
+
+        for cycle_id in reversed(order):
+            cycle = cycles.get(cycle_id)
+            if cycle and (trader is None or trader in (cycle.get("trader"), cycle.get("partner"))):
+                return cycle
+        return None
+
+    def _compact_if_needed(self) -> None:
+        """Reescreve o journal mantendo apenas ciclos em aberto."""
+        try:
+            if not self.path.exists() or self.path.stat().st_size < MAX_JOURNAL_BYTES:
+                return
+            records = self._read()
+            closed_ids = {r["cycle_id"] for r in records if r["event"] == "closed"}
+            kept = [r for r in records if r.get("cycle_id") not in closed_ids]
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                for record in kept:
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp_path, self.path)
+            logger.debug(f"Journal compactado: {len(records)} → {len(kept)} registros")
+        except Exception as e:
+            logger.warning(f"Erro ao compactar journal: {e}")
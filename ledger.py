@@ -0,0 +1,410 @@
+"""
+Livro-razão local de USDC por conta.
+Parte de um saldo lido on-chain e aplica os Transfer de USDC decodificados dos
+receipts das nossas próprias transações (colateral enviado na abertura, payout
+no fechamento). O dimensionamento lê o saldo daqui, sem RPC; a chain só é
+consultada periodicamente, quando um payout ainda não apareceu ou quando uma
+leitura gratuita (Multicall3 do watchdog) diverge do razão.
+
+Payouts liquidados pelo keeper (em outra tx) vêm dos Transfer de USDC para a
+conta (eth_getLogs), lidos no mesmo bloco do saldo da reconciliação. Cada
+perna fechada espera o seu payout, atribuído pelo MarketExecuted da tx do
+keeper (trader, pairIndex, index); Transfer sem evento correspondente entra
+no saldo, mas em nenhum ciclo. O ciclo só é gravado quando todas as pernas
+receberam (ou após settlement_timeout_seconds).
+
+Subproduto: um registro de PnL/fees por ciclo em data/cycle_ledger.jsonl.
+
+Config:
+    "balance_ledger": {"enabled": true, "reconcile_every_cycles": 20,
+                       "drift_tolerance_usd": 0.01, "settlement_timeout_seconds": 120}
+"""
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from eth_abi import decode as abi_decode
+
+from src.config.constants import logger
+from src.config.paths import DATA_DIR
+from utils import metrics
+from src.config.settings import process_config
+from src.status import get_status_board
+
+USDC_ADDRESS = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"  # USDC nativo na Base
+USDC_DECIMALS = 6
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+# TradingCallbacks.MarketExecuted(orderId, Trade t, open, price, positionSizeUSDC, percentProfit, usdcSentToTrader, isPnl)
+MARKET_EXECUTED_TOPIC = "0x5c00d8b4c6c92b4922d1bd61ef722ec9a29169acb95d956676b07be6a6643eea"
+MARKET_EXECUTED_TYPES = [
+    "uint256",
+    "(address,uint256,uint256,uint256,uint256,uint256,bool,uint256,uint256,uint256,uint256)",
+    "bool", "uint256", "uint256", "int256", "uint256", "bool",
+]
+LEDGER_FILE = DATA_DIR / "cycle_ledger.jsonl"
+SEEN_TX_WINDOW = 256  # Hashes já aplicados (um receipt aguardado duas vezes não conta em dobro)
+
+# Ciclo ao qual os receipts aguardados nesta task são atribuídos
+_current_cycle: ContextVar[Optional[str]] = ContextVar("ledger_cycle", default=None)
+# Perna (pair_index, trade_index) que o receipt aguardado nesta task fecha
+_current_leg: ContextVar[Optional[Tuple[int, int]]] = ContextVar("ledger_leg", default=None)
+
+
+def set_ledger_cycle(cycle_id: Optional[str]) -> None:
+    """Atribui os próximos receipts da task atual ao ciclo (None = nenhum)."""
+    _current_cycle.set(cycle_id)
+
+
+@contextmanager
+def ledger_cycle(cycle_id: Optional[str]):
+    token = _current_cycle.set(cycle_id)
+    try:
+        yield
+    finally:
+        _current_cycle.reset(token)
+
+
+@contextmanager
+def ledger_leg(pair_index: int, trade_index: int):
+    """O receipt aguardado dentro do bloco é o fechamento desta perna."""
+    token = _current_leg.set((pair_index, trade_index))
+    try:
+        yield
+    finally:
+        _current_leg.reset(token)
+
+
+def _hex(value: Any) -> str:
+    """Tópicos/dados de log como hex minúsculo com 0x (HexBytes ou string crua do RPC)."""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    value = str(value).lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+def _int(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value, 16)
+    return int(value or 0)
+
+
+def decode_usdc_transfers(receipt: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Extrai os Transfer de USDC de um receipt.
+
+    Returns:
+        [{"from": endereço, "to": endereço, "amount": unidades de 6 casas}]
+    """
+    transfers = []
+    for log in receipt.get("logs") or []:
+        topics = log.get("topics") or []
+        if len(topics) != 3 or str(log.get("address", "")).lower() != USDC_ADDRESS.lower():
+            continue
+        if _hex(topics[0]) != TRANSFER_TOPIC:
+            continue
+        transfers.append({
+            "from": "0x" + _hex(topics[1])[-40:],
+            "to": "0x" + _hex(topics[2])[-40:],
+            "amount": int(_hex(log.get("data") or "0x0"), 16),
+        })
+    return transfers
+
+
+def decode_close_events(receipt: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Extrai os fechamentos executados pelo keeper (MarketExecuted com open=False).
+
+    Returns:
+        [{"trader": endereço, "pair_index", "trade_index", "usdc_sent": unidades de 6 casas}]
+    """
+    closes = []
+    for log in receipt.get("logs") or []:
+        topics = log.get("topics") or []
+        if not topics or _hex(topics[0]) != MARKET_EXECUTED_TOPIC:
+            continue
+        data = bytes.fromhex(_hex(log.get("data") or "0x")[2:])
+        _, trade, is_open, _, _, _, usdc_sent, _ = abi_decode(MARKET_EXECUTED_TYPES, data)
+        if is_open:
+            continue
+        closes.append({
+            "trader": trade[0].lower(),
+            "pair_index": trade[1],
+            "trade_index": trade[2],
+            "usdc_sent": usdc_sent,
+        })
+    return closes
+
+
+class BalanceLedger:
+    def __init__(self, address: str, options: Dict[str, Any]) -> None:
+        self.address = address
+        self.enabled = bool(options.get("enabled", True))
+        self.reconcile_every_cycles = int(options.get("reconcile_every_cycles", 20))
+        self.tolerance = round(float(options.get("drift_tolerance_usd", 0.01)) * 10 ** USDC_DECIMALS)
+        self.settlement_timeout = float(options.get("settlement_timeout_seconds", 120))
+        self.balance_units: Optional[int] = None
+        self.anchored_at: Optional[float] = None
+        self.anchored_block: Optional[int] = None  # Bloco do saldo ancorado (None = leitura sem bloco)
+        self.cycles_since_anchor = 0
+        self._cycles: Dict[str, Dict[str, Any]] = {}
+        self._unsettled: Dict[str, float] = {}  # cycle_id -> time.time() do fechamento sem payout
+        self._mismatch: Optional[int] = None  # Última leitura gratuita divergente (aguarda confirmação)
+        self._seen: Deque[str] = deque(maxlen=SEEN_TX_WINDOW)
+        self._payouts_seen: Deque[str] = deque(maxlen=SEEN_TX_WINDOW)  # "hash:logIndex" já creditados
+
+    @property
+    def balance(self) -> Optional[float]:
+        return None if self.balance_units is None else self.balance_units / 10 ** USDC_DECIMALS
+
+    def needs_chain(self) -> bool:
+        """True se o saldo local não basta e a próxima leitura deve ir à chain."""
+        return (
+            not self.enabled
+            or self.balance_units is None
+            or bool(self._unsettled)
+            or self.cycles_since_anchor >= self.reconcile_every_cycles
+        )
+
+    # --- Receipts ---
+
+    def _cycle(self, cycle_id: str) -> Dict[str, Any]:
+        return self._cycles.setdefault(
+            cycle_id, {"usdc_out": 0, "usdc_in": 0, "gas_wei": 0, "txs": 0, "awaiting": []}
+        )
+
+    def _awaiting(self) -> List[Dict[str, int]]:
+        """Pernas fechadas cujo payout ainda não apareceu: [{"block", "pair_index", "trade_index"}]."""
+        return [leg for cycle in self._cycles.values() for leg in cycle["awaiting"]]
+
+    def scan_from_block(self) -> Optional[int]:
+        """Primeiro bloco a varrer por payouts (None = nenhum payout pendente)."""
+        blocks = [leg["block"] for leg in self._awaiting()]
+        return min(blocks) if blocks else None
+
+    def apply_receipt(
+        self,
+        receipt: Dict[str, Any],
+        cycle_id: Optional[str],
+        leg: Optional[Tuple[int, int]] = None
+    ) -> None:
+        tx_hash = _hex(receipt.get("transactionHash", ""))
+        if tx_hash in self._seen:
+            return
+        self._seen.append(tx_hash)
+
+        me = self.address.lower()
+        delta = 0
+        for transfer in decode_usdc_transfers(receipt):
+            if transfer["from"] == me:
+                delta -= transfer["amount"]
+            if transfer["to"] == me:
+                delta += transfer["amount"]
+        if self.balance_units is not None and delta:
+            self.balance_units += delta
+            get_status_board().update(self.address, usdc_balance=self.balance, balances_at=time.time())
+
+        if cycle_id is None:
+            return
+        cycle = self._cycle(cycle_id)
+        cycle["txs"] += 1
+        if delta < 0:
+            cycle["usdc_out"] -= delta
+        else:
+            cycle["usdc_in"] += delta
+        if str(receipt.get("from", "")).lower() == me:
+            gas = _int(receipt.get("gasUsed")) * _int(receipt.get("effectiveGasPrice"))
+            cycle["gas_wei"] += gas + _int(receipt.get("l1Fee"))  # Base: custo de dados na L1
+            if leg is not None and delta == 0 and _int(receipt.get("status", 1)) == 1:
+                # Fechamento enviado por nós: o payout desta perna vem na tx do keeper
+                cycle["awaiting"].append({
+                    "block": _int(receipt.get("blockNumber")),
+                    "pair_index": leg[0],
+                    "trade_index": leg[1],
+                })
+
+    # --- Ciclos ---
+
+    def end_cycle(self, cycle_id: Optional[str]) -> None:
+        """Fecha o ciclo: com payout visto nos receipts grava já; senão espera a reconciliação."""
+        if cycle_id is None or cycle_id not in self._cycles:
+            return
+        self.cycles_since_anchor += 1
+        if self._cycles[cycle_id]["awaiting"]:
+            # Payout liquidado pelo keeper em outra tx: aguarda os Transfer (reconciliação)
+            self._unsettled[cycle_id] = time.time()
+            return
+        self._write(cycle_id, "receipts")
+
+    def _write(self, cycle_id: str, settled_by: str) -> None:
+        cycle = self._cycles.pop(cycle_id)
+        pnl = (cycle["usdc_in"] - cycle["usdc_out"]) / 10 ** USDC_DECIMALS
+        record = {
+            "cycle_id": cycle_id,
+            "account": self.address,
+            "usdc_out": cycle["usdc_out"] / 10 ** USDC_DECIMALS,
+            "usdc_in": cycle["usdc_in"] / 10 ** USDC_DECIMALS,
+            "pnl_usdc": round(pnl, 6),  # Já líquido das fees de abertura/fechamento
+            "gas_eth": cycle["gas_wei"] / 10 ** 18,
+            "txs": cycle["txs"],
+            "missing_payouts": len(cycle["awaiting"]),
+            "settled_by": settled_by,
+            "ts": time.time(),
+        }
+        metrics.record("cycle_pnl_usdc", pnl)
+        logger.info(
+            f"📒 Ciclo {cycle_id}: PnL ${pnl:+.4f} (out ${record['usdc_out']:.2f} / in ${record['usdc_in']:.2f}) "
+            f"| gas {record['gas_eth']:.6f} ETH"
+        )
+        try:
+            with open(LEDGER_FILE, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.error(f"Erro ao gravar ledger: {e}")
+
+    # --- Reconciliação ---
+
+    def _is_new_payout(self, log: Dict[str, Any]) -> bool:
+        tx_hash = _hex(log.get("transactionHash", ""))
+        return tx_hash not in self._seen and f"{tx_hash}:{_int(log.get('logIndex'))}" not in self._payouts_seen
+
+    def payout_txs(self, logs: List[Dict[str, Any]]) -> List[str]:
+        """Hashes das txs com payout ainda não aplicado (receipts a decodificar)."""
+        return list(dict.fromkeys(_hex(log.get("transactionHash", "")) for log in logs if self._is_new_payout(log)))
+
+    def apply_payout_logs(
+        self,
+        logs: List[Dict[str, Any]],
+        closes: Dict[str, List[Dict[str, Any]]]
+    ) -> None:
+        """
+        Transfer de USDC para a conta (eth_getLogs) até o bloco da reconciliação.
+        Entra no saldo só se for posterior ao bloco da última âncora (senão o
+        saldo já o inclui).
+
+        Args:
+            closes: tx_hash -> decode_close_events do receipt da tx do payout
+        """
+        me = self.address.lower()
+        for log in sorted(logs, key=lambda l: (_int(l.get("blockNumber")), _int(l.get("logIndex")))):
+            if not self._is_new_payout(log):
+                continue  # Receipt nosso (já aplicado) ou payout já creditado
+            tx_hash = _hex(log.get("transactionHash", ""))
+            self._payouts_seen.append(f"{tx_hash}:{_int(log.get('logIndex'))}")
+            transfers = decode_usdc_transfers({"logs": [log]})
+            if not transfers or transfers[0]["to"] != me:
+                continue
+            amount, block = transfers[0]["amount"], _int(log.get("blockNumber"))
+            if self.balance_units is not None and (self.anchored_block is None or block > self.anchored_block):
+                self.balance_units += amount
+            events = [event for event in closes.get(tx_hash, []) if event["trader"] == me]
+            self._credit_payout(amount, block, events)
+
+    def _credit_payout(self, amount: int, block: int, events: List[Dict[str, Any]]) -> None:
+        """
+        Atribui o payout à perna pendente fechada pelo MarketExecuted da mesma tx.
+        Com mais de um fechamento nosso na tx, vale o de usdcSentToTrader igual ao
+        Transfer. Sem correspondência exata o payout não é atribuído.
+        """
+        if len(events) > 1:
+            events = [event for event in events if event["usdc_sent"] == amount]
+        keys = {(event["pair_index"], event["trade_index"]) for event in events}
+        candidates = [
+            (cycle_id, leg) for cycle_id, cycle in self._cycles.items()
+            for leg in cycle["awaiting"]
+            if leg["block"] <= block and (leg["pair_index"], leg["trade_index"]) in keys
+        ]
+        if len(keys) != 1 or not candidates:
+            logger.debug(
+                f"📒 Transfer de ${amount / 10 ** USDC_DECIMALS:.2f} sem fechamento nosso correspondente - fora do PnL dos ciclos"
+            )
+            return
+        # Mesmo índice reaproveitado em ciclos seguidos: o payout é do fechamento mais antigo
+        cycle_id, leg = min(candidates, key=lambda c: c[1]["block"])
+        cycle = self._cycles[cycle_id]
+        cycle["awaiting"].remove(leg)
+        cycle["usdc_in"] += amount
+        if not cycle["awaiting"] and cycle_id in self._unsettled:
+            del self._unsettled[cycle_id]
+            self._write(cycle_id, "payout_logs")
+
+    def anchor(self, balance: float, block: Optional[int] = None) -> None:
+        """
+        Saldo lido on-chain (fonte da verdade). Com os payouts já aplicados, qualquer
+        diferença para o razão é drift.
+
+        Args:
+            block: Bloco em que o saldo foi lido (None = "latest", sem bloco conhecido)
+        """
+        observed = round(balance * 10 ** USDC_DECIMALS)
+        if self.balance_units is not None:
+            diff = observed - self.balance_units
+            if abs(diff) > self.tolerance:
+                metrics.record("ledger_drift_usdc", diff / 10 ** USDC_DECIMALS)
+                logger.warning(
+                    f"📒 Drift no razão de {self.address[:10]}: ${diff / 10 ** USDC_DECIMALS:+.4f} - reancorando"
+                )
+        self._expire_unsettled()
+        self.balance_units = observed
+        self.anchored_block = block
+        self.anchored_at = time.time()
+        self.cycles_since_anchor = 0
+        self._mismatch = None
+
+    def observe(self, balance: float) -> None:
+        """
+        Leitura gratuita (snapshot do Multicall3). Só reancora se a divergência se
+        repetir na leitura seguinte - uma tx nossa pode ter entrado entre as duas fontes.
+        Com payout pendente não reancora: a leitura não tem bloco e o payout seria
+        contado de novo quando os logs chegassem.
+        """
+        if self.balance_units is None:
+            self.anchor(balance)
+            return
+        if self._awaiting():
+            return
+        observed = round(balance * 10 ** USDC_DECIMALS)
+        if abs(observed - self.balance_units) <= self.tolerance:
+            self._mismatch = None
+            return
+        if self._mismatch is not None and abs(observed - self._mismatch) <= self.tolerance:
+            self.anchor(balance)
+        else:
+            self._mismatch = observed
+
+    def _expire_unsettled(self) -> None:
+        now = time.time()
+        for cycle_id, closed_at in list(self._unsettled.items()):
+            if now - closed_at > self.settlement_timeout:
+                missing = len(self._cycles[cycle_id]["awaiting"])
+                logger.warning(
+                    f"📒 Ciclo {cycle_id}: {missing} payout(s) ausente(s) após {self.settlement_timeout:.0f}s - gravando sem eles"
+                )
+                del self._unsettled[cycle_id]
+                self._write(cycle_id, "timeout")
+
+
+_ledgers: Dict[str, BalanceLedger] = {}
+
+
+def get_ledger(address: str) -> BalanceLedger:
+    """Razão da conta (config: balance_ledger, lido uma vez - requer restart)."""
+    key = address.lower()
+    if key not in _ledgers:
+        _ledgers[key] = BalanceLedger(address, process_config().get("balance_ledger", {}))
+    return _ledgers[key]
+
+
+def record_receipt(receipt: Dict[str, Any]) -> None:
+    """Aplica um receipt nosso a todos os razões envolvidos (remetente e destinatários)."""
+    cycle_id = _current_cycle.get()
+    sender = str(receipt.get("from", "")).lower()
+    involved = {sender} | {t[side] for t in decode_usdc_transfers(receipt) for side in ("from", "to")}
+    for address in involved:
+        if address in _ledgers:
+            if address == sender:
+                _ledgers[address].apply_receipt(receipt, cycle_id, _current_leg.get())
+            else:
+                _ledgers[address].apply_receipt(receipt, None)
@@ -0,0 +1,400 @@
+"""
+Analisador de logs/bot.log em streaming.
+Lê os logs (inclusive os rotacionados e comprimidos pelo loguru: .gz, .bz2, .xz,
+.zip, .tar.*) linha a linha em memória constante, reconstrói a linha do tempo de
+cada ciclo a partir das mensagens do bot e agrega as durações por estágio em
+tabelas de percentis por estágio, par e conta.
+
+Uso:
+    python -m utils.logreport logs/ [--since "2025-11-24 00:00"] [--until ...]
+                              [--csv ciclos.csv] [--stats-csv estagios.csv] [--parquet ciclos.parquet]
+
+Compare antes/depois de um deploy rodando com --until/--since no horário do deploy.
+"""
+import argparse
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import random
+import re
+import sys
+import tarfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+RESERVOIR_SIZE = 4096  # Amostras por (dimensão, grupo, estágio): percentis aproximados em memória fixa
+PARQUET_BATCH = 5000
+
+LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?) \| (\w+)\s*\| (.*)$")
+LANE_RE = re.compile(r"\[PAR (\d+)\]")
+ACCOUNT_TAG_RE = re.compile(r"\[(0x[0-9a-fA-F]{8})\]")
+
+# (marco, regex) na ordem em que são testados; o primeiro que casa vence
+MARKS: List[Tuple[str, re.Pattern]] = [
+    ("restart", re.compile(r"🚀 Avantis Delta Neutro Bot")),
+    ("cycle_start", re.compile(r"CICLO #(\d+)")),
+    ("account", re.compile(r"Cliente inicializado: (0x[0-9a-fA-F]{40})")),
+    ("pair", re.compile(r"Iniciando trade \| Mercado: (\S+)")),
+    ("open_start", re.compile(r"Abrindo delta neutro")),
+    ("long_start", re.compile(r"1️⃣ Abrindo LONG")),
+    ("long_done", re.compile(r"\] LONG .*TX:|LONG falhou")),
+    ("short_start", re.compile(r"2️⃣ Abrindo SHORT")),
+    ("short_done", re.compile(r"\] SHORT .*TX:|SHORT falhou")),
+    ("legs", re.compile(r"📊 LONG=(\S+) \| SHORT=(\S+) \|")),
+    ("validated", re.compile(r"VALIDADO:|DELTA NEUTRO CONFIRMADO")),
+    ("hold_start", re.compile(r"Monitorando por|Fleet watchdog: \S+ registrada")),
+    ("anomaly", re.compile(r"ANOMALIA|DELTA NEUTRO PERDIDO")),
+    ("close_start", re.compile(r"Encerrando ciclo|Iniciando fechamento|Unwind de emergência")),
+    ("close_done", re.compile(r"posições fechadas com sucesso|pernas fechadas|Unwind: \d+/\d+ perna\(s\) fechadas|Nenhuma posição aberta para fechar")),
+    ("failure", re.compile(r"❌ Falha \d+/\d+")),
+    ("delay_start", re.compile(r"Aguardando [\d.]+ minutos antes do próximo ciclo")),
+]
+
+# Estágio = intervalo entre dois marcos do mesmo ciclo
+STAGES: List[Tuple[str, str, str]] = [
+    ("prepare", "cycle_start", "open_start"),
+    ("long_leg", "long_start", "long_done"),
+    ("nonce_wait", "long_done", "short_start"),
+    ("short_leg", "short_start", "short_done"),
+    ("leg_gap", "long_done", "short_done"),
+    ("validate", "short_done", "validated"),
+    ("hold", "hold_start", "close_start"),
+    ("close", "close_start", "close_done"),
+    ("delay", "delay_start", "next_cycle"),
+    ("total", "cycle_start", "next_cycle"),
+]
+STAGE_NAMES = [name for name, _, _ in STAGES]
+DIMENSIONS = ("all", "pair", "account")
+
+
+class Reservoir:
+    """Amostragem de tamanho fixo (Algorithm R) + contagem e máximo exatos."""
+    __slots__ = ("count", "max", "samples", "_random")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.max = 0.0
+        self.samples: List[float] = []
+        self._random = random.Random(0)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.max = max(self.max, value)
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(value)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = value
+
+    def percentiles(self) -> Tuple[float, float, float]:
+        p50, p90, p99 = np.percentile(np.asarray(self.samples, dtype=float), [50, 90, 99])
+        return float(p50), float(p90), float(p99)
+
+
+# --- Leitura ---
+
+def _open_text(path: Path) -> Iterator[io.TextIOBase]:
+    """Abre um log (texto ou comprimido) e entrega um stream de texto por membro."""
+    name = path.name
+    if ".tar" in name:
+        with tarfile.open(path, "r:*") as tar:
+            for member in tar:
+                if member.isfile():
+                    yield io.TextIOWrapper(tar.extractfile(member), encoding="utf-8", errors="replace")
+    elif name.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for member in sorted(archive.namelist()):
+                with archive.open(member) as raw:
+                    yield io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+    elif name.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+            yield f
+    elif name.endswith(".bz2"):
+        with bz2.open(path, "rt", encoding="utf-8", errors="replace") as f:
+            yield f
+    elif name.endswith(".xz"):
+        with lzma.open(path, "rt", encoding="utf-8", errors="replace") as f:
+            yield f
+    else:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            yield f
+
+
+def log_files(inputs: List[str]) -> List[Path]:
+    """Arquivos de log em ordem cronológica (rotacionados primeiro, bot.log atual por último)."""
+    files: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(p for p in path.iterdir() if p.is_file() and p.name.startswith("bot"))
+        else:
+            files.append(path)
+    return sorted(set(files), key=lambda p: p.stat().st_mtime)
+
+
+def iter_lines(files: List[Path]) -> Iterator[Tuple[datetime, str]]:
+    for path in files:
+        for stream in _open_text(path):
+            for line in stream:
+                match = LINE_RE.match(line.rstrip("\n"))
+                if match:
+                    stamp = match.group(1)
+                    fmt = "%Y-%m-%d %H:%M:%S.%f" if "." in stamp else "%Y-%m-%d %H:%M:%S"
+                    yield datetime.strptime(stamp, fmt), match.group(3)
+
+
+# --- Reconstrução dos ciclos ---
+
+class CycleTimeline:
+    __slots__ = ("lane", "number", "account", "pair", "marks", "outcome")
+
+    def __init__(self, lane: str, number: int, account: str, started: datetime) -> None:
+        self.lane = lane
+        self.number = number
+        self.account = account
+        self.pair = "?"
+        self.marks: Dict[str, datetime] = {"cycle_start": started}
+        self.outcome = "incomplete"
+
+    def mark(self, name: str, at: datetime) -> None:
+        if name in ("long_done", "short_done", "close_done"):
+            self.marks[name] = at  # Retentativas: vale a última
+        else:
+            self.marks.setdefault(name, at)
+
+    def durations(self) -> Dict[str, Optional[float]]:
+        result = {}
+        for stage, start, end in STAGES:
+            if start in self.marks and end in self.marks and self.marks[end] >= self.marks[start]:
+                result[stage] = (self.marks[end] - self.marks[start]).total_seconds()
+            else:
+                result[stage] = None
+        return result
+
+    def row(self) -> Dict[str, Any]:
+        row = {
+            "started_at": self.marks["cycle_start"].isoformat(sep=" "),
+            "lane": self.lane,
+            "cycle": self.number,
+            "account": self.account,
+            "pair": self.pair,
+            "outcome": self.outcome,
+        }
+        row.update(self.durations())
+        return row
+
+
+def iter_cycles(lines: Iterator[Tuple[datetime, str]], since: Optional[datetime] = None,
+                until: Optional[datetime] = None) -> Iterator[CycleTimeline]:
+    """
+    Entrega cada ciclo quando o próximo da mesma lane começa (memória: um ciclo por lane).
+    Linha sem [PAR n] só é atribuída se houver uma única lane aberta; com mais de uma
+    (modo pareado) ela é ambígua e fica de fora.
+    """
+    open_cycles: Dict[str, CycleTimeline] = {}
+    account = "?"
+
+    for at, message in lines:
+        if since and at < since:
+            continue
+        if until and at >= until:
+            break
+        lane_match = LANE_RE.search(message)
+        if lane_match:
+            lane = f"par{lane_match.group(1)}"
+        elif len(open_cycles) == 1:
+            lane = next(iter(open_cycles))
+        else:
+            lane = None
+        for name, pattern in MARKS:
+            match = pattern.search(message)
+            if not match:
+                continue
+            if name == "restart":
+                # Bot reiniciado: ciclos abertos terminam aqui, sem "delay"/"total"
+                yield from open_cycles.values()
+                open_cycles.clear()
+            elif name == "account":
+                account = match.group(1)[:10]
+            elif name == "cycle_start":
+                lane = lane if lane_match else "main"
+                previous = open_cycles.pop(lane, None)
+                if previous is not None:
+                    previous.marks["next_cycle"] = at
+                    yield previous
+                open_cycles[lane] = CycleTimeline(lane, int(match.group(1)), account, at)
+            elif lane in open_cycles:
+                cycle = open_cycles[lane]
+                if name == "pair":
+                    cycle.pair = match.group(1)
+                elif name == "legs":
+                    cycle.outcome = "opened" if "✅" in match.group(1) and "✅" in match.group(2) else "leg_failed"
+                elif name == "anomaly":
+                    cycle.outcome = "anomaly"
+                elif name == "failure" and cycle.outcome == "incomplete":
+                    cycle.outcome = "failed"
+                else:
+                    cycle.mark(name, at)
+                    if name == "close_done" and cycle.outcome == "opened":
+                        cycle.outcome = "completed"
+                tag = ACCOUNT_TAG_RE.search(message)
+                if tag and cycle.account == "?":
+                    cycle.account = tag.group(1)
+            break
+
+    yield from open_cycles.values()  # Último ciclo de cada lane (sem "delay"/"total")
+
+
+# --- Agregação e saída ---
+
+class StageStats:
+    def __init__(self) -> None:
+        self._groups: Dict[Tuple[str, str, str], Reservoir] = {}
+        self.outcomes: Dict[str, int] = {}
+        self.cycles = 0
+
+    def add(self, cycle: CycleTimeline) -> None:
+        self.cycles += 1
+        self.outcomes[cycle.outcome] = self.outcomes.get(cycle.outcome, 0) + 1
+        keys = {"all": "*", "pair": cycle.pair, "account": cycle.account}
+        for stage, seconds in cycle.durations().items():
+            if seconds is None:
+                continue
+            for dimension in DIMENSIONS:
+                self._groups.setdefault((dimension, keys[dimension], stage), Reservoir()).add(seconds)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        order = {name: i for i, name in enumerate(STAGE_NAMES)}
+        rows = []
+        for (dimension, group, stage), reservoir in sorted(
+            self._groups.items(), key=lambda item: (DIMENSIONS.index(item[0][0]), item[0][1], order[item[0][2]])
+        ):
+            p50, p90, p99 = reservoir.percentiles()
+            rows.append({
+                "dimension": dimension, "group": group, "stage": stage, "count": reservoir.count,
+                "p50": round(p50, 3), "p90": round(p90, 3), "p99": round(p99, 3), "max": round(reservoir.max, 3),
+            })
+        return rows
+
+
+def print_report(stats: StageStats, out=sys.stdout) -> None:
+    outcomes = " | ".join(f"{name}: {count}" for name, count in sorted(stats.outcomes.items()))
+    print(f"Ciclos: {stats.cycles} ({outcomes or 'nenhum'})", file=out)
+    current = None
+    for row in stats.rows():
+        section = (row["dimension"], row["group"])
+        if section != current:
+            current = section
+            title = "Todos os ciclos" if row["dimension"] == "all" else f"{row['dimension']}: {row['group']}"
+            print(f"\n{title}", file=out)
+            print(f"  {'estágio':<12} {'n':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}", file=out)
+        print(
+            f"  {row['stage']:<12} {row['count']:>6} {row['p50']:>8.2f}s {row['p90']:>8.2f}s "
+            f"{row['p99']:>8.2f}s {row['max']:>8.2f}s",
+            file=out
+        )
+
+
+class ParquetSink:
+    """Grava ciclos em Parquet em lotes (pyarrow opcional)."""
+
+    def __init__(self, path: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        fields = [
+            ("started_at", pa.string()), ("lane", pa.string()), ("cycle", pa.int64()),
+            ("account", pa.string()), ("pair", pa.string()), ("outcome", pa.string()),
+        ] + [(stage, pa.float64()) for stage in STAGE_NAMES]
+        self._schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch: List[Dict[str, Any]] = []
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._batch.append(row)
+        if len(self._batch) >= PARQUET_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._batch:
+            self._writer.write_table(self._pa.Table.from_pylist(self._batch, schema=self._schema))
+            self._batch = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"data inválida: {value} (use YYYY-MM-DD [HH:MM[:SS]])")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Linha do tempo e percentis por estágio a partir do bot.log")
+    parser.add_argument("inputs", nargs="*", default=["logs"], help="Arquivos ou diretórios de log (padrão: logs/)")
+    parser.add_argument("--since", type=_parse_time, help="Só ciclos a partir desta data/hora")
+    parser.add_argument("--until", type=_parse_time, help="Só ciclos antes desta data/hora")
+    parser.add_argument("--csv", help="CSV com uma linha por ciclo")
+    parser.add_argument("--stats-csv", help="CSV com a tabela de percentis")
+    parser.add_argument("--parquet", help="Parquet com uma linha por ciclo (requer pyarrow)")
+    args = parser.parse_args(argv)
+
+    files = log_files(args.inputs)
+    if not files:
+        parser.error(f"nenhum log encontrado em {', '.join(args.inputs)}")
+
+    stats = StageStats()
+    csv_file = open(args.csv, "w", newline="", encoding="utf-8") if args.csv else None
+    csv_writer = None
+    parquet = None
+    if args.parquet:
+        try:
+            parquet = ParquetSink(args.parquet)
+        except ImportError:
+            print("pyarrow não instalado - Parquet ignorado (pip install pyarrow)", file=sys.stderr)
+
+    try:
+        for cycle in iter_cycles(iter_lines(files), args.since, args.until):
+            stats.add(cycle)
+            if csv_file is not None or parquet is not None:
+                row = cycle.row()
+                if csv_file is not None:
+                    if csv_writer is None:
+                        csv_writer = csv.DictWriter(csv_file, fieldnames=list(row))
+                        csv_writer.writeheader()
+                    csv_writer.writerow(row)
+                if parquet is not None:
+                    parquet.write(row)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        if parquet is not None:
+            parquet.close()
+
+    print(f"Arquivos: {len(files)}")
+    print_report(stats)
+
+    if args.stats_csv:
+        rows = stats.rows()
+        with open(args.stats_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["dimension", "group", "stage", "count", "p50", "p90", "p99", "max"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
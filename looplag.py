@@ -0,0 +1,129 @@
+"""
+Sentinela de lag do event loop.
+Uma task acorda a cada intervalo e registra o atraso de agendamento (métrica
+"loop_lag"); uma thread vigia o heartbeat dessa task e, quando o loop fica
+travado além do limite, loga a pilha da thread do loop naquele instante -
+o código síncrono culpado, não quem acordou depois dele.
+
+Config:
+    "loop_monitor": {"enabled": true, "interval_ms": 50, "threshold_ms": 100}
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from src.config.constants import logger
+from utils import metrics
+
+DEFAULT_INTERVAL = 0.05   # 50ms
+DEFAULT_THRESHOLD = 0.1   # 100ms
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = DEFAULT_INTERVAL, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["LoopLagMonitor"]:
+        options = config.get("loop_monitor", {})
+        if not options.get("enabled", True):
+            return None
+        return cls(
+            float(options.get("interval_ms", DEFAULT_INTERVAL * 1000)) / 1000,
+            float(options.get("threshold_ms", DEFAULT_THRESHOLD * 1000)) / 1000,
+        )
+
+    def start(self) -> None:
+        """Inicia a sentinela (chamar de dentro do event loop)."""
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watch", daemon=True)
+        self._thread.start()
+        logger.debug(f"Sentinela de lag ativa (intervalo {self.interval * 1000:.0f}ms, limite {self.threshold * 1000:.0f}ms)")
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._heartbeat = now
+            metrics.record("loop_lag", lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag > self.threshold:
+                logger.warning(f"🐢 Event loop travado por {lag * 1000:.0f}ms")
+
+    def _watch(self) -> None:
+        """Thread: captura a pilha do loop enquanto ele ainda está travado."""
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self._heartbeat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled <= self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat  # Uma pilha por travamento
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self.stalls += 1
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(f"🐢 Loop sem responder há {stalled * 1000:.0f}ms - pilha atual:\n{stack}")
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Percentis do lag (segundos) na janela de métricas."""
+        return {
+            "p50": metrics.percentile("loop_lag", 50),
+            "p99": metrics.percentile("loop_lag", 99),
+            "max": self.max_lag,
+            "stalls": self.stalls,
+        }
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._thread = None
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def start_loop_monitor(config: Dict[str, Any]) -> Optional[LoopLagMonitor]:
+    """Cria e inicia a sentinela global a partir do config (dentro do event loop)."""
+    global _monitor
+    _monitor = LoopLagMonitor.from_config(config)
+    if _monitor is not None:
+        _monitor.start()
+    return _monitor
+
+
+def get_loop_monitor() -> Optional[LoopLagMonitor]:
+    return _monitor
+
+
+def install_event_loop_policy(config: Dict[str, Any]) -> None:
+    """uvloop opcional ("uvloop": true); sem o pacote, segue no loop padrão. Chamar antes de asyncio.run."""
+    if not config.get("uvloop", False):
+        return
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("uvloop habilitado no config mas não instalado (pip install uvloop) - usando o loop padrão")
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("⚡ Event loop: uvloop")
@@ -1,29 +1,49 @@
 import asyncio
+import os
+import sys
+import pandas as pd
 from src.position_manager import TradingManager
 from src.config.constants import logger
+from src.config.paths import DATA_DIR
+from src.avantis.ratelimit import STATUS, set_task_priority
+from src.avantis.cassette import close_cassette
+from src.avantis.signer import get_signer_service
+from src.config.settings import process_config
+from utils.looplag import install_event_loop_policy, start_loop_monitor
+from src.status import fetch_local_status, start_status_server
 
 
-async def main():
+async def main() -> bool:
     """
     Ponto de entrada principal do bot Avantis Delta Neutro.
+
+    Returns:
+        True se o trading parou pedindo restart (teto suave de memória)
     """
     logger.info("="*60)
     logger.info("🚀 Avantis Delta Neutro Bot v1.0")
     logger.info("="*60)
     
-    # Escolha da ação
-    print("\nEscolha uma ação:")
-    print("1 - Iniciar Trading (Delta Neutro)")
-    print("2 - Fechar Todas as Posições")
-    print("3 - Ver Status")
-    
-    action = input("\nDigite o número da ação (ou edite main.py para modo automático): ").strip()
+    # Escolha da ação (BOT_ACTION pula o menu - usado no restart automático)
+    action = os.environ.get("BOT_ACTION", "").strip()
+    if not action:
+        print("\nEscolha uma ação:")
+        print("1 - Iniciar Trading (Delta Neutro)")
+        print("2 - Fechar Todas as Posições")
+        print("3 - Ver Status")
+        
+        action = input("\nDigite o número da ação (ou edite main.py para modo automático): ").strip()
     
-    manager = TradingManager()
+    # Trading exige config válida (ConfigError); fechar/ver status funcionam com os padrões
+    manager = TradingManager() if action == "1" else TradingManager(process_config())
     
     if action == "1":
         logger.info("Modo: Iniciar Trading")
+        # Sentinela de lag só depois do menu: o input() bloqueante não é travamento do loop
+        start_loop_monitor(process_config())
+        await start_status_server(process_config())  # Estado em memória para dashboards (zero RPC)
         await manager.start_trading()
+        return manager.restart_requested
     
     elif action == "2":
         logger.info("Modo: Fechar Todas as Posições")
@@ -33,13 +53,49 @@ async def main():
     
     elif action == "3":
         logger.info("Modo: Ver Status")
+        
+        # Bot rodando com status server: lê o estado dele em vez de varrer a chain
+        local = await fetch_local_status(process_config())
+        if local is not None:
+            print(f"\n📟 Bot em execução (pid {local['pid']}, uptime {local['uptime_seconds'] / 60:.0f} min)")
+            for address, account in local["accounts"].items():
+                print(
+                    f"  {address[:10]}... | USDC: ${account.get('usdc_balance') or 0:.2f} | "
+                    f"Estágio: {account.get('stage', '?')} | Par: {account.get('symbol') or '-'} | "
+                    f"Posições: {len(account.get('positions', []))}"
+                )
+            logger.info("✅ Status exibido (status server local)")
+            return False
+        
+        set_task_priority(STATUS)  # Diagnóstico nunca disputa banda com transações
         await manager.initialize_client()
-        from src.avantis.account import get_open_positions, get_usdc_balance
+        from src.avantis.account import get_open_positions, get_fleet_snapshots
+        from src.avantis.market import get_pair_index
+        
+        # Todas as contas ativas em uma única rodada de Multicall3
+        df_accounts = pd.read_excel(DATA_DIR / "accounts.xlsx")
+        addresses = df_accounts[df_accounts["is_active"] == True]["address"].tolist()
+        df_pairs = pd.read_excel(DATA_DIR / "active_pairs.xlsx")
+        if "active" in df_pairs:
+            df_pairs = df_pairs[df_pairs["active"] == True]
+        pair_indices = [
+            i for i in await asyncio.gather(*[get_pair_index(manager.trader_client, s) for s in df_pairs["symbol"]])
+            if i is not None
+        ]
+        snapshots = await get_fleet_snapshots(manager.trader_client, addresses, pair_indices)
+        
+        print(f"\n👛 Contas ativas: {len(snapshots)}")
+        for address, snap in snapshots.items():
+            print(
+                f"  {address[:10]}... | USDC: ${snap.usdc_balance or 0:.2f} | "
+                f"Allowance: ${snap.allowance or 0:.2f} | ETH: {snap.eth_balance or 0:.4f} | "
+                f"Trades abertas: {snap.total_open}"
+            )
         
-        balance = await get_usdc_balance(manager.trader_client)
+        balance = snapshots[manager.trader_address].usdc_balance if manager.trader_address in snapshots else 0
         positions = await get_open_positions(manager.trader_client)
         
-        print(f"\n💰 Saldo USDC: ${balance:.2f}")
+        print(f"\n💰 Saldo USDC ({manager.trader_address[:10]}...): ${balance or 0:.2f}")
         print(f"📊 Posições abertas: {len(positions)}")
         
         if positions:
@@ -56,12 +112,24 @@ async def main():
     
     else:
         logger.warning("Ação inválida. Saindo...")
+    return False
 
 
 if __name__ == "__main__":
+    restart = False
+    install_event_loop_policy(process_config())
     try:
-        asyncio.run(main())
+        restart = asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("\n⚠️ Bot interrompido pelo usuário")
     except Exception as e:
         logger.error(f"❌ Erro fatal: {e}", exc_info=True)
+    finally:
+        close_cassette()
+    if restart:
+        # Processo novo devolve a memória ao SO; o journal retoma o estado a partir daqui
+        logger.info("♻️ Reiniciando o bot (teto suave de memória)...")
+        if get_signer_service() is not None:
+            get_signer_service().shutdown()
+        os.environ["BOT_ACTION"] = "1"
+        os.execv(sys.executable, [sys.executable] + sys.argv)
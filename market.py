@@ -1,6 +1,7 @@
 from typing import Dict, Any, Optional
 from avantis_trader_sdk import TraderClient
-from src.config.constants import logger
+from src.config.constants import BASE_RPC_URL, logger
+from utils.retry import retry_async
 import asyncio
 
 
@@ -16,7 +17,9 @@ async def get_pair_index(trader_client: TraderClient, pair_symbol: str) -> Optio
         Índice do par ou None
     """
     try:
-        pair_index = await trader_client.pairs_cache.get_pair_index(pair_symbol)
+        pair_index = await retry_async(
+            trader_client.pairs_cache.get_pair_index, pair_symbol, endpoint=BASE_RPC_URL, name="get_pair_index"
+        )
         return pair_index
     except Exception as e:
         logger.error(f"Erro ao buscar par {pair_symbol}: {e}")
@@ -0,0 +1,112 @@
+"""
+Telemetria de memória para execuções longas.
+A cada N ciclos mede o RSS do processo e (opcional) tira um snapshot do
+tracemalloc, registrando no log os locais de alocação que mais cresceram desde
+a amostra anterior. Acima do teto suave configurado, pede um restart gracioso -
+o TradingManager só consulta isso entre ciclos, nunca durante o hold.
+
+Config:
+    "memory_telemetry": {"every_cycles": 50, "tracemalloc": false, "top": 10, "soft_ceiling_mb": 0}
+"""
+import os
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from src.config.constants import logger
+from utils import metrics
+
+
+def rss_mb() -> Optional[float]:
+    """RSS atual do processo em MB (None se a plataforma não expõe)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Sem /proc: pico em vez do atual (KB no Linux, bytes no macOS)
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+    except (ImportError, OSError):
+        return None
+
+
+class MemoryMonitor:
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.baseline_mb: Optional[float] = None
+        self.last_mb: Optional[float] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self.last_diff: List[str] = []
+        self.configure(config)
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """Aplica memory_telemetry (hot reload preserva o baseline)."""
+        options = config.get("memory_telemetry", {})
+        self.every_cycles = max(int(options.get("every_cycles", 50)), 1)
+        self.top = int(options.get("top", 10))
+        self.soft_ceiling_mb = float(options.get("soft_ceiling_mb", 0)) or None
+        self.trace = bool(options.get("tracemalloc", False))
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not self.trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._snapshot = None
+
+    def on_cycle(self, cycle_number: int) -> bool:
+        """
+        Amostra a memória no primeiro ciclo (baseline) e depois a cada every_cycles.
+
+        Returns:
+            True se o RSS passou do teto suave (restart gracioso solicitado)
+        """
+        if (cycle_number - 1) % self.every_cycles:
+            return False
+        return self.sample(cycle_number)
+
+    def sample(self, cycle_number: int) -> bool:
+        current = rss_mb()
+        if current is not None:
+            metrics.record("rss_mb", current)
+            if self.baseline_mb is None:
+                self.baseline_mb = current
+            growth = current - self.baseline_mb
+            logger.info(f"🧠 Memória (ciclo #{cycle_number}): RSS {current:.1f} MB ({growth:+.1f} MB desde o início)")
+            self.last_mb = current
+
+        if self.trace:
+            self._log_top_diff(cycle_number)
+
+        if self.soft_ceiling_mb and current is not None and current > self.soft_ceiling_mb:
+            logger.warning(
+                f"🧠 RSS {current:.1f} MB acima do teto suave ({self.soft_ceiling_mb:.0f} MB) - "
+                f"restart gracioso entre ciclos"
+            )
+            return True
+        return False
+
+    def _log_top_diff(self, cycle_number: int) -> None:
+        """Loga os locais de alocação que mais cresceram desde o snapshot anterior."""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self._snapshot is not None:
+            stats = snapshot.compare_to(self._snapshot, "lineno")
+            self.last_diff = [str(stat) for stat in stats[:self.top] if stat.size_diff > 0]
+            if self.last_diff:
+                logger.info(f"🧠 Top alocações (crescimento desde a última amostra, ciclo #{cycle_number}):")
+                for line in self.last_diff:
+                    logger.info(f"   {line}")
+        self._snapshot = snapshot
+
+    def report(self) -> Dict[str, Any]:
+        """Resumo da telemetria (usado pelo soak test)."""
+        return {
+            "baseline_mb": self.baseline_mb,
+            "last_mb": self.last_mb,
+            "growth_mb": None if self.baseline_mb is None or self.last_mb is None else self.last_mb - self.baseline_mb,
+            "top_growth": list(self.last_diff),
+        }
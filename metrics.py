@@ -0,0 +1,60 @@
+"""
+Métricas de timing em memória (janelas deslizantes por nome).
+Ex: record("leg_gap", 2.8) | percentile("leg_gap", 90) | summary()
+"""
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+WINDOW_SIZE = 500  # Últimas N amostras por métrica
+
+_series: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=WINDOW_SIZE))
+
+
+def record(name: str, value: float) -> None:
+    """Registra uma amostra."""
+    _series[name].append(float(value))
+
+
+@contextmanager
+def timer(name: str):
+    """Mede a duração (segundos) do bloco e registra em `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def values(name: str) -> List[float]:
+    """Retorna as amostras atuais de uma métrica."""
+    return list(_series.get(name, ()))
+
+
+def percentile(name: str, q: float, default: Optional[float] = None) -> Optional[float]:
+    """Percentil q (0-100) da métrica, ou default se não houver amostras."""
+    samples = _series.get(name)
+    if not samples:
+        return default
+    return float(np.percentile(np.fromiter(samples, dtype=float), q))
+
+
+def summary() -> Dict[str, Dict[str, Any]]:
+    """Resumo de todas as métricas (count, p50, p90, p99, last)."""
+    result = {}
+    for name, samples in list(_series.items()):
+        if not samples:
+            continue
+        arr = np.fromiter(samples, dtype=float)
+        p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+        result[name] = {
+            "count": len(arr),
+            "p50": round(float(p50), 4),
+            "p90": round(float(p90), 4),
+            "p99": round(float(p99), 4),
+            "last": round(float(arr[-1]), 4)
+        }
+    return result
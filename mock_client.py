@@ -0,0 +1,374 @@
+"""
+TraderClient simulado em memória (sem rede, sem carteira).
+Implementa a superfície do SDK usada pelo bot - trade, saldo/allowance,
+pairs_cache, contratos para Multicall3 e async_web3 com
+receipts por bloco - sobre uma MockChain que aplica aberturas, fechamentos e
+aprovações. Usado pelo soak test para rodar milhares de ciclos rapidamente.
+"""
+import hashlib
+import json
+import random
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from eth_abi import encode as abi_encode
+
+from src.config.constants import CHAIN_ID
+from src.avantis.ledger import TRANSFER_TOPIC, USDC_ADDRESS
+
+STORAGE_ADDRESS = "0x0000000000000000000000000000000000005701"
+USDC_DECIMALS = 6
+BASE_FEE = 10 ** 7          # wei
+PRIORITY_FEE = 10 ** 6      # wei
+OPEN_FEE_RATE = 0.0008      # Sobre o tamanho da posição (colateral x alavancagem)
+
+OPEN_TRADE_COMPONENTS = [
+    {"name": "trader", "type": "address"},
+    {"name": "pairIndex", "type": "uint256"},
+    {"name": "index", "type": "uint256"},
+    {"name": "initialPosToken", "type": "uint256"},
+    {"name": "positionSizeUSDC", "type": "uint256"},
+    {"name": "openPrice", "type": "uint256"},
+    {"name": "buy", "type": "bool"},
+    {"name": "leverage", "type": "uint256"},
+    {"name": "tp", "type": "uint256"},
+    {"name": "sl", "type": "uint256"},
+    {"name": "timestamp", "type": "uint256"},
+]
+OPEN_TRADE_TYPE = "(" + ",".join(c["type"] for c in OPEN_TRADE_COMPONENTS) + ")"
+
+
+async def _value(value: Any) -> Any:
+    """Permite expor valores como propriedades aguardáveis (ex: await eth.block_number)."""
+    return value
+
+
+def _usdc(amount: float) -> int:
+    return int(round(amount * 10 ** USDC_DECIMALS))
+
+
+class MockChain:
+    def __init__(self, initial_usdc: float = 10_000, seed: Optional[int] = None) -> None:
+        self.initial_usdc = initial_usdc
+        self.block = 1
+        self.usdc: Dict[str, int] = defaultdict(lambda: _usdc(self.initial_usdc))
+        self.allowance: Dict[str, int] = defaultdict(int)
+        self.trades: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+        self.nonces: Dict[str, int] = defaultdict(int)
+        self.prices: Dict[int, float] = defaultdict(lambda: 1000.0)
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self._receipts: Dict[str, Dict[str, Any]] = {}
+        self._block_receipts: Dict[int, List[Dict[str, Any]]] = {}
+        self._tx_counter = 0
+        self._random = random.Random(seed)
+
+    # --- Transações ---
+
+    def pending_nonce(self, address: str) -> int:
+        return self.nonces[address] + sum(1 for _, tx in self._pending if tx["from"] == address)
+
+    def submit(self, tx: Dict[str, Any]) -> str:
+        sender = tx["from"]
+        if tx["nonce"] < self.pending_nonce(sender):
+            raise ValueError("nonce too low")
+        self._tx_counter += 1
+        tx_hash = "0x" + hashlib.sha256(f"{self._tx_counter}:{tx['data']}".encode()).hexdigest()
+        self._pending.append((tx_hash, dict(tx)))
+        return tx_hash
+
+    def block_number(self) -> int:
+        """Inclusão instantânea: cada consulta com txs pendentes minera um bloco."""
+        if self._pending:
+            self.mine()
+        return self.block
+
+    def mine(self) -> None:
+        self.block += 1
+        receipts = []
+        for tx_hash, tx in sorted(self._pending, key=lambda item: item[1]["nonce"]):
+            self.nonces[tx["from"]] = max(self.nonces[tx["from"]], tx["nonce"] + 1)
+            status, logs = self._apply(tx)
+            receipt = {
+                "transactionHash": tx_hash,
+                "blockNumber": hex(self.block),
+                "from": tx["from"],
+                "to": tx.get("to"),
+                "status": hex(status),
+                "gasUsed": hex(250_000),
+                "cumulativeGasUsed": hex(250_000),
+                "effectiveGasPrice": hex(BASE_FEE + PRIORITY_FEE),
+                "transactionIndex": hex(len(receipts)),
+                "logs": logs,
+            }
+            receipts.append(receipt)
+            self._receipts[tx_hash] = receipt
+        self._block_receipts[self.block] = receipts
+        self._pending.clear()
+        # Receipts antigos não são mais consultados: mantém a memória da simulação constante
+        for old in [b for b in self._block_receipts if b < self.block - 64]:
+            for receipt in self._block_receipts.pop(old):
+                self._receipts.pop(receipt["transactionHash"], None)
+
+    @staticmethod
+    def _transfer_log(sender: str, recipient: str, amount: int) -> Dict[str, Any]:
+        return {
+            "address": USDC_ADDRESS,
+            "topics": [TRANSFER_TOPIC, "0x" + sender[2:].lower().rjust(64, "0"), "0x" + recipient[2:].lower().rjust(64, "0")],
+            "data": hex(amount),
+        }
+
+    def _apply(self, tx: Dict[str, Any]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Executa a operação da tx. Returns: (status, logs de Transfer do USDC)."""
+        op = json.loads(tx["data"])
+        trader = tx["from"]
+        if op["op"] == "open":
+            key = (trader, op["pair_index"], op["index"])
+            collateral = op["collateral"]
+            if key in self.trades or self.usdc[trader] < collateral or self.allowance[trader] < collateral:
+                return 0, []
+            price = self.prices[op["pair_index"]] * (1 + self._random.gauss(0, 0.001))
+            self.prices[op["pair_index"]] = price
+            fee = int(collateral * op["leverage"] * OPEN_FEE_RATE)
+            self.usdc[trader] -= collateral
+            self.allowance[trader] -= collateral
+            self.trades[key] = {
+                "collateral": collateral - fee, "is_long": op["is_long"], "leverage": op["leverage"],
+                "open_price": price, "block": self.block,
+            }
+            return 1, [self._transfer_log(trader, STORAGE_ADDRESS, collateral)]
+        if op["op"] == "close":
+            trade = self.trades.pop((trader, op["pair_index"], op["index"]), None)
+            if trade is None:
+                return 0, []
+            price = self.prices[op["pair_index"]] * (1 + self._random.gauss(0, 0.001))
+            self.prices[op["pair_index"]] = price
+            move = (price / trade["open_price"] - 1) * (1 if trade["is_long"] else -1)
+            size = trade["collateral"] * trade["leverage"]
+            payout = trade["collateral"] + size * move - size * OPEN_FEE_RATE
+            payout = max(int(payout), 0)
+            self.usdc[trader] += payout
+            return 1, [self._transfer_log(STORAGE_ADDRESS, trader, payout)]
+        return 0, []
+
+    def receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        return self._receipts.get(str(tx_hash).lower())
+
+    def block_receipts(self, block_number: int) -> List[Dict[str, Any]]:
+        return self._block_receipts.get(block_number, [])
+
+    # --- Leituras (Multicall3) ---
+
+    def view(self, contract: str, fn: str, args: List[Any]) -> bytes:
+        if fn == "balanceOf":
+            return abi_encode(["uint256"], [self.usdc[args[0]]])
+        if fn == "allowance":
+            return abi_encode(["uint256"], [self.allowance[args[0]]])
+        if fn == "getEthBalance":
+            return abi_encode(["uint256"], [10 ** 18])
+        if fn == "openTradesCount":
+            count = sum(1 for (t, p, _) in self.trades if t == args[0] and p == args[1])
+            return abi_encode(["uint256"], [count])
+        if fn == "openTrades":
+            trader, pair_index, index = args
+            trade = self.trades.get((trader, pair_index, index))
+            if trade is None:
+                values = (trader, pair_index, index, 0, 0, 0, False, 0, 0, 0, 0)
+            else:
+                values = (
+                    trader, pair_index, index, 0, trade["collateral"], int(trade["open_price"] * 10 ** 10),
+                    trade["is_long"], trade["leverage"] * 10 ** 10, 0, 0, trade["block"],
+                )
+            return abi_encode([OPEN_TRADE_TYPE], [values])
+        raise ValueError(f"MockChain: view desconhecida {contract}.{fn}")
+
+
+class MockContract:
+    """Contrato com encodeABI/get_function_by_name/aggregate3 sobre a MockChain."""
+
+    def __init__(self, chain: MockChain, address: str, name: str) -> None:
+        self.chain = chain
+        self.address = address
+        self.name = name
+        self.functions = SimpleNamespace(aggregate3=self._aggregate3, balanceOf=self._balance_of)
+
+    def encodeABI(self, fn_name: str, args: List[Any]) -> bytes:
+        return json.dumps({"c": self.name, "fn": fn_name, "args": args}).encode()
+
+    def get_function_by_name(self, name: str) -> SimpleNamespace:
+        return SimpleNamespace(abi={"name": name, "outputs": [
+            {"name": "", "type": "tuple", "components": OPEN_TRADE_COMPONENTS}
+        ]})
+
+    def _balance_of(self, address: str) -> SimpleNamespace:
+        async def call(block_identifier: Any = "latest") -> int:
+            return self.chain.usdc[address]  # Sem histórico: o saldo atual
+        return SimpleNamespace(call=call)
+
+    def _aggregate3(self, batch: List[Tuple[str, bool, bytes]]) -> SimpleNamespace:
+        async def call():
+            results = []
+            for _, _, data in batch:
+                request = json.loads(data)
+                try:
+                    results.append((True, self.chain.view(request["c"], request["fn"], request["args"])))
+                except ValueError:
+                    results.append((False, b""))
+            return results
+        return SimpleNamespace(call=call)
+
+
+class _MockEth:
+    def __init__(self, chain: MockChain) -> None:
+        self.chain = chain
+
+    @property
+    def block_number(self):
+        return _value(self.chain.block_number())
+
+    @property
+    def max_priority_fee(self):
+        return _value(PRIORITY_FEE)
+
+    async def get_block(self, block_identifier: Any = "latest") -> Dict[str, Any]:
+        return {"number": self.chain.block, "baseFeePerGas": BASE_FEE}
+
+    async def get_transaction_receipt(self, tx_hash: Any) -> Optional[Dict[str, Any]]:
+        return self.chain.receipt(tx_hash)
+
+    async def get_transaction_count(self, address: str, block_identifier: Any = "latest") -> int:
+        if block_identifier == "pending":
+            return self.chain.pending_nonce(address)
+        return self.chain.nonces[address]
+
+    async def get_logs(self, filter_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Logs dos blocos ainda retidos que casam com endereço e tópicos (None = qualquer)."""
+        topics = filter_params.get("topics", [])
+        logs = []
+        for number in range(int(filter_params["fromBlock"]), int(filter_params["toBlock"]) + 1):
+            for receipt in self.chain.block_receipts(number):
+                for index, log in enumerate(receipt["logs"]):
+                    if log["address"] != filter_params.get("address", log["address"]):
+                        continue
+                    if all(t is None or t == log["topics"][i] for i, t in enumerate(topics)):
+                        logs.append({**log, "transactionHash": receipt["transactionHash"],
+                                     "blockNumber": number, "logIndex": index})
+        return logs
+
+    async def estimate_gas(self, transaction: Dict[str, Any]) -> int:
+        return 250_000
+
+    async def call(self, transaction: Dict[str, Any], block_identifier: Any = "latest") -> bytes:
+        return b""
+
+    async def send_raw_transaction(self, raw_transaction: bytes) -> str:
+        raise RuntimeError("mock: envio de tx bruta não suportado (use signer_pool off)")
+
+    def contract(self, address: str, abi: Any = None) -> MockContract:
+        return MockContract(self.chain, address, "Multicall3")
+
+
+class _MockProvider:
+    def __init__(self, chain: MockChain) -> None:
+        self.chain = chain
+
+    async def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        if method == "eth_getBlockReceipts":
+            return {"jsonrpc": "2.0", "id": 0, "result": self.chain.block_receipts(int(params[0], 16))}
+        return {"jsonrpc": "2.0", "id": 0, "error": {"code": -32601, "message": f"mock: {method} não suportado"}}
+
+
+class _MockTrade:
+    def __init__(self, client: "MockTraderClient") -> None:
+        self.client = client
+
+    def _tx(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        address = self.client.address
+        return {
+            "from": address,
+            "to": STORAGE_ADDRESS,
+            "data": json.dumps(op),
+            "value": 0,
+            "chainId": CHAIN_ID,
+            "nonce": self.client.chain.pending_nonce(address),
+            "gas": 400_000,
+            "maxFeePerGas": 2 * BASE_FEE + PRIORITY_FEE,
+            "maxPriorityFeePerGas": PRIORITY_FEE,
+        }
+
+    async def build_trade_open_tx(self, trade_input, order_type, slippage_percentage: float = 1) -> Dict[str, Any]:
+        collateral = trade_input.collateral_in_trade
+        # O TradeInput do SDK pode já ter convertido para unidades de 6 casas
+        collateral = int(collateral) if isinstance(collateral, int) and collateral >= 10 ** USDC_DECIMALS else _usdc(collateral)
+        leverage = trade_input.leverage
+        leverage = leverage // 10 ** 10 if leverage >= 10 ** 10 else int(leverage)
+        return self._tx({
+            "op": "open", "pair_index": trade_input.pair_index, "index": trade_input.index,
+            "is_long": bool(trade_input.is_long), "collateral": collateral, "leverage": leverage,
+        })
+
+    async def build_trade_close_tx(self, pair_index: int, trade_index: int, collateral_to_close: float, trader: str) -> Dict[str, Any]:
+        return self._tx({"op": "close", "pair_index": pair_index, "index": trade_index})
+
+    async def get_trades(self, trader: str):
+        trades = []
+        for (owner, pair_index, index), trade in self.client.chain.trades.items():
+            if owner != trader:
+                continue
+            collateral = trade["collateral"] / 10 ** USDC_DECIMALS
+            direction = -1 if trade["is_long"] else 1
+            trades.append(SimpleNamespace(
+                trade=SimpleNamespace(
+                    pair_index=pair_index, trade_index=index, open_collateral=collateral,
+                    is_long=trade["is_long"], leverage=trade["leverage"], open_price=trade["open_price"],
+                    tp=0, sl=0,
+                ),
+                liquidation_price=trade["open_price"] * (1 + direction * 0.9 / trade["leverage"]),
+                margin_fee=0.0,
+            ))
+        return trades, []
+
+
+class _MockPairs:
+    def __init__(self) -> None:
+        self._indices: Dict[str, int] = {}
+
+    async def get_pair_index(self, symbol: str) -> int:
+        return self._indices.setdefault(symbol, len(self._indices))
+
+    async def get_pairs_count(self) -> int:
+        return len(self._indices)
+
+
+class MockTraderClient:
+    def __init__(self, chain: MockChain, address: str) -> None:
+        self.chain = chain
+        self.address = address
+        self.trade = _MockTrade(self)
+        self.pairs_cache = _MockPairs()
+        self.async_web3 = SimpleNamespace(eth=_MockEth(chain), provider=_MockProvider(chain))
+        self.contracts = {
+            "USDC": MockContract(chain, USDC_ADDRESS, "USDC"),
+            "TradingStorage": MockContract(chain, STORAGE_ADDRESS, "TradingStorage"),
+        }
+
+    def get_signer(self) -> SimpleNamespace:
+        return SimpleNamespace(get_ethereum_address=lambda: self.address)
+
+    def set_local_signer(self, private_key: str) -> None:
+        pass
+
+    async def sign_transaction(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(transaction)
+
+    async def send_and_get_transaction_hash(self, signed: Dict[str, Any]) -> str:
+        return self.chain.submit(signed)
+
+    async def get_usdc_balance(self, address: str) -> float:
+        return self.chain.usdc[address] / 10 ** USDC_DECIMALS
+
+    async def get_usdc_allowance_for_trading(self, address: str) -> float:
+        return self.chain.allowance[address] / 10 ** USDC_DECIMALS
+
+    async def approve_usdc_for_trading(self, amount: float) -> None:
+        self.chain.allowance[self.address] = _usdc(amount)
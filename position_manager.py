@@ -1,23 +1,41 @@
-import random
 import time
 import pandas as pd
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from src.config.constants import logger
 from src.config.paths import DATA_DIR
 from src.avantis.auth import get_trader_client
 from src.avantis.trade import open_position, close_position, open_position_direct
-from src.avantis.account import get_open_positions, get_usdc_balance
+from src.avantis.account import PositionSnapshot, get_open_positions, get_usdc_balance
 from src.avantis.market import get_pair_index
-from utils.data import update_state, get_user_state, USER_CONFIG, force_close_state
+from src.avantis.slippage import SlippageController
+from src.avantis.preflight import preflight_delta_neutral
+from src.avantis.indices import TradeIndexAllocator
+from src.avantis.signer import configure_signer_service, get_signer_service
+from src.avantis.ratelimit import get_rate_limiter
+from src.avantis.unwind import EmergencyUnwinder
+from src.avantis.ledger import get_ledger, ledger_cycle, set_ledger_cycle
+from src.scheduler import CycleScheduler, HoldDeadline
+from src.config.settings import RESTART_SECTIONS, ConfigWatcher, Settings, load_settings, process_config
+from src.journal import CycleJournal
+from src.status import get_status_board
+from utils.data import update_state, get_user_state, force_close_state
 from utils.calc import calc_value_distribution
+from utils import metrics
+from utils.retry import set_max_attempts
+from utils.profiler import CycleProfiler
+from utils.memory import MemoryMonitor
+from utils.looplag import get_loop_monitor
 
 
 class TradingManager:
-    def __init__(self) -> None:
-        self.config: Dict[str, Any] = USER_CONFIG
-        self.retries = self.config.get("retries", 3)
+    def __init__(self, config: Optional[Settings] = None) -> None:
+        # Validada no carregamento (ConfigError se inválida); config explícita = menu fora do trading
+        self.config: Settings = config if config is not None else load_settings()
+        self._config_watcher = ConfigWatcher()  # Hot reload entre ciclos
+        self.retries = self.config.retries
+        set_max_attempts(self.retries)
         self.trader_client = None
         self.private_key = None
         self.trader_address = None
@@ -25,13 +43,56 @@ class TradingManager:
         self._positions_open = False  # Flag de controle
         self._consecutive_failures = 0  # Contador de falhas consecutivas
         self._max_consecutive_failures = 3  # Parar após 3 falhas
+        self._scheduler = CycleScheduler(self)  # Prepara o próximo ciclo durante o hold
+        self.slippage = SlippageController(self.config)  # Slippage adaptativo por par
+        self.journal = CycleJournal()  # Journal write-ahead para recuperar ciclos após restart
+        self.indices = TradeIndexAllocator()  # Trade indices livres sem RPC
+        self._cycle_id = None
+        self._open_legs = []  # [(pair_index, trade_index, is_long)] do ciclo atual
+        self._legs_confirmed_at: Optional[float] = None  # time.monotonic() da confirmação do SHORT
+        self._slots: Dict[str, Dict[str, Any]] = {}  # Modo multi-par: cycle_id -> slot
+        self._unwinder: Optional[EmergencyUnwinder] = None  # Fechamentos pré-construídos do ciclo
+        self.profiler = CycleProfiler()  # Amostragem sob demanda (SIGUSR1 / config "profiling")
+        self.status = get_status_board()  # Estado em memória servido pelo status server
+        self.memory = MemoryMonitor(self.config)  # RSS/tracemalloc a cada N ciclos + teto suave
+        self.max_cycles: Optional[int] = None  # Limite de ciclos (soak test); None = infinito
+        self.restart_requested = False  # Teto de memória atingido: main.py reinicia o processo
+        configure_signer_service(process_config())  # Assinatura fora do event loop (requer restart)
+
+    def _set_stage(self, stage: str, **fields) -> None:
+        """Estágio do ciclo atual (profiler + status server)."""
+        self.profiler.set_stage(stage)
+        self.status.set_stage(self.trader_address, stage, **fields)
 
     def get_random_from_range(self, key: str) -> int:
-        if key in self.config and isinstance(self.config[key], dict):
-            min_val = self.config[key].get("min", 0)
-            max_val = self.config[key].get("max", 0)
-            return random.randint(min_val, max_val)
-        raise ValueError(f"Invalid or missing config range for '{key}'")
+        return self.config.sample(key)
+
+    def reload_config(self) -> bool:
+        """
+        Aplica alterações de data/config.json, se houver.
+        Chamado apenas entre ciclos: posições abertas seguem com os valores do ciclo delas.
+
+        Returns:
+            True se uma nova configuração foi aplicada
+        """
+        new_config = self._config_watcher.poll()
+        if new_config is None:
+            return False
+        changed = new_config.changed_keys(self.config)
+        # Troca atômica: o ciclo seguinte enxerga a configuração inteira nova, nunca parte dela
+        self.config = new_config
+        self.retries = new_config.retries
+        set_max_attempts(new_config.retries)
+        self.slippage.configure(new_config)
+        if "profiling" in changed:
+            self.profiler.request(int(new_config.get("profiling", {}).get("cycles", 0)))
+        if "memory_telemetry" in changed:
+            self.memory.configure(new_config)
+        needs_restart = [key for key in changed if key in RESTART_SECTIONS]
+        if needs_restart:
+            logger.warning(f"⚙️ {', '.join(needs_restart)}: lido só na inicialização - reinicie o bot para aplicar")
+        logger.success(f"⚙️ Configuração recarregada: {', '.join(changed) or 'sem mudanças efetivas'}")
+        return True
 
     async def initialize_client(self) -> None:
         """Inicializa o cliente Avantis com a private key."""
@@ -41,11 +102,25 @@ class TradingManager:
         self.private_key = active_account["private_key"]
         self.trader_client = get_trader_client(self.private_key)
         self.trader_address = self.trader_client.get_signer().get_ethereum_address()
+        await self._start_signer_service()
         
         logger.info(f"✅ Cliente inicializado: {self.trader_address}")
 
-    async def select_market_data(self, df_markets: pd.DataFrame) -> Optional[Dict[str, Any]]:
-        """Seleciona um mercado aleatório da lista."""
+    async def _start_signer_service(self) -> None:
+        """Sobe o pool de assinatura fora do loop (lê accounts.xlsx e carrega as chaves)."""
+        signer_service = get_signer_service()
+        if signer_service is not None:
+            await asyncio.to_thread(signer_service.start)
+
+    async def select_market_data(self, df_markets: pd.DataFrame, exclude_symbols=()) -> Optional[Dict[str, Any]]:
+        """
+        Seleciona um mercado aleatório da lista.
+        
+        Args:
+            exclude_symbols: Símbolos já em uso (modo multi-par)
+        """
+        if exclude_symbols:
+            df_markets = df_markets[~df_markets["symbol"].isin(list(exclude_symbols))]
         for _ in range(len(df_markets)):
             market = df_markets.sample().iloc[0]
             try:
@@ -66,23 +141,32 @@ class TradingManager:
         """Mostra a configuração carregada para debug."""
         logger.info("=" * 60)
         logger.info("🔍 DEBUG - Configuração Carregada:")
-        logger.info(f"   order_value_usd: ${self.config['order_value_usd']['min']}-${self.config['order_value_usd']['max']}")
-        logger.info(f"   max_leverage: {self.config['max_leverage']}x")
-        logger.info(f"   order_duration_min: {self.config['order_duration_min']['min']}-{self.config['order_duration_min']['max']} min")
+        logger.info(f"   order_value_usd: ${self.config.ranges['order_value_usd']!r}")
+        logger.info(f"   max_leverage: {self.config.max_leverage:g}x")
+        logger.info(f"   order_duration_min: {self.config.ranges['order_duration_min']!r} min")
+        logger.info(f"   nonce_delay_seconds: {self.config.nonce_delay_seconds}s | retries: {self.config.retries}")
         logger.info("=" * 60)
 
-    async def get_max_order_value(self) -> float:
-        """Calcula o valor máximo de ordem baseado no saldo e alavancagem."""
-        max_order_value = float(self.config["order_value_usd"]["max"])
-        max_leverage = float(self.config["max_leverage"])
+    async def get_max_order_value(self, usdc_balance: Optional[float] = None, check_positions: bool = True) -> float:
+        """
+        Calcula o valor máximo de ordem baseado no saldo e alavancagem.
         
-        usdc_balance = await get_usdc_balance(self.trader_client)
+        Args:
+            usdc_balance: Saldo já conhecido (prefetch); None lê do razão local (ou da chain)
+            check_positions: Se True, retorna 0 quando há posições abertas
+        """
+        max_order_value = float(self.config.ranges["order_value_usd"].high)
+        max_leverage = self.config.max_leverage
+        
+        if usdc_balance is None:
+            usdc_balance = await get_usdc_balance(self.trader_client)
         
         # Verificar se há posições abertas
-        positions = await get_open_positions(self.trader_client)
-        if positions:
-            logger.warning(f"Existem {len(positions)} posições abertas. Aguardando fechamento...")
-            return 0
+        if check_positions:
+            positions = await get_open_positions(self.trader_client)
+            if positions:
+                logger.warning(f"Existem {len(positions)} posições abertas. Aguardando fechamento...")
+                return 0
         
         # Calcular valor máximo baseado no saldo
         leverage_check = max_order_value / usdc_balance
@@ -95,25 +179,54 @@ class TradingManager:
 
     async def start_trading(self) -> None:
         """Loop principal de trading."""
+        if self.config.get("pairing_mode", False):
+            await self.start_paired_trading()
+            return
+        if self.config.pairs_per_account > 1:
+            await self.start_multi_pair_trading(self.config.pairs_per_account)
+            return
+        
         await self.initialize_client()
         
         # Mostrar configuração para debug
         self.debug_config()
         
+        # Retomar ciclo interrompido por restart (se o par ainda estiver íntegro)
+        await self.recover_in_flight_cycle()
+        
+        # Profiling sob demanda: SIGUSR1 ou "profiling": {"cycles": N}
+        self.profiler.install_signal(asyncio.get_running_loop())
+        self.profiler.request(int(self.config.get("profiling", {}).get("cycles", 0)))
+        
         cycle_number = 0
         
         while True:
             cycle_number += 1
+            if self.max_cycles is not None and cycle_number > self.max_cycles:
+                break
+            if self.reload_config():
+                self.debug_config()
+            # Entre ciclos, nada em hold: único ponto em que um restart é seguro
+            if self.memory.on_cycle(cycle_number) and not self._positions_open:
+                self.restart_requested = True
+                break
+            self.profiler.begin_cycle(cycle_number)
+            self.status.update(self.trader_address, cycle=cycle_number, symbol=None, legs=[], hold_until=None)
+            self._set_stage("check_positions")
             logger.info("=" * 70)
             logger.info(f"🔄 CICLO #{cycle_number} - Verificando posições abertas...")
             logger.info("=" * 70)
             
             # CRÍTICO: Verificar posições abertas ANTES de continuar
-            positions = await get_open_positions(self.trader_client)
+            positions = await self._positions_or_none()
+            if positions is None:
+                await asyncio.sleep(10)
+                continue
+            self.indices.sync(self.trader_address, positions)
             
             if positions:
-                long_count = sum(1 for p in positions if p["is_long"])
-                short_count = sum(1 for p in positions if not p["is_long"])
+                long_count = positions.long_count
+                short_count = positions.short_count
                 
                 logger.warning(f"⚠️ POSIÇÕES ABERTAS ENCONTRADAS!")
                 logger.warning(f"   Total: {len(positions)} | Long: {long_count} | Short: {short_count}")
@@ -126,10 +239,11 @@ class TradingManager:
                 logger.warning("🔧 FECHANDO TODAS antes de novo ciclo...")
                 await self.close_all_positions()
                 force_close_state()
+                self._end_cycle("stale_positions")
                 
                 # Aguardar 5s e verificar novamente
                 await asyncio.sleep(5)
-                positions_check = await get_open_positions(self.trader_client)
+                positions_check = await self._positions_or_none()
                 
                 if positions_check:
                     logger.error(f"🚨 AINDA HÁ {len(positions_check)} POSIÇÕES ABERTAS!")
@@ -137,23 +251,23 @@ class TradingManager:
                     await self.close_all_positions()
                     await asyncio.sleep(5)
                 
+                self._scheduler.invalidate()
                 continue
             
-            # Carregar mercados
-            df_markets = pd.read_excel(DATA_DIR / "active_pairs.xlsx")
-            if df_markets.empty:
-                logger.warning("Nenhum mercado encontrado. Parando loop.")
-                break
-            
-            # Selecionar mercado
-            market_data = await self.select_market_data(df_markets)
-            if not market_data:
-                logger.error("Falha ao selecionar mercado. Aguardando...")
+            # Mercado, saldo e allowance preparados durante o hold do ciclo anterior
+            self._set_stage("prepare")
+            prepared = await self._scheduler.take()
+            if prepared is None:
+                logger.error("Falha ao preparar ciclo (mercados indisponíveis). Aguardando...")
                 await asyncio.sleep(60)
                 continue
             
-            # Calcular valores
-            max_value = await self.get_max_order_value()
+            market_data = prepared["market_data"]
+            self.profiler.set_pair(market_data["symbol"])
+            self.status.update(self.trader_address, symbol=market_data["symbol"], pair_index=market_data["pair_index"])
+            
+            # Calcular valores (posições já verificadas no início do ciclo)
+            max_value = await self.get_max_order_value(prepared["usdc_balance"], check_positions=False)
             if max_value == 0:
                 logger.warning("Valor máximo de ordem é 0. Pulando ciclo...")
                 await asyncio.sleep(60)
@@ -198,10 +312,15 @@ class TradingManager:
                     continue
                 
                 try:
+                    self._set_stage("open")
                     success = await self.open_delta_neutral_positions(
                         market_data["pair_index"],
                         long_dist[0],
-                        short_dist[0]
+                        short_dist[0],
+                        allowance=prepared["allowance"],
+                        usdc_balance=prepared["usdc_balance"],
+                        symbol=market_data["symbol"],
+                        duration_min=order_duration
                     )
                     
                     # Se não conseguiu abrir ambas, pular para próximo ciclo
@@ -227,101 +346,152 @@ class TradingManager:
                         
                 except Exception as e:
                     logger.error(f"Erro ao abrir posições: {e}")
+                    self._end_cycle("error")
                     await asyncio.sleep(60)
                     continue
             
             # VALIDAÇÃO EXTRA: Verificar que realmente há APENAS 2 posições
+            self._set_stage("validate")
             await asyncio.sleep(2)
-            verify_positions = await get_open_positions(self.trader_client)
+            verify_positions = await self._positions_when_available()
             
             if len(verify_positions) != 2:
                 logger.error(f"🚨 ERRO CRÍTICO: Esperava 2 posições, encontrou {len(verify_positions)}!")
                 logger.error("🔧 FECHANDO TODAS E ABORTANDO CICLO...")
                 await self.close_all_positions()
                 self._positions_open = False
+                self._end_cycle("validation_failed")
                 await asyncio.sleep(5)
                 continue
             
-            long_verify = sum(1 for p in verify_positions if p["is_long"])
-            short_verify = sum(1 for p in verify_positions if not p["is_long"])
+            long_verify = verify_positions.long_count
+            short_verify = verify_positions.short_count
             
             if long_verify != 1 or short_verify != 1:
                 logger.error(f"🚨 DELTA NEUTRO PERDIDO! Long={long_verify}, Short={short_verify}")
                 logger.error("🔧 FECHANDO TODAS E ABORTANDO CICLO...")
                 await self.close_all_positions()
                 self._positions_open = False
+                self._end_cycle("validation_failed")
                 await asyncio.sleep(5)
                 continue
             
             logger.success(f"✅ VALIDADO: {long_verify} LONG + {short_verify} SHORT (Delta Neutro OK!)")
+            # Hold contado a partir da confirmação das pernas, não do fim da validação
+            hold = HoldDeadline(order_duration * 60, anchor=self._legs_confirmed_at)
+            self.journal.opened(self._cycle_id, time.time() + hold.deadline - time.monotonic())
+            
+            # Fechamentos pré-construídos: anomalia/prazo disparam sem montar nada
+            self._unwinder = EmergencyUnwinder(self.trader_client, self.config)
+            await self._unwinder.arm(self._open_legs, {pos.key: pos.collateral for pos in verify_positions})
+            self._unwinder.start_refresh()
+            
+            # Alimentar o stream de preços do controle de slippage: um preço médio por
+            # ciclo (as duas pernas no mesmo instante dariam dt≈0 e inflariam o sigma)
+            open_prices = [
+                pos["open_price"] for pos in verify_positions
+                if pos["pair_index"] == market_data["pair_index"] and pos["open_price"]
+            ]
+            if open_prices:
+                self.slippage.record_price(market_data["pair_index"], sum(open_prices) / len(open_prices))
             
             # Resetar contador de falhas (sucesso!)
             self._consecutive_failures = 0
             
-            logger.info(f"📡 Monitorando por {order_duration} minutos com Watchdog a cada 5s...")
+            # Preparar o próximo ciclo em paralelo com o hold
+            self._scheduler.start_prefetch()
+            
+            logger.info(
+                f"📡 Monitorando por {order_duration} minutos com Watchdog a cada 5s "
+                f"(fechamento em {hold.remaining():.1f}s)..."
+            )
             
-            # Usar watchdog para monitorar
-            from src.watchdog import PositionWatchdog
-            watchdog = PositionWatchdog(self.trader_client, expected_positions=2)
+            # Watchdog compartilhado (um loop para todas as contas do processo) em
+            # paralelo ao prazo; o fechamento é armado em deadline - latência de inclusão
+            from src.watchdog import get_fleet_watchdog
+            watchdog = get_fleet_watchdog(self.trader_client)
             
-            monitor_ok = await watchdog.start_monitoring(order_duration * 60)
+            self._set_stage("hold", legs=list(self._open_legs), cycle_id=self._cycle_id,
+                            hold_until=time.time() + hold.remaining())
+            monitor_ok = await hold.run(watchdog.watch(self.trader_address, self._open_legs))
+            self._set_stage("close")
             
             if not monitor_ok:
                 logger.error("🚨 Watchdog detectou anomalia - fechando tudo!")
-                await self.close_all_positions()
+                await self._unwind("anomaly")
                 self._positions_open = False
+                self._end_cycle("anomaly")
                 continue
             
             logger.info("⏳ Encerrando ciclo — fechando todas as posições.")
-            await self.close_all_positions()
+            await self._unwind("deadline")
             force_close_state()
             self._positions_open = False  # Resetar flag
+            self._end_cycle("deadline")
             
             delay = self.get_random_from_range("delay_between_trading_cycles_min")
             logger.info(f"Aguardando {delay} minutos antes do próximo ciclo...")
-            await asyncio.sleep(delay * 60)
+            self._set_stage("delay", legs=[], hold_until=None, next_cycle_at=time.time() + delay * 60)
+            await asyncio.gather(
+                self._scheduler.refresh_after_close(),
+                asyncio.sleep(delay * 60)
+            )
+        
+        self.profiler.shutdown()  # Grava o perfil parcial se o bot parar no meio
 
     async def open_delta_neutral_positions(
         self,
         pair_index: int,
         long_value: float,
-        short_value: float
+        short_value: float,
+        allowance: Optional[float] = None,
+        usdc_balance: Optional[float] = None,
+        symbol: str = "",
+        duration_min: float = 0,
+        exclusive: bool = True
     ) -> bool:
         """
         Abre delta neutro BASEADO NO EXEMPLO OFICIAL DA AVANTIS.
         Simplificado: SDK gerencia nonce automaticamente.
+        
+        Args:
+            allowance: Allowance já conhecido (prefetch); None busca na chain
+            usdc_balance: Saldo já conhecido, usado na pré-validação
+            symbol, duration_min: Registrados no journal para retomar o ciclo após restart
+            exclusive: Se False (modo multi-par), aceita outros pares já abertos
+                e, em caso de falha, fecha só as pernas deste par
         """
-        leverage = self.config.get("max_leverage", 10)
+        leverage = int(self.config.max_leverage)  # Validada no Settings (SDK espera inteiro)
         trader = self.trader_client.get_signer().get_ethereum_address()
         
         # PRÉ-VALIDAÇÃO: Verificar posições e encontrar índices livres
-        existing_positions = await get_open_positions(self.trader_client)
+        # O alocador é sincronizado pelo snapshot do início do ciclo - só busca
+        # posições na chain se ainda não houver sincronização para a conta
+        if not self.indices.is_synced(trader):
+            self.indices.sync(trader, await self._positions_when_available())
         
-        if existing_positions:
-            logger.error(f"🚨 Já existem {len(existing_positions)} posições!")
-            for pos in existing_positions:
-                side = "LONG" if pos["is_long"] else "SHORT"
-                logger.error(f"   {side} | Index: {pos['trade_index']}")
+        if exclusive and self.indices.has_open(trader):
+            logger.error("🚨 Já existem posições abertas (alocador de índices)!")
             return False
+        if self.indices.occupied(trader, pair_index):
+            logger.error(f"🚨 Par {pair_index} já tem posições abertas!")
+            return False
+        expected_total = 2 if exclusive else len(self._slots) * 2 + 2
         
-        # Encontrar índices livres (começar de 0 e 1)
-        used_indices = [p["trade_index"] for p in existing_positions] if existing_positions else []
-        
-        # Encontrar primeiro índice livre para long
-        long_index = 0
-        while long_index in used_indices:
-            long_index += 1
+        long_index = self.indices.allocate(trader, pair_index)
+        short_index = self.indices.allocate(trader, pair_index)
         
-        # Encontrar segundo índice livre para short
-        short_index = long_index + 1
-        while short_index in used_indices:
-            short_index += 1
+        def release_legs():
+            self.indices.release(trader, pair_index, long_index)
+            self.indices.release(trader, pair_index, short_index)
         
         logger.info(f"📍 Usando índices: LONG={long_index}, SHORT={short_index}")
+        self._open_legs = [(pair_index, long_index, True), (pair_index, short_index, False)]
         
         # VERIFICAR E APROVAR ALLOWANCE UMA VEZ (como no exemplo oficial)
         total_collateral = long_value + short_value
-        allowance = await self.trader_client.get_usdc_allowance_for_trading(trader)
+        if allowance is None:
+            allowance = await self.trader_client.get_usdc_allowance_for_trading(trader)
         
         if allowance < total_collateral:
             logger.info(f"💰 Aprovando {total_collateral * 3:.0f} USDC...")
@@ -331,29 +501,68 @@ class TradingManager:
             logger.info("⏳ Aguardando 3s após approval...")
             await asyncio.sleep(3.0)
         
+        slippage = self.slippage.get_slippage(pair_index)
+        
+        # PRÉ-VALIDAÇÃO: simular ambas as pernas (eth_call) antes de gastar gas
+        if self.config.get("preflight_simulation", True):
+            ok, reason = await preflight_delta_neutral(
+                self.trader_client,
+                pair_index=pair_index,
+                long_value=long_value,
+                short_value=short_value,
+                leverage=leverage,
+                long_index=long_index,
+                short_index=short_index,
+                slippage_percentage=slippage,
+                usdc_balance=usdc_balance
+            )
+            if not ok:
+                logger.error(f"🧪 Pré-validação rejeitou o par/tamanho: {reason}")
+                release_legs()
+                return False
+        
         logger.info("🔄 Abrindo delta neutro...")
         
+        # WRITE-AHEAD: registrar o ciclo antes do primeiro broadcast
+        self._cycle_id = self.journal.begin(
+            pair_index, symbol, long_index, short_index, trader, duration_min
+        )
+        set_ledger_cycle(self._cycle_id)  # Receipts desta task entram no PnL do ciclo
+        
         import time as time_module
         start_time = time_module.time()
         
         # ABRIR LONG
-        logger.info(f"1️⃣ Abrindo LONG (index={long_index})...")
+        logger.info(f"1️⃣ Abrindo LONG (index={long_index}, slippage={slippage}%)...")
         long_success = await open_position_direct(
             self.trader_client,
             pair_index=pair_index,
             collateral=long_value,
             is_long=True,
             leverage=leverage,
-            trade_index=long_index
+            trade_index=long_index,
+            slippage_percentage=slippage
         )
+        long_time = time_module.time()
+        metrics.record("open_leg_latency", long_time - start_time)
+        self.journal.leg(self._cycle_id, "LONG", long_index, long_success)
         
         if not long_success:
             logger.error("❌ LONG falhou")
+            self.slippage.record_revert(pair_index)
+            self._end_cycle("long_failed")
+            release_legs()
             return False
         
-        # CRÍTICO: Aguardar nonce atualizar no node (FIXO em 3s)
+        self.slippage.record_fill(pair_index)
+        
+        # Montar o fechamento do LONG durante a espera: se o SHORT falhar, sai em um bloco
+        unwinder = EmergencyUnwinder(self.trader_client, self.config)
+        arm_task = asyncio.create_task(unwinder.arm(self._open_legs[:1]))
+        
+        # CRÍTICO: Aguardar nonce atualizar no node (nonce_delay_seconds, padrão 3s)
         # Node RPC precisa de tempo para atualizar cache de nonce
-        delay = 3.0  # FIXO: 3 segundos (mais seguro que 2s)
+        delay = self.config.nonce_delay_seconds
         logger.info(f"⏳ Aguardando {delay}s para nonce atualizar...")
         await asyncio.sleep(delay)
         
@@ -365,18 +574,30 @@ class TradingManager:
             collateral=short_value,
             is_long=False,
             leverage=leverage,
-            trade_index=short_index
+            trade_index=short_index,
+            slippage_percentage=slippage
         )
         
         total_time = time_module.time() - start_time
+        metrics.record("leg_gap", time_module.time() - long_time)
+        self._legs_confirmed_at = time_module.monotonic()
+        self.journal.leg(self._cycle_id, "SHORT", short_index, short_success)
+        if short_success:
+            self.slippage.record_fill(pair_index)
+        else:
+            self.slippage.record_revert(pair_index)
         logger.info(f"📊 LONG={'✅' if long_success else '❌'} | SHORT={'✅' if short_success else '❌'} | {total_time:.1f}s")
         
         # VERIFICAR ATOMICIDADE
         if long_success and short_success:
+            # O fechamento pré-construído do LONG só serve se o SHORT falhar
+            arm_task.cancel()
+            await asyncio.gather(arm_task, return_exceptions=True)
+            
             # Aguardar posições serem registradas (até 20s)
             from src.watchdog import wait_for_positions_registered
             
-            registered = await wait_for_positions_registered(self.trader_client, expected_count=2, max_wait=20)
+            registered = await wait_for_positions_registered(self.trader_client, expected_count=expected_total, max_wait=20)
             
             if registered:
                 logger.success("🎯 DELTA NEUTRO CONFIRMADO - Ambas registradas!")
@@ -385,19 +606,158 @@ class TradingManager:
                 logger.error("❌ Posições NÃO foram registradas corretamente")
                 logger.warning("🔧 Tentando fechar tudo...")
                 await asyncio.sleep(5)
-                await self.close_all_positions()
+                await (self.close_all_positions() if exclusive else self._close_legs(self._open_legs))
+                self._end_cycle("not_registered")
+                self.indices.invalidate(trader)
                 return False
         else:
             logger.error("❌ SHORT falhou - fechando LONG...")
-            await asyncio.sleep(5)
-            await self.close_all_positions()
+            remaining = self._open_legs[:1]
+            try:
+                if await arm_task:
+                    remaining = await unwinder.fire("short_failed")
+            except Exception as e:
+                # Sem o fechamento pré-construído o LONG ainda precisa sair pelo caminho normal
+                logger.warning(f"⚠️ Unwind pré-construído indisponível ({e}) - fechando pelo caminho normal")
+            if remaining:
+                await asyncio.sleep(5)
+                await (self.close_all_positions() if exclusive else self._close_legs(self._open_legs))
+            self._end_cycle("short_failed")
+            release_legs()
             return False
 
-    async def close_all_positions(self) -> None:
-        """Fecha todas as posições abertas."""
+    async def _unwind(self, reason: str) -> None:
+        """Fecha o par pelos fechamentos pré-construídos; o que sobrar vai pelo caminho normal."""
+        unwinder, self._unwinder = self._unwinder, None
+        legs = unwinder.armed_legs if unwinder else []
+        if not legs:
+            await self.close_all_positions()
+            return
+        
+        remaining = await unwinder.fire(reason)
+        for pair_index, trade_index, is_long in legs:
+            if (pair_index, trade_index, is_long) not in remaining:
+                self.indices.release(self.trader_address, pair_index, trade_index)
+        if remaining:
+            await self.close_all_positions()
+
+    def _end_cycle(self, reason: str) -> None:
+        """Marca o ciclo atual como encerrado no journal."""
+        if self._cycle_id:
+            self.journal.closed(self._cycle_id, reason)
+            get_ledger(self.trader_address).end_cycle(self._cycle_id)
+            self._cycle_id = None
+            set_ledger_cycle(None)
+        for lane, stats in get_rate_limiter().stats().items():
+            logger.debug(
+                f"RPC {lane}: fila {stats['queue_depth']} | espera p50 {stats['wait_p50']:.3f}s p90 {stats['wait_p90']:.3f}s"
+            )
+        lag_monitor = get_loop_monitor()
+        if lag_monitor is not None:
+            lag = lag_monitor.stats()
+            logger.debug(
+                f"Event loop: lag p50 {(lag['p50'] or 0) * 1000:.1f}ms p99 {(lag['p99'] or 0) * 1000:.1f}ms | "
+                f"máx {lag['max'] * 1000:.0f}ms | travamentos {lag['stalls']}"
+            )
+
+    async def _positions_or_none(self, trader_client=None) -> Optional[PositionSnapshot]:
+        """Snapshot de posições; None se o RPC falhou (quem chama pula o tick)."""
+        try:
+            return await get_open_positions(trader_client or self.trader_client)
+        except Exception as e:
+            logger.warning(f"⚠️ Posições indisponíveis ({e}) - pulando verificação")
+            return None
+
+    async def _positions_when_available(self, trader_client=None, interval: float = 5) -> PositionSnapshot:
+        """Snapshot de posições, aguardando o RPC voltar (fechamento e recuperação não podem pular)."""
+        while True:
+            positions = await self._positions_or_none(trader_client)
+            if positions is not None:
+                return positions
+            await asyncio.sleep(interval)
+
+    async def recover_in_flight_cycle(self) -> None:
+        """
+        Retoma um ciclo interrompido por restart usando o journal.
+        
+        Se o par 1L+1S do ciclo ainda estiver aberto, ele é adotado e monitorado
+        até o prazo original. Apenas pernas órfãs (fora do par) são fechadas.
+        """
+        cycle = self.journal.in_flight(self.trader_address)
+        if cycle is None:
+            return
+        
+        self._cycle_id = cycle["cycle_id"]
+        positions = await self._positions_when_available()
+        if not positions:
+            logger.info(f"📒 Ciclo {self._cycle_id} do journal não tem posições abertas - encerrando registro")
+            self._end_cycle("recovery_empty")
+            return
+        
+        def belongs(pos, is_long, trade_index):
+            return (pos["pair_index"] == cycle["pair_index"]
+                    and pos["is_long"] == is_long
+                    and pos["trade_index"] == trade_index)
+        
+        long_leg = [p for p in positions if belongs(p, True, cycle["long_index"])]
+        short_leg = [p for p in positions if belongs(p, False, cycle["short_index"])]
+        matched = long_leg + short_leg
+        orphans = [p for p in positions if p not in matched]
+        
+        if orphans:
+            logger.warning(f"📒 Fechando {len(orphans)} perna(s) órfã(s) fora do ciclo {self._cycle_id}")
+            await asyncio.gather(*[
+                close_position(self.trader_client, p["pair_index"], p["trade_index"], p["collateral"])
+                for p in orphans
+            ], return_exceptions=True)
+        
+        if len(long_leg) != 1 or len(short_leg) != 1 or not cycle.get("close_at"):
+            logger.warning(f"📒 Ciclo {self._cycle_id} incompleto (L={len(long_leg)}, S={len(short_leg)}) - fechando")
+            await self.close_all_positions()
+            force_close_state()
+            self._end_cycle("recovery_incomplete")
+            return
+        
+        remaining = cycle["close_at"] - time.time()
+        logger.success(
+            f"📒 Ciclo {self._cycle_id} retomado: {cycle.get('symbol') or cycle['pair_index']} "
+            f"(LONG={cycle['long_index']}, SHORT={cycle['short_index']}) | {max(remaining, 0):.0f}s restantes"
+        )
+        self._positions_open = True
+        
+        if remaining > 0:
+            from src.watchdog import get_fleet_watchdog
+            self._open_legs = [
+                (cycle["pair_index"], cycle["long_index"], True),
+                (cycle["pair_index"], cycle["short_index"], False)
+            ]
+            watchdog = get_fleet_watchdog(self.trader_client)
+            hold = HoldDeadline(remaining)
+            if not await hold.run(watchdog.watch(self.trader_address, self._open_legs)):
+                logger.error("🚨 Watchdog detectou anomalia no ciclo retomado - fechando tudo!")
+                await self.close_all_positions()
+                self._positions_open = False
+                self._end_cycle("anomaly")
+                return
+        
+        logger.info("⏳ Encerrando ciclo retomado — fechando todas as posições.")
+        await self.close_all_positions()
+        force_close_state()
+        self._positions_open = False
+        self._end_cycle("deadline")
+
+    async def close_all_positions(self, trader_client=None) -> None:
+        """
+        Fecha todas as posições abertas.
+        
+        Args:
+            trader_client: Conta a fechar (default: conta principal)
+        """
+        trader_client = trader_client or self.trader_client
+        trader_address = trader_client.get_signer().get_ethereum_address()
         logger.info("⚡ Iniciando fechamento de posições...")
         
-        positions = await get_open_positions(self.trader_client)
+        positions = await self._positions_when_available(trader_client)
         
         if not positions:
             logger.info("Nenhuma posição aberta para fechar.")
@@ -408,7 +768,7 @@ class TradingManager:
         for pos in positions:
             tasks.append(
                 close_position(
-                    self.trader_client,
+                    trader_client,
                     pair_index=pos["pair_index"],
                     trade_index=pos["trade_index"],
                     collateral_to_close=pos["collateral"]
@@ -418,8 +778,400 @@ class TradingManager:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         success_count = sum(1 for r in results if r is True)
         
+        # Receipts de fechamento liberam os índices localmente
+        for pos, result in zip(positions, results):
+            if result is True:
+                self.indices.release(trader_address, pos["pair_index"], pos["trade_index"])
+        
         logger.info(f"✅ {success_count}/{len(positions)} posições fechadas com sucesso")
 
+    async def start_multi_pair_trading(self, max_pairs: int) -> None:
+        """
+        Modo multi-par: a conta mantém até K pares delta neutros em mercados
+        diferentes ao mesmo tempo, cada um com seus índices, hold e prazo próprios.
+        Todos são monitorados por um único snapshot de posições por tick.
+        K efetivo é limitado pelo saldo livre e pela max_leverage.
+        """
+        await self.initialize_client()
+        self.debug_config()
+        logger.info(f"🧩 Modo multi-par: até {max_pairs} pares simultâneos")
+        
+        positions = await self._positions_when_available()
+        if positions:
+            logger.warning(f"⚠️ {len(positions)} posições abertas antes do início - fechando todas...")
+            await self.close_all_positions()
+            force_close_state()
+            await asyncio.sleep(5)
+        self.indices.sync(self.trader_address, await self._positions_when_available())
+        
+        check_interval = 5
+        cooldown_until: List[float] = []  # Vagas em espera (delay entre ciclos), monotonic
+        failures = 0
+        
+        while True:
+            now = time.monotonic()
+            self.reload_config()  # Vale para os próximos pares; os abertos mantêm seu prazo
+            
+            # 1. Fechar pares cujo hold terminou
+            for cycle_id, slot in list(self._slots.items()):
+                if now >= slot["deadline"]:
+                    logger.info(f"⏳ [{slot['symbol']}] Hold encerrado — fechando par")
+                    await self._close_slot(cycle_id, "deadline")
+                    delay = self.get_random_from_range("delay_between_trading_cycles_min")
+                    cooldown_until.append(now + delay * 60)
+            
+            # 2. Abrir novos pares nas vagas livres
+            cooldown_until = [t for t in cooldown_until if t > now]
+            if max_pairs - len(self._slots) - len(cooldown_until) > 0:
+                opened = await self._open_slot(max_pairs - len(self._slots))
+                if opened is None:
+                    pass  # Sem saldo/mercado para mais um par agora
+                elif opened:
+                    failures = 0
+                else:
+                    failures += 1
+                    cooldown_until.append(now + 60)
+                    if failures >= self._max_consecutive_failures:
+                        logger.error("🚨 MUITAS FALHAS CONSECUTIVAS - fechando tudo e PARANDO BOT!")
+                        for cycle_id in list(self._slots):
+                            await self._close_slot(cycle_id, "stopped")
+                        break
+            
+            # 3. Um snapshot para todos os pares
+            if self._slots:
+                await self._check_slots()
+            
+            self.status.update(self.trader_address, stage="multi_pair", slots=[
+                {"cycle_id": slot["cycle_id"], "symbol": slot["symbol"], "legs": slot["legs"],
+                 "hold_until": time.time() + slot["deadline"] - time.monotonic()}
+                for slot in self._slots.values()
+            ])
+            await asyncio.sleep(check_interval)
+
+    async def _open_slot(self, remaining_slots: int) -> Optional[bool]:
+        """
+        Abre mais um par delta neutro (modo multi-par).
+        
+        Returns:
+            True se abriu, False se falhou, None se não há saldo/mercado para abrir
+        """
+        usdc_balance = await get_usdc_balance(self.trader_client)
+        max_leverage = self.config.max_leverage
+        budget = usdc_balance * max_leverage / max(remaining_slots, 1)
+        order_value = min(self.get_random_from_range("order_value_usd"), budget)
+        
+        AVANTIS_MIN_POSITION = 10.0
+        if order_value / 2 < AVANTIS_MIN_POSITION:
+            logger.debug(f"Saldo livre insuficiente para mais um par (${usdc_balance:.2f})")
+            return None
+        
+        df_markets = await asyncio.to_thread(pd.read_excel, DATA_DIR / "active_pairs.xlsx")
+        used = {slot["symbol"] for slot in self._slots.values()}
+        market_data = await self.select_market_data(df_markets, exclude_symbols=used)
+        if not market_data:
+            return None
+        
+        order_duration = self.get_random_from_range("order_duration_min")
+        long_dist, short_dist = calc_value_distribution(
+            order_value, 1, 1, market_data["symbol"].split("/")[0], 0,
+            self.config.get("orders_distribution_noise", 0)
+        )
+        
+        async with self._trading_lock:
+            success = await self.open_delta_neutral_positions(
+                market_data["pair_index"], long_dist[0], short_dist[0],
+                usdc_balance=usdc_balance,
+                symbol=market_data["symbol"],
+                duration_min=order_duration,
+                exclusive=False
+            )
+            if not success:
+                return False
+            
+            self.journal.opened(self._cycle_id, time.time() + order_duration * 60)
+            self._slots[self._cycle_id] = {
+                "cycle_id": self._cycle_id,
+                "symbol": market_data["symbol"],
+                "pair_index": market_data["pair_index"],
+                "legs": list(self._open_legs),
+                "deadline": time.monotonic() + order_duration * 60
+            }
+            self._cycle_id = None
+            set_ledger_cycle(None)  # O fechamento do slot reatribui via ledger_cycle(cycle_id)
+        
+        logger.success(f"🧩 Par {market_data['symbol']} aberto | {len(self._slots)} par(es) ativos | hold {order_duration} min")
+        return True
+
+    async def _check_slots(self) -> None:
+        """Valida todos os pares ativos com um único snapshot; anomalia fecha o par afetado."""
+        snapshot = await self._positions_or_none()
+        if snapshot is None:
+            return
+        expected_keys = set()
+        for cycle_id, slot in list(self._slots.items()):
+            slot_keys = set(slot["legs"])
+            expected_keys |= slot_keys
+            missing = slot_keys - snapshot.keys
+            if missing:
+                logger.error(f"🚨 [{slot['symbol']}] DELTA NEUTRO PERDIDO - {len(missing)} perna(s) sumiram!")
+                await self._close_slot(cycle_id, "anomaly")
+        
+        extra = [p for p in snapshot if p.key not in expected_keys]
+        if extra:
+            logger.error(f"🚨 {len(extra)} posição(ões) fora dos pares ativos - fechando")
+            await asyncio.gather(*[
+                close_position(self.trader_client, p.pair_index, p.trade_index, p.collateral) for p in extra
+            ], return_exceptions=True)
+
+    async def _close_slot(self, cycle_id: str, reason: str) -> None:
+        slot = self._slots.pop(cycle_id)
+        with ledger_cycle(cycle_id):
+            await self._close_legs(slot["legs"])
+        self.journal.closed(cycle_id, reason)
+        get_ledger(self.trader_address).end_cycle(cycle_id)
+
+    async def _close_legs(self, legs: List) -> None:
+        """Fecha apenas as pernas informadas [(pair_index, trade_index, is_long)]."""
+        keys = set(legs)
+        positions = await self._positions_when_available()
+        targets = [p for p in positions if p.key in keys]
+        results = await asyncio.gather(*[
+            close_position(self.trader_client, p.pair_index, p.trade_index, p.collateral) for p in targets
+        ], return_exceptions=True)
+        for pos, result in zip(targets, results):
+            if result is True:
+                self.indices.release(self.trader_address, pos.pair_index, pos.trade_index)
+        logger.info(f"✅ {sum(1 for r in results if r is True)}/{len(targets)} pernas fechadas")
+
+    async def start_paired_trading(self) -> None:
+        """
+        Modo pareado: as contas ativas de accounts.xlsx são agrupadas em pares.
+        Em cada par uma carteira abre o LONG e a outra o SHORT no mesmo instante,
+        cada uma com seu próprio nonce - o delta neutro vale no nível da frota,
+        sem o gap de nonce entre as pernas. Os papéis alternam a cada ciclo.
+        """
+        df_accounts = pd.read_excel(DATA_DIR / "accounts.xlsx")
+        private_keys = df_accounts[df_accounts["is_active"] == True]["private_key"].tolist()
+        
+        if len(private_keys) < 2:
+            logger.error("🚨 Modo pareado requer pelo menos 2 contas ativas em accounts.xlsx")
+            return
+        if len(private_keys) % 2:
+            logger.warning(f"⚠️ Número ímpar de contas - a última ({len(private_keys)}ª) ficará fora dos pares")
+        
+        clients = [get_trader_client(pk) for pk in private_keys[:len(private_keys) // 2 * 2]]
+        self.trader_client = clients[0]  # Leituras compartilhadas (pares, mercados)
+        self.trader_address = self.trader_client.get_signer().get_ethereum_address()
+        await self._start_signer_service()
+        self.debug_config()
+        
+        pairs = list(zip(clients[0::2], clients[1::2]))
+        logger.info(f"🤝 Modo pareado: {len(pairs)} par(es) de carteiras")
+        
+        await asyncio.gather(*[
+            self._run_paired_loop(client_a, client_b, pair_number)
+            for pair_number, (client_a, client_b) in enumerate(pairs, 1)
+        ])
+
+    async def _run_paired_loop(self, client_a, client_b, pair_number: int) -> None:
+        """Loop de ciclos de um par de carteiras."""
+        tag = f"[PAR {pair_number}]"
+        long_client, short_client = client_a, client_b
+        failures = 0
+        cycle_number = 0
+        addresses = [client.get_signer().get_ethereum_address() for client in (client_a, client_b)]
+        
+        def set_stage(stage: str, **fields) -> None:
+            for address in addresses:
+                self.status.set_stage(address, stage, pair=pair_number, cycle=cycle_number, **fields)
+        
+        while True:
+            cycle_number += 1
+            self.reload_config()
+            logger.info(f"🔄 {tag} CICLO #{cycle_number}")
+            set_stage("check_positions", symbol=None, hold_until=None)
+            
+            snapshots = await asyncio.gather(
+                self._positions_or_none(long_client), self._positions_or_none(short_client)
+            )
+            if None in snapshots:
+                await asyncio.sleep(10)
+                continue
+            for client, snapshot in zip((long_client, short_client), snapshots):
+                self.indices.sync(client.get_signer().get_ethereum_address(), snapshot)
+            if any(snapshots):
+                logger.warning(f"{tag} ⚠️ Posições abertas encontradas - fechando nas duas carteiras...")
+                await asyncio.gather(self.close_all_positions(long_client), self.close_all_positions(short_client))
+                await asyncio.sleep(5)
+                continue
+            
+            df_markets = await asyncio.to_thread(pd.read_excel, DATA_DIR / "active_pairs.xlsx")
+            market_data = await self.select_market_data(df_markets)
+            if not market_data:
+                await asyncio.sleep(60)
+                continue
+            
+            # Cada carteira coloca metade do valor; limitar pelo menor saldo
+            balances = await asyncio.gather(get_usdc_balance(long_client), get_usdc_balance(short_client))
+            max_leverage = self.config.max_leverage
+            order_value = min(self.get_random_from_range("order_value_usd"), 2 * min(balances) * max_leverage)
+            order_duration = self.get_random_from_range("order_duration_min")
+            long_dist, short_dist = calc_value_distribution(
+                order_value, 1, 1, market_data["symbol"].split("/")[0], 0,
+                self.config.get("orders_distribution_noise", 0)
+            )
+            
+            AVANTIS_MIN_POSITION = 10.0  # Mínimo $10 por posição
+            if long_dist[0] < AVANTIS_MIN_POSITION or short_dist[0] < AVANTIS_MIN_POSITION:
+                logger.error(
+                    f"{tag} ❌ Valores muito pequenos! Long: ${long_dist[0]:.2f}, Short: ${short_dist[0]:.2f} "
+                    f"(saldos ${balances[0]:.2f} / ${balances[1]:.2f}) - Avantis requer mínimo ~${AVANTIS_MIN_POSITION} por posição"
+                )
+                await asyncio.sleep(60)
+                continue
+            
+            opened = await self.open_cross_account_pair(
+                long_client, short_client, market_data["pair_index"], long_dist[0], short_dist[0],
+                symbol=market_data["symbol"], duration_min=order_duration
+            )
+            
+            if opened is None:
+                failures += 1
+                logger.error(f"{tag} ❌ Falha {failures}/{self._max_consecutive_failures}")
+                if failures >= self._max_consecutive_failures:
+                    logger.error(f"{tag} 🚨 MUITAS FALHAS CONSECUTIVAS - PARANDO PAR!")
+                    return
+                await asyncio.sleep(self.get_random_from_range("delay_between_trading_cycles_min") * 60)
+                continue
+            
+            failures = 0
+            cycle_id, legs = opened
+            self.journal.opened(cycle_id, time.time() + order_duration * 60)
+            logger.info(f"{tag} 📡 Monitorando por {order_duration} minutos...")
+            set_stage("hold", symbol=market_data["symbol"], hold_until=time.time() + order_duration * 60)
+            monitor_ok = await self._watch_paired(legs, order_duration * 60)
+            if not monitor_ok:
+                logger.error(f"{tag} 🚨 Anomalia em uma das carteiras - desfazendo as duas pernas!")
+            
+            with ledger_cycle(cycle_id):
+                await asyncio.gather(self.close_all_positions(long_client), self.close_all_positions(short_client))
+            self.journal.closed(cycle_id, "deadline" if monitor_ok else "anomaly")
+            for address in legs:
+                get_ledger(address).end_cycle(cycle_id)
+            
+            # Alternar papéis: cada carteira alterna entre LONG e SHORT
+            long_client, short_client = short_client, long_client
+            
+            delay = self.get_random_from_range("delay_between_trading_cycles_min")
+            logger.info(f"{tag} Aguardando {delay} minutos antes do próximo ciclo...")
+            set_stage("delay", hold_until=None, next_cycle_at=time.time() + delay * 60)
+            await asyncio.sleep(delay * 60)
+
+    async def open_cross_account_pair(
+        self,
+        long_client,
+        short_client,
+        pair_index: int,
+        long_value: float,
+        short_value: float,
+        symbol: str = "",
+        duration_min: float = 0
+    ) -> Optional[Tuple[str, Dict[str, List]]]:
+        """
+        Abre LONG na carteira A e SHORT na carteira B simultaneamente.
+        Se apenas uma perna preencher, ela é fechada na hora (unwind do parceiro).
+        
+        Returns:
+            (cycle_id, {endereço: [(pair_index, trade_index, is_long)]}) se ambas abriram,
+            None caso contrário (o ciclo já fica encerrado no journal)
+        """
+        leverage = int(self.config.max_leverage)  # Validada no Settings (SDK espera inteiro)
+        long_trader = long_client.get_signer().get_ethereum_address()
+        short_trader = short_client.get_signer().get_ethereum_address()
+        
+        # Snapshot recém-lido no início do ciclo: ambas as contas estão flat
+        for client, trader in ((long_client, long_trader), (short_client, short_trader)):
+            if not self.indices.is_synced(trader):
+                self.indices.sync(trader, await self._positions_when_available(client))
+        long_index = self.indices.allocate(long_trader, pair_index)
+        short_index = self.indices.allocate(short_trader, pair_index)
+        
+        # Allowance de cada carteira (fora do caminho crítico das pernas)
+        for client, trader, value in ((long_client, long_trader, long_value), (short_client, short_trader, short_value)):
+            if await client.get_usdc_allowance_for_trading(trader) < value:
+                logger.info(f"💰 [{trader[:10]}] Aprovando {value * 3:.0f} USDC...")
+                await client.approve_usdc_for_trading(value * 3)
+        
+        slippage = self.slippage.get_slippage(pair_index)
+        logger.info(
+            f"🤝 Abrindo par cruzado: LONG [{long_trader[:10]}] ${long_value:.2f} | "
+            f"SHORT [{short_trader[:10]}] ${short_value:.2f}"
+        )
+        
+        # WRITE-AHEAD: um ciclo para as duas carteiras (a do SHORT entra como parceira)
+        cycle_id = self.journal.begin(
+            pair_index, symbol, long_index, short_index, long_trader, duration_min, partner=short_trader
+        )
+        
+        import time as time_module
+        start_time = time_module.time()
+        with ledger_cycle(cycle_id):  # Receipts das duas carteiras entram no PnL do ciclo
+            long_tx, short_tx = await asyncio.gather(
+                open_position_direct(long_client, pair_index=pair_index, collateral=long_value, is_long=True,
+                                     leverage=leverage, trade_index=long_index, slippage_percentage=slippage),
+                open_position_direct(short_client, pair_index=pair_index, collateral=short_value, is_long=False,
+                                     leverage=leverage, trade_index=short_index, slippage_percentage=slippage)
+            )
+        metrics.record("leg_gap", 0.0 if long_tx and short_tx else time_module.time() - start_time)
+        logger.info(f"📊 LONG={'✅' if long_tx else '❌'} | SHORT={'✅' if short_tx else '❌'} | {time_module.time() - start_time:.1f}s")
+        self.journal.leg(cycle_id, "LONG", long_index, long_tx)
+        self.journal.leg(cycle_id, "SHORT", short_index, short_tx)
+        
+        for tx in (long_tx, short_tx):
+            if tx:
+                self.slippage.record_fill(pair_index)
+            else:
+                self.slippage.record_revert(pair_index)
+        
+        if long_tx and short_tx:
+            return cycle_id, {
+                long_trader: [(pair_index, long_index, True)],
+                short_trader: [(pair_index, short_index, False)]
+            }
+        
+        # Unwind: fechar a perna que preencheu na carteira parceira
+        with ledger_cycle(cycle_id):
+            if long_tx:
+                logger.error("❌ SHORT falhou - fechando LONG na carteira parceira...")
+                await close_position(long_client, pair_index, long_index, long_value)
+            elif short_tx:
+                logger.error("❌ LONG falhou - fechando SHORT na carteira parceira...")
+                await close_position(short_client, pair_index, short_index, short_value)
+        self.indices.release(long_trader, pair_index, long_index)
+        self.indices.release(short_trader, pair_index, short_index)
+        self.journal.closed(cycle_id, "long_failed" if not long_tx else "short_failed")
+        for trader in (long_trader, short_trader):
+            get_ledger(trader).end_cycle(cycle_id)
+        return None
+
+    async def _watch_paired(self, legs: Dict[str, List], duration_seconds: float) -> bool:
+        """Monitora as duas carteiras; anomalia em qualquer uma encerra a outra na hora."""
+        from src.watchdog import get_fleet_watchdog
+        watchdog = get_fleet_watchdog(self.trader_client)
+        tasks = [
+            asyncio.create_task(watchdog.watch(address, address_legs, duration_seconds))
+            for address, address_legs in legs.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                if not await next_done:
+                    return False
+            return True
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def monitor_positions(self, duration_min: int) -> None:
         """
         Monitora as posições durante o período especificado.
@@ -429,21 +1181,23 @@ class TradingManager:
             duration_min: Duração EXATA em minutos
         """
         duration_seconds = duration_min * 60
-        end_time = time.time() + duration_seconds
+        started = time.monotonic()
+        end_time = started + duration_seconds
         
         logger.info(f"📡 Monitoramento iniciado por EXATOS {duration_min} minuto(s) ({duration_seconds}s)")
-        logger.info(f"⏰ Término previsto: {time.strftime('%H:%M:%S', time.localtime(end_time))}")
+        logger.info(f"⏰ Término previsto: {time.strftime('%H:%M:%S', time.localtime(time.time() + duration_seconds))}")
         
         check_interval = 10  # Checar a cada 10 segundos
-        last_log_time = time.time()
+        last_log_time = started
+        next_check = started
         
-        while time.time() < end_time:
+        while time.monotonic() < end_time:
             try:
                 # Log de progresso a cada 30 segundos
-                if time.time() - last_log_time > 30:
-                    remaining = int(end_time - time.time())
+                if time.monotonic() - last_log_time > 30:
+                    remaining = int(end_time - time.monotonic())
                     logger.info(f"⏳ Tempo restante: {remaining}s ({remaining//60}min {remaining%60}s)")
-                    last_log_time = time.time()
+                    last_log_time = time.monotonic()
                 
                 # Verificar posições
                 positions = await get_open_positions(self.trader_client)
@@ -453,8 +1207,8 @@ class TradingManager:
                     break
                 
                 # Contar long e short
-                long_count = sum(1 for p in positions if p["is_long"])
-                short_count = sum(1 for p in positions if not p["is_long"])
+                long_count = positions.long_count
+                short_count = positions.short_count
                 
                 # CRÍTICO: Se não tiver 1 long + 1 short, algo está errado
                 if long_count != 1 or short_count != 1:
@@ -466,10 +1220,12 @@ class TradingManager:
             except Exception as e:
                 logger.warning(f"Erro no monitoramento: {e}")
             
-            await asyncio.sleep(check_interval)
+            # Próxima checagem alinhada ao início (sem drift) e nunca depois do término
+            next_check += check_interval
+            await asyncio.sleep(max(min(next_check, end_time) - time.monotonic(), 0))
         
         # Calcular tempo real decorrido
-        elapsed = int(time.time() - (end_time - duration_seconds))
+        elapsed = int(time.monotonic() - started)
         logger.info(f"⏱️ Monitoramento finalizado após {elapsed}s ({elapsed//60}min {elapsed%60}s)")
 
 
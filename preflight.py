@@ -0,0 +1,185 @@
+"""
+Pré-validação (eth_call) das pernas antes do broadcast e decodificação de reverts.
+Uma perna que reverteria é rejeitada antes de gastar gas - evita o caminho
+LONG preenchido + SHORT revertido + fechamento de emergência.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from avantis_trader_sdk import TraderClient
+from avantis_trader_sdk.types import TradeInput, TradeInputOrderType
+from eth_abi import decode as abi_decode
+from src.config.constants import logger
+from utils import metrics
+
+ERROR_SELECTOR = "08c379a0"  # Error(string)
+PANIC_SELECTOR = "4e487b71"  # Panic(uint256)
+
+PANIC_CODES = {
+    0x01: "assert falhou",
+    0x11: "overflow/underflow aritmético",
+    0x12: "divisão por zero",
+    0x32: "índice fora do array",
+}
+
+CALL_FIELDS = ("from", "to", "data", "value")
+
+
+def decode_revert_reason(data: Any) -> str:
+    """
+    Decodifica o payload de revert (Error(string), Panic(uint256) ou custom error).
+
+    Args:
+        data: bytes ou hex string retornado pelo node
+
+    Returns:
+        Motivo legível
+    """
+    if not data:
+        return "revert sem motivo"
+
+    if isinstance(data, (bytes, bytearray)):
+        payload = bytes(data).hex()
+    else:
+        payload = str(data)
+    payload = payload[2:] if payload.startswith("0x") else payload
+
+    selector, body = payload[:8], bytes.fromhex(payload[8:]) if len(payload) > 8 else b""
+    try:
+        if selector == ERROR_SELECTOR:
+            return abi_decode(["string"], body)[0]
+        if selector == PANIC_SELECTOR:
+            code = abi_decode(["uint256"], body)[0]
+            return f"panic 0x{code:02x} ({PANIC_CODES.get(code, 'desconhecido')})"
+    except Exception:
+        pass
+
+    return f"custom error 0x{selector}"
+
+
+def _extract_revert(error: Exception) -> str:
+    """Extrai o motivo de revert das exceções do web3 (ContractLogicError / ValueError RPC)."""
+    data = getattr(error, "data", None)
+    if isinstance(data, str) and data.startswith("0x"):
+        return decode_revert_reason(data)
+
+    if error.args and isinstance(error.args[0], dict):
+        rpc_error = error.args[0]
+        if isinstance(rpc_error.get("data"), str):
+            return decode_revert_reason(rpc_error["data"])
+        return rpc_error.get("message", str(error))
+
+    message = str(error)
+    if "execution reverted" in message:
+        return message.split("execution reverted", 1)[1].strip(": ") or "revert sem motivo"
+    return message
+
+
+async def simulate_transaction(
+    trader_client: TraderClient,
+    transaction: Dict[str, Any],
+    block_identifier: Any = "latest"
+) -> Tuple[bool, Optional[str]]:
+    """
+    Executa a transação via eth_call sem enviá-la.
+
+    Returns:
+        (True, None) se executaria com sucesso, (False, motivo) se reverteria
+    """
+    call = {k: transaction[k] for k in CALL_FIELDS if k in transaction}
+    try:
+        await trader_client.async_web3.eth.call(call, block_identifier)
+        return True, None
+    except Exception as e:
+        return False, _extract_revert(e)
+
+
+async def explain_failed_transaction(
+    trader_client: TraderClient,
+    transaction: Dict[str, Any],
+    receipt: Dict[str, Any]
+) -> str:
+    """Reexecuta uma transação revertida no bloco dela para obter o motivo."""
+    block_number = receipt.get("blockNumber")
+    block = block_number - 1 if block_number else "latest"
+    ok, reason = await simulate_transaction(trader_client, transaction, block)
+    return reason if not ok else "não reproduzido via eth_call"
+
+
+async def _build_open_tx(
+    trader_client: TraderClient,
+    trader: str,
+    pair_index: int,
+    collateral: float,
+    is_long: bool,
+    leverage: int,
+    trade_index: int,
+    slippage_percentage: float
+) -> Dict[str, Any]:
+    trade_input = TradeInput(
+        trader=trader,
+        open_price=None,
+        pair_index=pair_index,
+        collateral_in_trade=collateral,
+        is_long=is_long,
+        leverage=leverage,
+        index=trade_index,
+        tp=0,
+        sl=0,
+        timestamp=0
+    )
+    return await trader_client.trade.build_trade_open_tx(
+        trade_input,
+        TradeInputOrderType.MARKET,
+        slippage_percentage=slippage_percentage
+    )
+
+
+async def preflight_delta_neutral(
+    trader_client: TraderClient,
+    pair_index: int,
+    long_value: float,
+    short_value: float,
+    leverage: int,
+    long_index: int,
+    short_index: int,
+    slippage_percentage: float,
+    usdc_balance: Optional[float] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Simula LONG e SHORT em paralelo antes de qualquer broadcast.
+
+    Cada eth_call roda isolado (o SHORT não vê o colateral debitado pelo LONG),
+    por isso o saldo para as duas pernas é verificado separadamente.
+
+    Returns:
+        (True, None) se ambas passariam, (False, motivo) caso contrário
+    """
+    trader = trader_client.get_signer().get_ethereum_address()
+    start = time.perf_counter()
+
+    if usdc_balance is not None and usdc_balance < long_value + short_value:
+        return False, f"saldo insuficiente para as duas pernas (${usdc_balance:.2f} < ${long_value + short_value:.2f})"
+
+    try:
+        long_tx, short_tx = await asyncio.gather(
+            _build_open_tx(trader_client, trader, pair_index, long_value, True, leverage, long_index, slippage_percentage),
+            _build_open_tx(trader_client, trader, pair_index, short_value, False, leverage, short_index, slippage_percentage)
+        )
+    except Exception as e:
+        return False, f"erro ao montar transações: {e}"
+
+    (long_ok, long_reason), (short_ok, short_reason) = await asyncio.gather(
+        simulate_transaction(trader_client, long_tx),
+        simulate_transaction(trader_client, short_tx)
+    )
+    metrics.record("preflight_latency", time.perf_counter() - start)
+
+    if not long_ok:
+        return False, f"LONG reverteria: {long_reason}"
+    if not short_ok:
+        return False, f"SHORT reverteria: {short_reason}"
+
+    logger.debug(f"🧪 Pré-validação OK ({time.perf_counter() - start:.2f}s)")
+    return True, None
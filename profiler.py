@@ -0,0 +1,150 @@
+"""
+Profiler por amostragem dos ciclos de trading.
+Uma thread amostra a pilha da thread do event loop a cada poucos ms e acumula
+pilhas colapsadas (formato do flamegraph.pl / speedscope), prefixadas com o
+ciclo, o par e o estágio atual. Sem overhead quando desarmado.
+
+Armar: SIGUSR1 (kill -USR1 <pid>) ou config "profiling": {"cycles": N}.
+Saída: logs/profile_<data>_c<primeiro>-<último>.folded
+"""
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+from src.config.constants import logger
+from src.config.paths import LOGS_DIR
+
+DEFAULT_INTERVAL = 0.005  # 5ms
+DEFAULT_SIGNAL_CYCLES = 3  # Ciclos perfilados por SIGUSR1
+MAX_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_name}:{frame.f_lineno}"
+
+
+class CycleProfiler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        self._requested = 0
+        self._remaining = 0
+        self._samples: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target_thread: Optional[int] = None
+        self._first_cycle: Optional[int] = None
+        self._last_cycle: Optional[int] = None
+        # Marcadores lidos pela thread de amostragem (strings imutáveis: troca atômica)
+        self._tag = "idle"
+        self._cycle = "cycle_?"
+        self._pair = "pair_?"
+        self._stage = "stage_?"
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def request(self, cycles: int) -> None:
+        """Arma o profiler para os próximos N ciclos."""
+        if cycles <= 0:
+            return
+        self._requested = cycles
+        logger.info(f"🔬 Profiler armado para os próximos {cycles} ciclo(s)")
+
+    def install_signal(self, loop, cycles: int = DEFAULT_SIGNAL_CYCLES) -> None:
+        """SIGUSR1 arma o profiler (indisponível no Windows)."""
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        try:
+            loop.add_signal_handler(signal.SIGUSR1, self.request, cycles)
+        except (NotImplementedError, RuntimeError) as e:
+            logger.debug(f"Profiler: SIGUSR1 indisponível ({e})")
+
+    def begin_cycle(self, cycle_number: int) -> None:
+        """Marca o início de um ciclo; inicia/encerra a amostragem conforme os ciclos pedidos."""
+        if self.active:
+            self._remaining -= 1
+            if self._remaining <= 0:
+                self._finish()
+        if not self.active and self._requested:
+            self._remaining = self._requested
+            self._requested = 0
+            self._start()
+        if self.active:
+            if self._first_cycle is None:
+                self._first_cycle = cycle_number
+            self._last_cycle = cycle_number
+            self._cycle = f"cycle_{cycle_number}"
+            self._pair = "pair_?"
+            self.set_stage("start")
+
+    def set_pair(self, symbol: str) -> None:
+        self._pair = f"pair_{symbol.replace(';', '_').replace(' ', '_')}"
+        self._update_tag()
+
+    def set_stage(self, stage: str) -> None:
+        self._stage = f"stage_{stage}"
+        self._update_tag()
+
+    @contextmanager
+    def stage(self, stage: str):
+        previous = self._stage
+        self.set_stage(stage)
+        try:
+            yield
+        finally:
+            self._stage = previous
+            self._update_tag()
+
+    def _update_tag(self) -> None:
+        self._tag = f"{self._cycle};{self._pair};{self._stage}"
+
+    def _start(self) -> None:
+        self._samples.clear()
+        self._first_cycle = self._last_cycle = None
+        self._target_thread = threading.get_ident()  # Chamado da thread do event loop
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="cycle-profiler", daemon=True)
+        self._thread.start()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self._samples[self._tag + ";" + ";".join(stack)] += 1
+
+    def _finish(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+        self.flush()
+
+    def flush(self) -> None:
+        """Grava as amostras acumuladas em logs/ (formato collapsed stacks)."""
+        if not self._samples:
+            return
+        path = LOGS_DIR / (
+            f"profile_{time.strftime('%Y%m%d_%H%M%S')}_c{self._first_cycle}-{self._last_cycle}.folded"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+        total = sum(self._samples.values())
+        logger.success(f"🔬 Perfil gravado: {path} ({total} amostras, ~{total * self.interval:.1f}s)")
+        self._samples.clear()
+
+    def shutdown(self) -> None:
+        if self.active:
+            self._finish()
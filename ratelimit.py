@@ -0,0 +1,149 @@
+"""
+Rate limiter de RPC para a frota inteira (token bucket com faixas de prioridade).
+
+Toda requisição JSON-RPC do transporte compartilhado passa por aqui. A prioridade
+vem do contexto da chamada:
+    CRITICAL - broadcast de transações e fechamentos de emergência
+    READ     - leituras normais (padrão)
+    STATUS   - status/diagnóstico (menu "Ver Status", endpoint de status, análise de revert)
+
+    with rpc_priority(CRITICAL):
+        receipt = await sign_and_wait(trader_client, tx)
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from src.config.constants import BASE_RPC_URL, logger
+from utils import metrics
+from src.config.settings import process_config
+
+CRITICAL = 0
+READ = 1
+STATUS = 2
+LANE_NAMES = {CRITICAL: "critical", READ: "read", STATUS: "status"}
+
+_current_priority: ContextVar[int] = ContextVar("rpc_priority", default=READ)
+
+
+@contextmanager
+def rpc_priority(priority: int):
+    """Define a prioridade das requisições RPC feitas dentro do bloco."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def set_task_priority(priority: int) -> None:
+    """Fixa a prioridade da task atual (tasks herdam o contexto de quem as criou)."""
+    _current_priority.set(priority)
+
+
+class RateLimiter:
+    def __init__(self, rate: float = 10, burst: int = 20, critical_reserve: int = 3) -> None:
+        """
+        Args:
+            rate: Tokens (requisições) por segundo
+            burst: Capacidade máxima do bucket
+            critical_reserve: Tokens que só a faixa CRITICAL pode consumir
+        """
+        self.rate = rate
+        self.capacity = burst
+        self.critical_reserve = min(critical_reserve, burst - 1)
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: List = []  # heap de (prioridade, seq, future, enfileirado_em)
+        self._seq = itertools.count()
+        self._depth: Dict[int, int] = {lane: 0 for lane in LANE_NAMES}
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _available_for(self, priority: int) -> float:
+        return self.tokens - (0 if priority == CRITICAL else self.critical_reserve)
+
+    async def acquire(self, priority: int = READ) -> None:
+        """Aguarda um token. Faixas de prioridade maior são sempre atendidas primeiro."""
+        self._refill()
+        if not self._waiters and self._available_for(priority) >= 1:
+            self.tokens -= 1
+            metrics.record(f"ratelimit_wait_{LANE_NAMES[priority]}", 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future, time.monotonic()))
+        self._depth[priority] += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            priority, _, future, enqueued_at = self._waiters[0]
+            if future.done():  # Waiter cancelado
+                heapq.heappop(self._waiters)
+                self._depth[priority] -= 1
+                continue
+
+            self._refill()
+            available = self._available_for(priority)
+            if available >= 1:
+                heapq.heappop(self._waiters)
+                self._depth[priority] -= 1
+                self.tokens -= 1
+                metrics.record(f"ratelimit_wait_{LANE_NAMES[priority]}", time.monotonic() - enqueued_at)
+                future.set_result(None)
+            else:
+                await asyncio.sleep((1 - available) / self.rate)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Profundidade da fila e tempo de espera (p50/p90) por faixa."""
+        return {
+            name: {
+                "queue_depth": self._depth[lane],
+                "wait_p50": metrics.percentile(f"ratelimit_wait_{name}", 50, 0.0),
+                "wait_p90": metrics.percentile(f"ratelimit_wait_{name}", 90, 0.0),
+            }
+            for lane, name in LANE_NAMES.items()
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(endpoint: str = BASE_RPC_URL) -> RateLimiter:
+    """Limiter compartilhado do endpoint (config: rpc_rate_limit, lido uma vez - requer restart)."""
+    if endpoint not in _limiters:
+        options = process_config().get("rpc_rate_limit", {})
+        _limiters[endpoint] = RateLimiter(
+            rate=float(options.get("rate", 10)),
+            burst=int(options.get("burst", 20)),
+            critical_reserve=int(options.get("critical_reserve", 3))
+        )
+    return _limiters[endpoint]
+
+
+def install_rate_limiter(async_web3, endpoint: str = BASE_RPC_URL) -> None:
+    """Coloca o limiter na frente de todas as requisições do provider assíncrono."""
+    provider = async_web3.provider
+    if getattr(provider, "_rate_limited", False):
+        return
+    limiter = get_rate_limiter(endpoint)
+    original_make_request = provider.make_request
+
+    async def make_request(method, params):
+        await limiter.acquire(_current_priority.get())
+        return await original_make_request(method, params)
+
+    provider.make_request = make_request
+    provider._rate_limited = True
+    logger.debug(f"Rate limiter instalado para {endpoint} ({limiter.rate}/s, burst {limiter.capacity})")
@@ -0,0 +1,181 @@
+"""
+Resolver único de receipts, dirigido por blocos.
+Em vez de cada transação fazer polling de eth_getTransactionReceipt, um único
+loop acompanha os novos blocos, busca os receipts do bloco inteiro
+(eth_getBlockReceipts) e resolve os futures de todos os hashes pendentes.
+
+Uso:
+    receipt = await sign_and_wait(trader_client, transaction)
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from hexbytes import HexBytes
+from avantis_trader_sdk import TraderClient
+from src.config.constants import BASE_RPC_URL, logger
+from src.avantis.ratelimit import READ, set_task_priority
+from src.avantis.signer import get_signer_service
+from src.avantis.ledger import record_receipt
+from utils import metrics
+
+MAX_BLOCKS_PER_TICK = 10  # Após um gap maior, pendentes são resolvidos por hash
+
+
+def _normalize_hash(tx_hash: Any) -> str:
+    if isinstance(tx_hash, (bytes, bytearray)):
+        return "0x" + bytes(tx_hash).hex()
+    tx_hash = str(tx_hash).lower()
+    return tx_hash if tx_hash.startswith("0x") else "0x" + tx_hash
+
+
+def _format_receipt(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte o receipt cru do JSON-RPC para o formato do web3 (ints + HexBytes)."""
+    receipt = dict(raw)
+    for field in ("status", "blockNumber", "gasUsed", "cumulativeGasUsed", "effectiveGasPrice", "transactionIndex", "type"):
+        if isinstance(receipt.get(field), str):
+            receipt[field] = int(receipt[field], 16)
+    for field in ("transactionHash", "blockHash"):
+        if isinstance(receipt.get(field), str):
+            receipt[field] = HexBytes(receipt[field])
+    return receipt
+
+
+class ReceiptResolver:
+    def __init__(self, async_web3, poll_interval: float = 0.5) -> None:
+        self.web3 = async_web3
+        self.poll_interval = poll_interval
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._registered_at: Dict[str, float] = {}
+        self._last_block: Optional[int] = None
+        self._block_receipts_supported = True
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(self, tx_hash: Any, timeout: float = 120) -> Dict[str, Any]:
+        """
+        Aguarda o receipt da transação. Não faz RPC aqui: erros de leitura ficam no
+        loop de polling (que só tenta de novo), nunca chegam a quem enviou a tx.
+
+        Raises:
+            asyncio.TimeoutError se não for minerada em `timeout` segundos
+        """
+        key = _normalize_hash(tx_hash)
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            self._registered_at[key] = time.monotonic()
+        self._ensure_running()
+        receipt = await asyncio.wait_for(future, timeout)
+        record_receipt(receipt)  # No contexto de quem aguarda: atribui ao ciclo dele
+        return receipt
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        # A task herda a prioridade de quem a criou (broadcast): o polling é leitura
+        set_task_priority(READ)
+        while self._pending:
+            try:
+                head = await self.web3.eth.block_number
+                if self._last_block is None:
+                    # Reprocessa o bloco atual: a tx pode ter entrado nele
+                    self._last_block = head - 1
+                if head > self._last_block:
+                    first = max(self._last_block + 1, head - MAX_BLOCKS_PER_TICK + 1)
+                    if first > self._last_block + 1:
+                        await self._resolve_by_hash()
+                    for block_number in range(first, head + 1):
+                        await self._process_block(block_number)
+                    self._last_block = head
+            except Exception as e:
+                logger.debug(f"ReceiptResolver: erro no tick ({e})")
+            self._drop_abandoned()
+            await asyncio.sleep(self.poll_interval)
+        self._last_block = None
+
+    async def _process_block(self, block_number: int) -> None:
+        receipts = await self._block_receipts(block_number)
+        if receipts is None:
+            await self._resolve_by_hash()
+            return
+        for raw in receipts:
+            key = _normalize_hash(raw.get("transactionHash", ""))
+            if key in self._pending:
+                self._resolve(key, _format_receipt(raw))
+
+    async def _block_receipts(self, block_number: int) -> Optional[List[Dict[str, Any]]]:
+        """Receipts do bloco em uma chamada; None se o node não suportar."""
+        if not self._block_receipts_supported:
+            return None
+        response = await self.web3.provider.make_request("eth_getBlockReceipts", [hex(block_number)])
+        if "error" in response:
+            logger.debug(f"eth_getBlockReceipts indisponível ({response['error']}) - usando busca por hash")
+            self._block_receipts_supported = False
+            return None
+        return response.get("result") or []
+
+    async def _resolve_by_hash(self) -> None:
+        """Fallback: busca os receipts pendentes individualmente, em paralelo."""
+        keys = list(self._pending)
+        results = await asyncio.gather(
+            *[self.web3.eth.get_transaction_receipt(key) for key in keys],
+            return_exceptions=True
+        )
+        for key, receipt in zip(keys, results):
+            if not isinstance(receipt, Exception) and receipt is not None:
+                self._resolve(key, receipt)
+
+    def _resolve(self, key: str, receipt: Dict[str, Any]) -> None:
+        future = self._pending.pop(key, None)
+        registered_at = self._registered_at.pop(key, None)
+        if registered_at is not None:
+            metrics.record("receipt_latency", time.monotonic() - registered_at)
+        if future is not None and not future.done():
+            future.set_result(receipt)
+
+    def _drop_abandoned(self) -> None:
+        """Remove hashes cujos waiters desistiram (timeout/cancelamento)."""
+        for key in [k for k, f in self._pending.items() if f.done()]:
+            self._pending.pop(key, None)
+            self._registered_at.pop(key, None)
+
+
+_resolvers: Dict[str, ReceiptResolver] = {}
+
+
+def get_receipt_resolver(trader_client: TraderClient, endpoint: str = BASE_RPC_URL) -> ReceiptResolver:
+    """Resolver compartilhado por endpoint (todas as contas usam o mesmo loop)."""
+    if endpoint not in _resolvers:
+        _resolvers[endpoint] = ReceiptResolver(trader_client.async_web3)
+    return _resolvers[endpoint]
+
+
+async def sign_and_send(trader_client: TraderClient, transaction: Dict[str, Any]) -> Any:
+    """
+    Assina e envia a transação, retornando o hash.
+    Com o signer service ativo, a assinatura roda fora do event loop.
+    """
+    address = trader_client.get_signer().get_ethereum_address()
+    signer_service = get_signer_service()
+    if signer_service is not None and signer_service.can_sign(address):
+        raw_tx = await signer_service.sign(transaction, address)
+        return await trader_client.async_web3.eth.send_raw_transaction(raw_tx)
+    signed = await trader_client.sign_transaction(transaction)
+    return await trader_client.send_and_get_transaction_hash(signed)
+
+
+async def sign_and_wait(trader_client: TraderClient, transaction: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Assina, envia e aguarda o receipt pelo resolver compartilhado.
+    Não usar dentro de retry_async: a espera pós-broadcast não pode reenviar a tx -
+    repita só sign_and_send e aguarde o hash fora do retry (ver trade.py).
+    """
+    tx_hash = await sign_and_send(trader_client, transaction)
+    return await get_receipt_resolver(trader_client).wait(tx_hash)
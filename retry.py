@@ -0,0 +1,223 @@
+"""
+Retry assíncrono com classificação de erros, backoff exponencial com jitter
+e circuit breaker por endpoint RPC.
+
+Uso:
+    trades = await retry_async(trader_client.trade.get_trades, trader, endpoint=BASE_RPC_URL)
+"""
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from src.config.constants import logger
+from utils import metrics
+
+# Classes de erro
+NONCE = "nonce"
+KNOWN_TX = "known_tx"
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+REVERT = "revert"
+NETWORK = "network"
+UNKNOWN = "unknown"
+
+# Política por classe: tentativas totais, delay base e teto do backoff (segundos)
+RETRY_POLICIES: Dict[str, Dict[str, float]] = {
+    NONCE: {"attempts": 3, "base_delay": 0.5, "max_delay": 2.0},
+    KNOWN_TX: {"attempts": 1, "base_delay": 0, "max_delay": 0},
+    RATE_LIMIT: {"attempts": 6, "base_delay": 1.0, "max_delay": 16.0},
+    TIMEOUT: {"attempts": 4, "base_delay": 0.5, "max_delay": 8.0},
+    NETWORK: {"attempts": 4, "base_delay": 0.5, "max_delay": 8.0},
+    REVERT: {"attempts": 1, "base_delay": 0, "max_delay": 0},
+    UNKNOWN: {"attempts": 1, "base_delay": 0, "max_delay": 0},
+}
+
+# Classes com orçamento próprio: o config "retries" não as altera (RATE_LIMIT precisa
+# das 6 tentativas para atravessar a janela do provider; as demais nunca repetem)
+EXPLICIT_BUDGETS = {RATE_LIMIT, KNOWN_TX, REVERT, UNKNOWN}
+
+# Tentativas por chamada das demais classes (config "retries"); None = padrão da política
+_max_attempts: Optional[int] = None
+
+
+def set_max_attempts(attempts: Optional[int]) -> None:
+    """Define as tentativas de NONCE/TIMEOUT/NETWORK (config "retries")."""
+    global _max_attempts
+    _max_attempts = attempts
+
+
+def attempts_for(error_class: str) -> int:
+    """Tentativas totais permitidas para a classe de erro."""
+    if _max_attempts is not None and error_class not in EXPLICIT_BUDGETS:
+        return _max_attempts
+    return int(RETRY_POLICIES[error_class]["attempts"])
+
+
+# Só essas classes contam para abrir o circuito (problema do endpoint, não da tx)
+CIRCUIT_ERRORS = {RATE_LIMIT, TIMEOUT, NETWORK}
+
+# Retries seguros para envio de transação: a tx não entrou no mempool.
+# KNOWN_TX ("already known", "replacement transaction underpriced") fica de fora:
+# a tx já está no mempool e reenviar com nonce novo abriria a posição duas vezes.
+SAFE_SEND_ERRORS = {NONCE, RATE_LIMIT}
+
+# Códigos JSON-RPC de limite de requisições (Infura/Alchemy/QuickNode)
+RATE_LIMIT_CODES = {429, -32005, -32029}
+
+
+class CircuitOpenError(Exception):
+    """Endpoint com circuito aberto - chamada não foi feita."""
+
+
+def _rpc_error_code(error: Exception) -> Optional[int]:
+    """Código do erro JSON-RPC (web3 levanta ValueError({"code": ..., "message": ...}))."""
+    code = getattr(error, "code", None)
+    if code is None and error.args and isinstance(error.args[0], dict):
+        code = error.args[0].get("code")
+    return code if isinstance(code, int) else None
+
+
+def classify_error(error: Exception) -> str:
+    """Classifica uma exceção do web3/SDK/aiohttp."""
+    if isinstance(error, asyncio.TimeoutError):
+        return TIMEOUT
+
+    message = str(error).lower()
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+    if "already known" in message or "replacement transaction underpriced" in message:
+        return KNOWN_TX
+    if "nonce too low" in message:
+        return NONCE
+    if status == 429 or _rpc_error_code(error) in RATE_LIMIT_CODES or "rate limit" in message or "too many requests" in message:
+        return RATE_LIMIT
+    if "timeout" in message or "timed out" in message:
+        return TIMEOUT
+    if "execution reverted" in message or "revert" in message:
+        return REVERT
+    if isinstance(error, (ConnectionError, OSError)) or "connection" in message or status in (502, 503, 504):
+        return NETWORK
+    return UNKNOWN
+
+
+def backoff_delay(error_class: str, attempt: int) -> float:
+    """Backoff exponencial com full jitter para a tentativa `attempt` (1-based)."""
+    policy = RETRY_POLICIES[error_class]
+    cap = min(policy["max_delay"], policy["base_delay"] * (2 ** (attempt - 1)))
+    return random.uniform(policy["base_delay"] / 2, cap) if cap > 0 else 0
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False  # Half-open: uma única chamada de sondagem em andamento
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self, endpoint: str) -> bool:
+        """
+        Libera a chamada ou levanta CircuitOpenError. Em half-open só a primeira
+        passa (sondagem); as demais são rejeitadas até ela terminar.
+
+        Returns:
+            True se esta chamada é a sondagem (quem chama deve liberar com end_probe)
+        """
+        state = self.state
+        if state == "open":
+            remaining = self.cooldown_seconds - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(f"Circuito aberto para {endpoint} ({remaining:.0f}s restantes)")
+        if state == "half_open":
+            if self.probing:
+                raise CircuitOpenError(f"Circuito semiaberto para {endpoint} (sondagem em andamento)")
+            self.probing = True
+            return True
+        return False
+
+    def end_probe(self) -> None:
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self, endpoint: str) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self.state == "half_open":
+                logger.warning(f"🔌 Circuito ABERTO para {endpoint} por {self.cooldown_seconds}s ({self.failures} falhas)")
+            self.opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit(endpoint: str) -> CircuitBreaker:
+    """Circuit breaker compartilhado do endpoint."""
+    if endpoint not in _breakers:
+        _breakers[endpoint] = CircuitBreaker()
+    return _breakers[endpoint]
+
+
+async def retry_async(
+    func: Callable[..., Awaitable[Any]],
+    *args,
+    endpoint: str = "default",
+    name: Optional[str] = None,
+    retry_on: Optional[Iterable[str]] = None,
+    **kwargs
+) -> Any:
+    """
+    Executa `await func(*args, **kwargs)` com retry por classe de erro.
+
+    Args:
+        func: Coroutine function (chamada de novo a cada tentativa)
+        endpoint: Endpoint RPC usado pelo circuit breaker
+        name: Nome para logs (default: nome da função)
+        retry_on: Restringe as classes que podem ser repetidas (ex: SAFE_SEND_ERRORS)
+
+    Raises:
+        CircuitOpenError se o circuito do endpoint estiver aberto;
+        a última exceção se as tentativas se esgotarem ou a classe não permitir retry
+    """
+    name = name or getattr(func, "__name__", "rpc")
+    breaker = get_circuit(endpoint)
+    allowed = set(retry_on) if retry_on is not None else None
+    attempt = 0
+
+    while True:
+        attempt += 1
+        probe = breaker.before_call(endpoint)
+        try:
+            result = await func(*args, **kwargs)
+            breaker.record_success()
+            return result
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            error_class = classify_error(e)
+            if error_class in CIRCUIT_ERRORS:
+                breaker.record_failure(endpoint)
+            elif probe:
+                breaker.record_success()  # O endpoint respondeu (erro da chamada, não dele)
+
+            max_attempts = attempts_for(error_class)
+            if attempt >= max_attempts or (allowed is not None and error_class not in allowed):
+                raise
+
+            delay = backoff_delay(error_class, attempt)
+            metrics.record(f"retry_delay_{error_class}", delay)
+            logger.warning(f"{name}: tentativa {attempt}/{max_attempts} falhou ({error_class}): {e} - nova tentativa em {delay:.1f}s")
+            await asyncio.sleep(delay)
+        finally:
+            if probe:
+                breaker.end_probe()  # Também em cancelamento: a próxima chamada pode sondar
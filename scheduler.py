@@ -0,0 +1,210 @@
+"""
+Scheduler de ciclos - prepara o ciclo N+1 enquanto o ciclo N está em hold.
+Mercado, metadados do par, saldo e allowance já ficam prontos quando o
+próximo ciclo começa; o início do ciclo só precisa assinar e enviar.
+
+HoldDeadline controla o fim do hold em relógio monotônico: o fechamento é
+disparado em deadline - latência esperada de inclusão, com o watchdog rodando
+em paralelo (ele só interrompe o hold em caso de anomalia).
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+import pandas as pd
+
+from src.config.constants import logger
+from src.config.paths import DATA_DIR
+from src.avantis.account import get_usdc_balance
+from utils import metrics
+
+DEFAULT_INCLUSION_LATENCY = 2.0  # Segundos, até haver amostras de receipt_latency
+
+
+class HoldDeadline:
+    def __init__(self, duration_seconds: float, anchor: Optional[float] = None) -> None:
+        """
+        Args:
+            duration_seconds: Duração do hold
+            anchor: Início do hold em time.monotonic() (default: agora)
+        """
+        self.deadline = (anchor if anchor is not None else time.monotonic()) + duration_seconds
+
+    @staticmethod
+    def inclusion_latency() -> float:
+        """Tempo esperado entre disparar o fechamento e ele entrar em bloco (p50 observado)."""
+        return (
+            metrics.percentile("receipt_latency", 50, DEFAULT_INCLUSION_LATENCY)
+            + metrics.percentile("sign_latency", 50, 0.0)
+        )
+
+    @property
+    def fire_at(self) -> float:
+        return self.deadline - self.inclusion_latency()
+
+    def remaining(self) -> float:
+        """Segundos até o disparo do fechamento."""
+        return max(self.fire_at - time.monotonic(), 0.0)
+
+    async def run(self, watch: Awaitable[bool]) -> bool:
+        """
+        Aguarda o disparo do fechamento com o watchdog em paralelo.
+
+        Args:
+            watch: Corrotina do watchdog (sem prazo próprio); False = anomalia
+
+        Returns:
+            True se chegou o momento de fechar, False se o watchdog detectou anomalia
+        """
+        watch_task = asyncio.ensure_future(watch)
+        try:
+            while True:
+                remaining = self.remaining()
+                if remaining <= 0:
+                    break
+                if watch_task.done():
+                    if watch_task.exception() is None and watch_task.result() is False:
+                        return False
+                    # Watchdog caiu: o prazo continua valendo
+                    await asyncio.sleep(min(remaining, 60))
+                    continue
+                # Reavalia a latência esperada a cada minuto (outras contas geram amostras)
+                await asyncio.wait({watch_task}, timeout=min(remaining, 60))
+            overshoot = time.monotonic() - self.fire_at
+            logger.debug(f"⏰ Disparo do fechamento {overshoot * 1000:+.0f}ms em relação ao previsto")
+            return True
+        finally:
+            watch_task.cancel()
+            # O watchdog não pode seguir rodando durante o fechamento
+            await asyncio.gather(watch_task, return_exceptions=True)
+
+
+class CycleScheduler:
+    def __init__(self, manager, max_age_seconds: float = 600) -> None:
+        self.manager = manager
+        self.max_age_seconds = max_age_seconds  # Dados mais velhos que isso são descartados
+        self._task: Optional[asyncio.Task] = None
+        self._prepared: Optional[Dict[str, Any]] = None
+
+    @property
+    def trader_client(self):
+        return self.manager.trader_client
+
+    def start_prefetch(self) -> None:
+        """Dispara a preparação do próximo ciclo em background (durante o hold)."""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._prefetch())
+
+    async def refresh_after_close(self) -> None:
+        """
+        Atualiza saldo e allowance depois do fechamento.
+        Durante o hold o saldo não inclui o colateral travado, então é relido aqui.
+        Se o allowance não cobre o próximo ciclo, a aprovação é feita agora,
+        fora do caminho crítico entre LONG e SHORT.
+        """
+        prepared = await self._wait_task()
+        if prepared is None:
+            return
+
+        trader = self.trader_client.get_signer().get_ethereum_address()
+        results = await asyncio.gather(
+            get_usdc_balance(self.trader_client),
+            self.trader_client.get_usdc_allowance_for_trading(trader),
+            return_exceptions=True
+        )
+        if not isinstance(results[0], Exception):
+            prepared["usdc_balance"] = results[0]
+        if not isinstance(results[1], Exception):
+            prepared["allowance"] = results[1]
+        else:
+            prepared["allowance"] = None
+
+        await self._ensure_allowance(prepared)
+        prepared["fetched_at"] = time.time()
+        self._prepared = prepared
+
+    async def take(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna os dados preparados para o ciclo atual e invalida o cache.
+        Se nada foi preparado (primeiro ciclo), prepara agora.
+        """
+        prepared = await self._wait_task()
+        if prepared is None:
+            prepared = await self._prefetch()
+        self._prepared = None
+        self._task = None
+        return prepared
+
+    def invalidate(self) -> None:
+        """Descarta a preparação atual (ex: após anomalia)."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._prepared = None
+
+    async def _wait_task(self) -> Optional[Dict[str, Any]]:
+        if self._task is not None:
+            try:
+                self._prepared = await self._task
+            except asyncio.CancelledError:
+                self._prepared = None
+            except Exception as e:
+                logger.warning(f"Prefetch do próximo ciclo falhou: {e}")
+                self._prepared = None
+            self._task = None
+
+        if self._prepared and time.time() - self._prepared["fetched_at"] > self.max_age_seconds:
+            logger.debug("Prefetch expirado - descartando")
+            self._prepared = None
+
+        return self._prepared
+
+    async def _prefetch(self) -> Optional[Dict[str, Any]]:
+        """Carrega mercados, seleciona par, busca saldo e allowance."""
+        start = time.time()
+
+        df_markets = await asyncio.to_thread(pd.read_excel, DATA_DIR / "active_pairs.xlsx")
+        if df_markets.empty:
+            logger.warning("Prefetch: nenhum mercado encontrado")
+            return None
+
+        market_data = await self.manager.select_market_data(df_markets)
+        if not market_data:
+            return None
+
+        trader = self.trader_client.get_signer().get_ethereum_address()
+        balance, allowance = await asyncio.gather(
+            get_usdc_balance(self.trader_client),
+            self.trader_client.get_usdc_allowance_for_trading(trader),
+            return_exceptions=True
+        )
+
+        prepared = {
+            "market_data": market_data,
+            "usdc_balance": None if isinstance(balance, Exception) else balance,
+            "allowance": None if isinstance(allowance, Exception) else allowance,
+            "fetched_at": time.time()
+        }
+
+        logger.debug(
+            f"🧭 Próximo ciclo preparado em {time.time() - start:.1f}s | "
+            f"{market_data['symbol']} | saldo={prepared['usdc_balance']} | allowance={prepared['allowance']}"
+        )
+        return prepared
+
+    async def _ensure_allowance(self, prepared: Dict[str, Any]) -> None:
+        """Aprova USDC antecipadamente se o allowance não cobre o maior ciclo possível."""
+        allowance = prepared.get("allowance")
+        needed = float(self.manager.config.ranges["order_value_usd"].high)
+        if allowance is None or allowance >= needed:
+            return
+
+        try:
+            logger.info(f"💰 Aprovando {needed * 3:.0f} USDC antes do próximo ciclo...")
+            await self.trader_client.approve_usdc_for_trading(needed * 3)
+            prepared["allowance"] = needed * 3
+            logger.info("✅ Aprovação antecipada concluída")
+        except Exception as e:
+            logger.warning(f"Aprovação antecipada falhou (será refeita na abertura): {e}")
+            prepared["allowance"] = None
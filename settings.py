@@ -0,0 +1,215 @@
+"""
+Configuração tipada do bot (data/config.json).
+O arquivo é validado no carregamento e as faixas min/max são compiladas em
+samplers. ConfigWatcher detecta alterações no arquivo; o TradingManager aplica
+a nova configuração entre ciclos (troca atômica da referência, sem restart).
+
+Seções de processo (RESTART_SECTIONS) são lidas uma vez, via process_config(),
+por módulos que montam estado global (rate limiter, cassete, ledger, servidores):
+alterações nelas só valem após reiniciar o bot.
+
+Uso:
+    settings = load_settings()
+    order_value = settings.sample("order_value_usd")
+"""
+import json
+import os
+import random
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from src.config.constants import logger
+from utils.data import CONFIG_FILE
+
+Number = Union[int, float]
+
+# Faixas obrigatórias: chave -> valor mínimo aceito para "min"
+REQUIRED_RANGES = {
+    "order_value_usd": 1,
+    "order_duration_min": 0,
+    "delay_between_trading_cycles_min": 0,
+}
+
+
+# Seções lidas uma vez na inicialização do processo (sem hot reload)
+RESTART_SECTIONS = (
+    "rpc_rate_limit", "rpc_cassette", "signer_pool", "balance_ledger",
+    "status_server", "loop_monitor", "uvloop",
+)
+
+# Faixas usadas quando o arquivo é inválido fora do modo trading (menu 2/3)
+FALLBACK_RANGES = {
+    "order_value_usd": {"min": 20, "max": 20},
+    "order_duration_min": {"min": 1, "max": 1},
+    "delay_between_trading_cycles_min": {"min": 1, "max": 1},
+}
+
+
+class ConfigError(ValueError):
+    """Configuração inválida (chave ausente, tipo ou faixa incorretos)."""
+
+
+class RangeSampler:
+    """Faixa {min, max} compilada: inteiros usam randint, decimais uniform."""
+    __slots__ = ("key", "low", "high", "_sample")
+
+    def __init__(self, key: str, spec: Any, floor: Number = 0) -> None:
+        if not isinstance(spec, dict) or "min" not in spec or "max" not in spec:
+            raise ConfigError(f"'{key}' deve ser um objeto {{\"min\": ..., \"max\": ...}}")
+        low, high = spec["min"], spec["max"]
+        for value in (low, high):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ConfigError(f"'{key}': min/max devem ser números (recebido {value!r})")
+        if low < floor:
+            raise ConfigError(f"'{key}': min deve ser >= {floor} (recebido {low})")
+        if low > high:
+            raise ConfigError(f"'{key}': min ({low}) maior que max ({high})")
+
+        self.key = key
+        self.low = low
+        self.high = high
+        if isinstance(low, int) and isinstance(high, int):
+            self._sample = lambda: random.randint(low, high)
+        else:
+            self._sample = lambda: random.uniform(low, high)
+
+    def sample(self) -> Number:
+        return self._sample()
+
+    def __repr__(self) -> str:
+        return f"{self.low}-{self.high}"
+
+
+def _number(raw: Dict[str, Any], key: str, default: Number, minimum: Number, cast=float) -> Number:
+    value = raw.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ConfigError(f"'{key}' deve ser numérico (recebido {value!r})")
+    if value < minimum:
+        raise ConfigError(f"'{key}' deve ser >= {minimum} (recebido {value})")
+    return cast(value)
+
+
+class Settings(Mapping):
+    """
+    Configuração validada. Campos usados no caminho quente viram atributos;
+    seções opcionais (signer_pool, rpc_rate_limit, ...) seguem acessíveis como dict.
+    """
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        self._raw = dict(raw)
+        self.ranges: Dict[str, RangeSampler] = {}
+        for key, floor in REQUIRED_RANGES.items():
+            if key not in raw:
+                raise ConfigError(f"Chave obrigatória ausente: '{key}'")
+            self.ranges[key] = RangeSampler(key, raw[key], floor)
+
+        self.max_leverage = _number(raw, "max_leverage", 10, 1)
+        self.nonce_delay_seconds = _number(raw, "nonce_delay_seconds", 3.0, 0)
+        self.retries = _number(raw, "retries", 3, 1, int)
+        self.pairs_per_account = _number(raw, "pairs_per_account", 1, 1, int)
+        self.orders_distribution_noise = _number(raw, "orders_distribution_noise", 0, 0)
+
+        slippage = raw.get("slippage_percentage", {})
+        if slippage:
+            self.slippage_range: Optional[RangeSampler] = RangeSampler("slippage_percentage", slippage)
+            if self.slippage_range.low <= 0:
+                raise ConfigError("'slippage_percentage': min deve ser > 0")
+        else:
+            self.slippage_range = None
+
+    def sample(self, key: str) -> Number:
+        """Sorteia um valor da faixa compilada."""
+        try:
+            return self.ranges[key].sample()
+        except KeyError:
+            raise ConfigError(f"Invalid or missing config range for '{key}'")
+
+    def changed_keys(self, other: "Settings") -> list:
+        """Chaves (sem comentários) com valor diferente entre duas configurações."""
+        keys = set(self._raw) | set(other._raw)
+        return sorted(k for k in keys if not k.startswith("_") and self._raw.get(k) != other._raw.get(k))
+
+    def __getitem__(self, key: str) -> Any:
+        return self._raw[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+
+def load_settings(path: Path = CONFIG_FILE, strict: bool = True) -> Settings:
+    """
+    Lê e valida o arquivo de configuração.
+
+    Args:
+        strict: False = arquivo inválido não interrompe (ações que não operam,
+            como fechar posições/ver status): mantém só as seções de processo
+            e usa FALLBACK_RANGES
+
+    Raises:
+        ConfigError se o arquivo for inválido (apenas com strict=True)
+    """
+    raw: Dict[str, Any] = {}
+    try:
+        with open(path, "r") as f:
+            raw = json.load(f)
+        return Settings(raw)
+    except FileNotFoundError:
+        error = ConfigError(f"Arquivo {path} não encontrado")
+    except json.JSONDecodeError as e:
+        error = ConfigError(f"JSON inválido em {path}: {e}")
+    except ConfigError as e:
+        error = e
+    if strict:
+        raise error
+    logger.warning(f"⚙️ Configuração inválida ({error}) - usando valores padrão")
+    kept = {key: raw[key] for key in RESTART_SECTIONS if isinstance(raw, dict) and key in raw}
+    return Settings({**kept, **FALLBACK_RANGES})
+
+
+_process_config: Optional[Settings] = None
+
+
+def process_config() -> Settings:
+    """
+    Configuração do processo (RESTART_SECTIONS), lida uma vez e compartilhada.
+    Nunca levanta ConfigError: o menu funciona mesmo com o arquivo inválido.
+    """
+    global _process_config
+    if _process_config is None:
+        _process_config = load_settings(strict=False)
+    return _process_config
+
+
+class ConfigWatcher:
+    """Detecta alterações no arquivo de configuração (mtime/tamanho)."""
+
+    def __init__(self, path: Path = CONFIG_FILE) -> None:
+        self.path = path
+        self._signature = self._stat()
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def poll(self) -> Optional[Settings]:
+        """
+        Returns:
+            Nova configuração validada se o arquivo mudou; None se não mudou ou
+            se a nova versão é inválida (a atual continua valendo)
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        try:
+            return load_settings(self.path)
+        except ConfigError as e:
+            logger.error(f"⚙️ Nova configuração rejeitada (mantendo a atual): {e}")
+            return None
@@ -0,0 +1,124 @@
+"""
+Serviço de assinatura fora do event loop.
+ECDSA roda em um pool de threads ou processos; as chaves são carregadas uma vez
+por worker a partir de accounts.xlsx (nunca trafegam por chamada).
+
+Uso:
+    raw_tx = await get_signer_service().sign(transaction, address)
+"""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+from eth_account import Account
+
+from src.config.constants import logger
+from src.config.paths import DATA_DIR
+from utils import metrics
+
+ACCOUNTS_FILE = DATA_DIR / "accounts.xlsx"
+
+# Estado do worker (em modo processo, um por processo; em modo thread, compartilhado)
+_worker_accounts: Dict[str, Any] = {}
+
+
+def _load_worker_keys(accounts_file: str) -> None:
+    """Initializer do worker: carrega as contas ativas uma única vez."""
+    df_accounts = pd.read_excel(accounts_file)
+    for private_key in df_accounts[df_accounts["is_active"] == True]["private_key"]:
+        account = Account.from_key(private_key)
+        _worker_accounts[account.address.lower()] = account
+
+
+def _sign_in_worker(transaction: Dict[str, Any], address: str) -> Tuple[bytes, float]:
+    """Assina no worker. Retorna (tx assinada crua, duração da assinatura)."""
+    start = time.perf_counter()
+    account = _worker_accounts.get(address.lower())
+    if account is None:
+        raise KeyError(f"Conta {address} não carregada no signer (inativa em accounts.xlsx?)")
+    tx = {k: v for k, v in transaction.items() if k != "from"}
+    signed = account.sign_transaction(tx)
+    raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+    return bytes(raw), time.perf_counter() - start
+
+
+class SignerService:
+    def __init__(self, mode: str = "thread", workers: int = 2) -> None:
+        self.mode = mode
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+        self._addresses: set = set()
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.mode == "process":
+            df_accounts = pd.read_excel(ACCOUNTS_FILE)
+            self._addresses = {
+                str(a).lower() for a in df_accounts[df_accounts["is_active"] == True]["address"]
+            }
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_load_worker_keys,
+                initargs=(str(ACCOUNTS_FILE),)
+            )
+        else:
+            _load_worker_keys(str(ACCOUNTS_FILE))
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="signer")
+        logger.info(f"🔏 Signer service iniciado ({self.mode}, {self.workers} workers)")
+
+    def can_sign(self, address: str) -> bool:
+        """
+        True se a conta está carregada no pool (em modo processo, pela coluna address).
+        Antes do start() retorna False: a assinatura fica com o signer local do SDK.
+        """
+        if self._executor is None:
+            return False
+        if self.mode == "process":
+            return address.lower() in self._addresses
+        return address.lower() in _worker_accounts
+
+    async def sign(self, transaction: Dict[str, Any], address: str) -> bytes:
+        """Assina a transação no pool e retorna os bytes crus para broadcast."""
+        if self._executor is None:
+            raise RuntimeError("Signer service não iniciado (chame start() fora do event loop)")
+        submitted = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        raw, sign_time = await loop.run_in_executor(self._executor, _sign_in_worker, transaction, address)
+        total = time.perf_counter() - submitted
+        metrics.record("sign_latency", sign_time)
+        metrics.record("sign_queue_wait", max(total - sign_time, 0))
+        return raw
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_signer_service: Optional[SignerService] = None
+
+
+def configure_signer_service(config: Dict[str, Any]) -> Optional[SignerService]:
+    """
+    Cria o serviço a partir do config: {"signer_pool": {"mode": "thread"|"process"|"off", "workers": 2}}.
+    Com "off" a assinatura volta para o signer local do SDK (inline no loop).
+    O serviço anterior é encerrado; o novo só assina depois de start()
+    (lê accounts.xlsx - chamar via asyncio.to_thread).
+    """
+    global _signer_service
+    if _signer_service is not None:
+        _signer_service.shutdown()
+    options = config.get("signer_pool", {})
+    mode = options.get("mode", "thread")
+    if mode == "off":
+        _signer_service = None
+        return None
+    _signer_service = SignerService(mode, int(options.get("workers", 2)))
+    return _signer_service
+
+
+def get_signer_service() -> Optional[SignerService]:
+    return _signer_service
@@ -0,0 +1,101 @@
+"""
+Controle adaptativo de slippage por par.
+Usa a latência medida entre as pernas (leg gap) e a volatilidade recente do par
+para escolher o menor slippage que ainda preenche, ajustando-se por fills/reverts.
+"""
+import math
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.config.constants import logger
+from utils import metrics
+
+DEFAULT_MIN_SLIPPAGE = 0.2   # % - piso absoluto
+DEFAULT_MAX_SLIPPAGE = 1.0   # % - teto (valor fixo usado antes)
+DEFAULT_LEG_GAP = 3.0        # s - usado até existirem medições
+Z_SCORE = 2.33               # ~99% de chance do preço ficar dentro da faixa
+MIN_PRICE_SAMPLES = 8
+MIN_PRICE_INTERVAL = 1.0     # s - amostras mais próximas que isso não medem volatilidade
+
+
+class SlippageController:
+    def __init__(self, config: Optional[Dict[str, Any]] = None, price_window: int = 200) -> None:
+        self.configure(config or {})
+        self.revert_step = 0.2   # % somado à margem do par a cada revert
+        self.fill_decay = 0.8    # margem do par encolhe a cada fill
+        self._prices = defaultdict(lambda: deque(maxlen=price_window))
+        self._margin = defaultdict(float)
+        self._stats = defaultdict(lambda: {"fills": 0, "reverts": 0, "last_slippage": None})
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """(Re)aplica a faixa slippage_percentage (também usado no hot reload)."""
+        slippage_range = config.get("slippage_percentage", {})
+        self.min_slippage = float(slippage_range.get("min", DEFAULT_MIN_SLIPPAGE))
+        self.max_slippage = float(slippage_range.get("max", DEFAULT_MAX_SLIPPAGE))
+
+    def record_price(self, pair_index: int, price: float, timestamp: Optional[float] = None) -> None:
+        """Adiciona um preço observado ao stream do par."""
+        if not price or price <= 0:
+            return
+        self._prices[pair_index].append((timestamp or time.time(), float(price)))
+
+    def volatility(self, pair_index: int) -> Optional[float]:
+        """
+        Volatilidade por raiz de segundo (desvio dos log-retornos normalizados pelo tempo).
+        Retorna None se não houver amostras suficientes.
+        """
+        samples = self._prices.get(pair_index)
+        if not samples or len(samples) < MIN_PRICE_SAMPLES:
+            return None
+
+        data = np.array(samples, dtype=float)
+        dt = np.diff(data[:, 0])
+        returns = np.diff(np.log(data[:, 1]))
+        valid = dt >= MIN_PRICE_INTERVAL
+        if valid.sum() < MIN_PRICE_SAMPLES - 1:
+            return None
+
+        normalized = returns[valid] / np.sqrt(dt[valid])
+        return float(np.sqrt(np.mean(normalized ** 2)))
+
+    def get_slippage(self, pair_index: int) -> float:
+        """
+        Slippage (%) para a próxima abertura no par.
+
+        Faixa esperada de movimento durante o leg gap (p90 medido) + margem
+        aprendida com reverts, limitado a [min, max] do config.
+        """
+        sigma = self.volatility(pair_index)
+        if sigma is None:
+            slippage = self.max_slippage
+        else:
+            leg_gap = metrics.percentile("leg_gap", 90, DEFAULT_LEG_GAP)
+            expected_move = Z_SCORE * sigma * math.sqrt(max(leg_gap, 0.1)) * 100
+            slippage = expected_move + self._margin[pair_index]
+
+        slippage = round(min(max(slippage, self.min_slippage), self.max_slippage), 3)
+        self._stats[pair_index]["last_slippage"] = slippage
+        return slippage
+
+    def record_fill(self, pair_index: int) -> None:
+        """Perna preenchida: reduz a margem do par."""
+        self._stats[pair_index]["fills"] += 1
+        self._margin[pair_index] *= self.fill_decay
+
+    def record_revert(self, pair_index: int) -> None:
+        """Perna revertida: aumenta a margem do par."""
+        self._stats[pair_index]["reverts"] += 1
+        self._margin[pair_index] = min(self._margin[pair_index] + self.revert_step, self.max_slippage)
+        logger.debug(
+            f"Slippage par {pair_index}: revert registrado, margem={self._margin[pair_index]:.2f}%"
+        )
+
+    def stats(self) -> Dict[int, Dict[str, Any]]:
+        """Estatísticas de fill/revert por par."""
+        return {
+            pair_index: {**values, "margin": round(self._margin[pair_index], 3)}
+            for pair_index, values in self._stats.items()
+        }
@@ -0,0 +1,128 @@
+"""
+Soak test: roda o loop real de trading contra o MockChain (sem rede, sem carteira)
+para simular dias de operação em minutos e expor vazamentos de memória.
+
+O hold e o delay entre ciclos viram zero; o número de ciclos corresponde ao
+período simulado usando as durações médias de data/config.json. As demais
+esperas (asyncio.sleep) são comprimidas pelo fator --speed.
+
+Uso: python -m src.soak --days 7 [--every 100] [--speed 1000]
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import utils.data
+import src.avantis.ledger
+from src.config.constants import logger
+from src.config.settings import ConfigWatcher, Settings, load_settings, process_config
+from src.avantis.mock_client import MockChain, MockTraderClient
+from src.avantis.signer import configure_signer_service
+from src.journal import CycleJournal
+from src.position_manager import TradingManager
+from utils import metrics
+
+SOAK_ADDRESS = "0x00000000000000000000000000000000005041c0"
+SOAK_OVERRIDES = {
+    "order_duration_min": {"min": 0, "max": 0},
+    "delay_between_trading_cycles_min": {"min": 0, "max": 0},
+    "nonce_delay_seconds": 0,
+    "pairing_mode": False,
+    "pairs_per_account": 1,
+    "signer_pool": {"mode": "off"},  # O MockChain não decodifica transações assinadas
+    "rpc_cassette": {"mode": "off"},
+    "profiling": {"cycles": 0},
+}
+
+
+def simulated_cycles(config: Settings, days: float) -> int:
+    """Ciclos equivalentes a N dias com as durações médias configuradas."""
+    mean = lambda key: (config.ranges[key].low + config.ranges[key].high) / 2
+    cycle_minutes = max(mean("order_duration_min") + mean("delay_between_trading_cycles_min"), 1)
+    return max(int(days * 24 * 60 / cycle_minutes), 1)
+
+
+class SoakTradingManager(TradingManager):
+    def __init__(self, chain: MockChain, workdir: Path, every_cycles: int) -> None:
+        super().__init__()
+        raw: Dict[str, Any] = dict(self.config)
+        raw.update(SOAK_OVERRIDES)
+        raw["memory_telemetry"] = {**raw.get("memory_telemetry", {}), "every_cycles": every_cycles, "tracemalloc": True}
+        raw["memory_telemetry"].pop("soft_ceiling_mb", None)  # Medir o crescimento, não reiniciar
+        self.config = Settings(raw)
+        self.memory.configure(self.config)
+        self.slippage.configure(self.config)
+        # Config do processo, só sem o pool: o MockChain não decodifica transações assinadas
+        configure_signer_service({**process_config(), "signer_pool": SOAK_OVERRIDES["signer_pool"]})
+        self._config_watcher = ConfigWatcher(workdir / "config.json")  # Nunca existe: sem hot reload
+        self.journal = CycleJournal(workdir / "cycle_journal.jsonl")
+        self.chain = chain
+
+    async def initialize_client(self) -> None:
+        self.private_key = None
+        self.trader_client = MockTraderClient(self.chain, SOAK_ADDRESS)
+        self.trader_address = SOAK_ADDRESS
+        logger.info(f"✅ Cliente simulado inicializado: {self.trader_address}")
+
+
+def _compress_sleep(speed: float) -> None:
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, result=None):
+        return await real_sleep(delay / speed if delay else 0, result)
+
+    asyncio.sleep = sleep
+
+
+async def run_soak(days: float, every_cycles: int, speed: float) -> Dict[str, Any]:
+    """
+    Executa o soak test e retorna o resumo (ciclos, saldo final, crescimento do RSS).
+    """
+    cycles = simulated_cycles(load_settings(), days)
+    with tempfile.TemporaryDirectory(prefix="soak_") as workdir:
+        workdir = Path(workdir)
+        utils.data.STATE_FILE = workdir / "state.json"  # Não tocar o estado do bot real
+        src.avantis.ledger.LEDGER_FILE = workdir / "cycle_ledger.jsonl"
+        _compress_sleep(speed)
+        chain = MockChain(seed=0)
+        manager = SoakTradingManager(chain, workdir, every_cycles)
+        manager.max_cycles = cycles
+        logger.info(f"🧪 Soak test: {days:g} dia(s) simulados = {cycles} ciclos (amostra de memória a cada {every_cycles})")
+        await manager.start_trading()
+        manager.memory.sample(cycles)
+
+    report = manager.memory.report()
+    report.update({
+        "days": days,
+        "cycles": cycles,
+        "final_usdc": chain.usdc[SOAK_ADDRESS] / 1e6,
+        "open_trades": len(chain.trades),
+        "metrics": metrics.summary(),
+    })
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Soak test do loop de trading contra uma chain simulada")
+    parser.add_argument("--days", type=float, default=7, help="Período simulado em dias (padrão: 7)")
+    parser.add_argument("--every", type=int, default=100, help="Ciclos entre amostras de memória (padrão: 100)")
+    parser.add_argument("--speed", type=float, default=1000, help="Fator de compressão das esperas (padrão: 1000)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_soak(args.days, args.every, args.speed))
+    growth = report["growth_mb"]
+    logger.info("=" * 70)
+    logger.info(f"🧪 Soak concluído: {report['cycles']} ciclos | saldo final ${report['final_usdc']:.2f}")
+    if growth is not None:
+        per_k = growth / report["cycles"] * 1000
+        logger.info(f"🧠 RSS {report['baseline_mb']:.1f} → {report['last_mb']:.1f} MB ({growth:+.1f} MB, {per_k:+.2f} MB/1000 ciclos)")
+    for line in report["top_growth"]:
+        logger.info(f"   {line}")
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Status do bot em memória + servidor HTTP local (TCP ou Unix socket).
+
+O StatusBoard é alimentado pelas leituras que o bot já faz (posições, saldos,
+snapshots do Multicall3, estágio do ciclo); o servidor só serializa esse estado,
+sem nenhuma chamada RPC extra - dashboards podem consultar em alta frequência.
+
+Rotas: /status (tudo), /accounts, /metrics, /health
+Config:
+    "status_server": {"enabled": false, "host": "127.0.0.1", "port": 8787, "unix_socket": null}
+"""
+import asyncio
+import json
+import os
+import stat
+import time
+from typing import Any, Dict, Optional
+
+from src.config.constants import logger
+from src.avantis.ratelimit import get_rate_limiter
+from utils import metrics
+from utils.looplag import get_loop_monitor
+
+MAX_REQUEST_BYTES = 8192
+READ_TIMEOUT = 5
+
+
+class StatusBoard:
+    """Estado por conta (última leitura conhecida de cada campo + quando foi lida)."""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+
+    def update(self, address: Optional[str], **fields: Any) -> None:
+        if not address:
+            return
+        account = self.accounts.setdefault(address, {"address": address})
+        account.update(fields)
+        account["updated_at"] = time.time()
+
+    def set_stage(self, address: Optional[str], stage: str, **fields: Any) -> None:
+        self.update(address, stage=stage, stage_since=time.time(), **fields)
+
+    def publish_positions(self, address: str, snapshot) -> None:
+        self.update(
+            address,
+            positions=[position.to_dict() for position in snapshot],
+            positions_at=snapshot.taken_at,
+        )
+
+    def publish_snapshot(self, snapshot) -> None:
+        """AccountSnapshot do Multicall3 (saldo, allowance, ETH, trades por par)."""
+        fields = {
+            "usdc_balance": snapshot.usdc_balance,
+            "allowance": snapshot.allowance,
+            "eth_balance": snapshot.eth_balance,
+        }
+        # Campo que falhou no lote mantém a última leitura boa
+        fields = {name: value for name, value in fields.items() if value is not None}
+        self.update(snapshot.address, open_trades=snapshot.total_open, balances_at=snapshot.taken_at, **fields)
+
+    def metrics(self) -> Dict[str, Any]:
+        lag_monitor = get_loop_monitor()
+        return {
+            "timings": metrics.summary(),
+            "rpc": get_rate_limiter().stats(),
+            "event_loop": lag_monitor.stats() if lag_monitor is not None else None,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "accounts": self.accounts,
+            "metrics": self.metrics(),
+        }
+
+
+_board = StatusBoard()
+
+
+def get_status_board() -> StatusBoard:
+    return _board
+
+
+class StatusServer:
+    def __init__(self, board: StatusBoard, host: str = "127.0.0.1", port: int = 8787,
+                 unix_socket: Optional[str] = None) -> None:
+        self.board = board
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _route(self, path: str) -> Optional[Any]:
+        path = path.split("?", 1)[0].rstrip("/") or "/status"
+        if path == "/status":
+            return self.board.to_dict()
+        if path == "/accounts":
+            return self.board.accounts
+        if path == "/metrics":
+            return self.board.metrics()
+        if path == "/health":
+            return {"ok": True, "uptime_seconds": round(time.time() - self.board.started_at, 1)}
+        return None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), READ_TIMEOUT)
+            method, path, _ = head[:MAX_REQUEST_BYTES].decode("latin-1").split(" ", 2)
+            payload = self._route(path) if method in ("GET", "HEAD") else None
+            status = "200 OK" if payload is not None else "404 Not Found"
+            body = json.dumps(payload if payload is not None else {"error": f"rota desconhecida: {path}"},
+                              default=str).encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Cache-Control: no-store\r\nConnection: close\r\n\r\n".encode()
+                + (body if method != "HEAD" else b"")
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError):
+            pass
+        except Exception as e:
+            logger.debug(f"Status server: erro na requisição ({e})")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass  # Cliente já desconectou
+
+    async def start(self) -> None:
+        if self.unix_socket:
+            if os.path.exists(self.unix_socket):
+                if not stat.S_ISSOCK(os.stat(self.unix_socket).st_mode):
+                    raise OSError(f"{self.unix_socket} existe e não é um socket - confira status_server.unix_socket")
+                os.unlink(self.unix_socket)  # Socket órfão de uma execução anterior
+            self._server = await asyncio.start_unix_server(self._handle, path=self.unix_socket, limit=MAX_REQUEST_BYTES)
+            where = f"unix:{self.unix_socket}"
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_REQUEST_BYTES)
+            where = f"http://{self.host}:{self.port}"
+        logger.info(f"📟 Status server em {where} (GET /status)")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def start_status_server(config: Dict[str, Any]) -> Optional[StatusServer]:
+    """Inicia o servidor se habilitado no config (status_server)."""
+    options = config.get("status_server", {})
+    if not options.get("enabled", False):
+        return None
+    server = StatusServer(
+        get_status_board(),
+        host=options.get("host", "127.0.0.1"),
+        port=int(options.get("port", 8787)),
+        unix_socket=options.get("unix_socket"),
+    )
+    try:
+        await server.start()
+    except OSError as e:
+        logger.warning(f"📟 Status server não iniciado ({e})")
+        return None
+    return server
+
+
+async def fetch_local_status(config: Dict[str, Any], timeout: float = 2) -> Optional[Dict[str, Any]]:
+    """
+    Lê /status de um bot em execução (mesmo config).
+
+    Returns:
+        Status em JSON, ou None se o servidor estiver desabilitado/inacessível
+    """
+    options = config.get("status_server", {})
+    if not options.get("enabled", False):
+        return None
+    try:
+        if options.get("unix_socket"):
+            connect = asyncio.open_unix_connection(options["unix_socket"])
+        else:
+            connect = asyncio.open_connection(options.get("host", "127.0.0.1"), int(options.get("port", 8787)))
+        reader, writer = await asyncio.wait_for(connect, timeout)
+        writer.write(b"GET /status HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+    except (OSError, asyncio.TimeoutError):
+        return None
+    head, _, body = response.partition(b"\r\n\r\n")
+    if b" 200 " not in head.split(b"\r\n", 1)[0]:
+        return None
+    return json.loads(body)
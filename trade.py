@@ -2,8 +2,13 @@ import asyncio
 from typing import Optional
 from avantis_trader_sdk import TraderClient
 from avantis_trader_sdk.types import TradeInput, TradeInputOrderType
-from src.config.constants import logger
+from src.config.constants import BASE_RPC_URL, logger
+from src.avantis.ledger import ledger_leg
+from src.avantis.preflight import explain_failed_transaction
+from src.avantis.ratelimit import CRITICAL, STATUS, rpc_priority
+from src.avantis.receipts import get_receipt_resolver, sign_and_send
 from utils.data import update_state
+from utils.retry import retry_async, SAFE_SEND_ERRORS
 
 
 async def open_position_direct(
@@ -14,11 +19,18 @@ async def open_position_direct(
     leverage: int,
     trade_index: int = 0,
     tp: float = 0,
-    sl: float = 0
-) -> bool:
+    sl: float = 0,
+    slippage_percentage: float = 1
+) -> Optional[str]:
     """
     Abre posição DIRETAMENTE baseado no exemplo oficial da Avantis SDK.
     SIMPLIFICADO: Sem complicações de nonce.
+    
+    Args:
+        slippage_percentage: Slippage máximo em % (ver SlippageController)
+        
+    Returns:
+        Hash da transação se preenchida, None se falhou
     """
     trader = trader_client.get_signer().get_ethereum_address()
     side = "LONG" if is_long else "SHORT"
@@ -38,30 +50,43 @@ async def open_position_direct(
             timestamp=0
         )
         
-        # Build transaction (EXATAMENTE como no exemplo oficial)
-        open_transaction = await trader_client.trade.build_trade_open_tx(
-            trade_input,
-            TradeInputOrderType.MARKET,
-            slippage_percentage=1
-        )
+        sent = {}
         
-        # Send transaction (EXATAMENTE como no exemplo oficial)
-        receipt = await trader_client.sign_and_get_receipt(open_transaction)
+        async def build_and_send():
+            # Build transaction (EXATAMENTE como no exemplo oficial)
+            # Rebuild a cada tentativa: nonce/preço atualizados após "nonce too low"
+            sent["tx"] = await trader_client.trade.build_trade_open_tx(
+                trade_input,
+                TradeInputOrderType.MARKET,
+                slippage_percentage=slippage_percentage
+            )
+            # Send transaction (EXATAMENTE como no exemplo oficial)
+            return await sign_and_send(trader_client, sent["tx"])
+        
+        # Só o build + broadcast é repetido; com o hash em mãos, nunca reenviar
+        with rpc_priority(CRITICAL):
+            tx_hash = await retry_async(
+                build_and_send, endpoint=BASE_RPC_URL, name=f"open_{side}", retry_on=SAFE_SEND_ERRORS
+            )
+        receipt = await get_receipt_resolver(trader_client).wait(tx_hash)
+        open_transaction = sent["tx"]
         
         if receipt.get('status') == 1:
             tx_hash = receipt['transactionHash'].hex()
-            logger.success(f"[{trader[:10]}] {side} {collateral} USDC @ {leverage}x - TX: {tx_hash[:10]}...")
-            return True
+            logger.success(f"[{trader[:10]}] {side} {collateral} USDC @ {leverage}x (slippage {slippage_percentage}%) - TX: {tx_hash[:10]}...")
+            return tx_hash
         else:
-            logger.error(f"[{trader[:10]}] {side} falhou - TX status != 1")
-            return False
+            with rpc_priority(STATUS):
+                reason = await explain_failed_transaction(trader_client, open_transaction, receipt)
+            logger.error(f"[{trader[:10]}] {side} falhou - TX status != 1 | Motivo: {reason}")
+            return None
             
     except Exception as e:
         import traceback
         logger.error(f"[{trader[:10]}] Erro ao abrir {side}: {e}")
         logger.error(f"Detalhes: pair_index={pair_index}, collateral={collateral}, leverage={leverage}, trade_index={trade_index}")
         logger.debug(f"Stack trace: {traceback.format_exc()}")
-        return False
+        return None
 
 
 # Manter a função antiga para compatibilidade
@@ -77,9 +102,10 @@ async def open_position(
     wait_for_confirmation: bool = True
 ) -> bool:
     """Wrapper para compatibilidade"""
-    return await open_position_direct(
+    tx_hash = await open_position_direct(
         trader_client, pair_index, collateral, is_long, leverage, trade_index, tp, sl
     )
+    return tx_hash is not None
 
 
 async def close_position(
@@ -103,14 +129,21 @@ async def close_position(
     trader = trader_client.get_signer().get_ethereum_address()
     
     try:
-        close_transaction = await trader_client.trade.build_trade_close_tx(
-            pair_index=pair_index,
-            trade_index=trade_index,
-            collateral_to_close=collateral_to_close,
-            trader=trader
-        )
+        async def build_and_send():
+            close_transaction = await trader_client.trade.build_trade_close_tx(
+                pair_index=pair_index,
+                trade_index=trade_index,
+                collateral_to_close=collateral_to_close,
+                trader=trader
+            )
+            return await sign_and_send(trader_client, close_transaction)
         
-        receipt = await trader_client.sign_and_get_receipt(close_transaction)
+        with rpc_priority(CRITICAL):
+            tx_hash = await retry_async(
+                build_and_send, endpoint=BASE_RPC_URL, name=f"close_{trade_index}", retry_on=SAFE_SEND_ERRORS
+            )
+        with ledger_leg(pair_index, trade_index):  # O payout do keeper é atribuído a esta perna
+            receipt = await get_receipt_resolver(trader_client).wait(tx_hash)
         
         if receipt.get('status') == 1:
             logger.success(f"[{trader[:10]}] Posição {trade_index} fechada (tx: {receipt['transactionHash'].hex()[:10]}...)")
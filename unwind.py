@@ -0,0 +1,188 @@
+"""
+Fechamento de emergência pré-construído.
+Assim que as pernas são confirmadas, as transações de fechamento são montadas
+(calldata + gas) e mantidas com as taxas atualizadas. Em anomalia ou no prazo,
+basta ajustar nonce/taxa, assinar e transmitir - o par zera em um bloco.
+
+Uso:
+    unwinder = EmergencyUnwinder(trader_client, config)
+    await unwinder.arm(legs)
+    unwinder.start_refresh()
+    remaining = await unwinder.fire("anomaly")  # pernas que não fecharam
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from avantis_trader_sdk import TraderClient
+from src.config.constants import logger
+from src.avantis.account import get_fleet_trades
+from src.avantis.ledger import ledger_leg
+from src.avantis.ratelimit import CRITICAL, READ, rpc_priority, set_task_priority
+from src.avantis.receipts import get_receipt_resolver, sign_and_send
+
+Leg = Tuple[int, int, bool]  # (pair_index, trade_index, is_long)
+
+GAS_BUFFER = 1.2
+
+
+class EmergencyUnwinder:
+    def __init__(self, trader_client: TraderClient, config: Dict[str, Any]) -> None:
+        options = config.get("emergency_unwind", {})
+        self.enabled = options.get("enabled", True)
+        self.priority_multiplier = float(options.get("priority_fee_multiplier", 3))
+        self.refresh_interval = float(options.get("refresh_interval_seconds", 10))
+        self.trader_client = trader_client
+        self.trader = trader_client.get_signer().get_ethereum_address()
+        self._txs: Dict[Leg, Dict[str, Any]] = {}
+        self._base_fee: Optional[int] = None
+        self._priority_fee: Optional[int] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def armed_legs(self) -> List[Leg]:
+        return list(self._txs)
+
+    async def arm(self, legs: List[Leg], collaterals: Optional[Dict[Leg, float]] = None) -> int:
+        """
+        Monta e estima o gas das transações de fechamento das pernas.
+
+        Args:
+            legs: Pernas [(pair_index, trade_index, is_long)]
+            collaterals: Colateral por perna; se ausente, lido do TradingStorage
+
+        Returns:
+            Quantidade de pernas armadas
+        """
+        if not self.enabled:
+            return 0
+        collaterals = dict(collaterals or {})
+        missing = [leg for leg in legs if leg not in collaterals]
+        if missing:
+            trades = await get_fleet_trades(
+                self.trader_client, [(self.trader, pair, index) for pair, index, _ in missing]
+            )
+            for leg in missing:
+                trade = trades.get((self.trader, leg[0], leg[1]))
+                if trade and "positionSizeUSDC" in trade:
+                    collaterals[leg] = trade["positionSizeUSDC"] / 10**6
+
+        async def build(leg: Leg) -> Tuple[Leg, Optional[Dict[str, Any]]]:
+            pair_index, trade_index, _ = leg
+            try:
+                tx = await self.trader_client.trade.build_trade_close_tx(
+                    pair_index=pair_index,
+                    trade_index=trade_index,
+                    collateral_to_close=collaterals[leg],
+                    trader=self.trader
+                )
+                if "gas" not in tx:
+                    tx["gas"] = int(await self.trader_client.async_web3.eth.estimate_gas(tx) * GAS_BUFFER)
+                return leg, dict(tx)
+            except Exception as e:
+                logger.debug(f"Unwind: falha ao montar fechamento {leg} ({e})")
+                return leg, None
+
+        built = await asyncio.gather(*[build(leg) for leg in legs if leg in collaterals])
+        for leg, tx in built:
+            if tx is not None:
+                self._txs[leg] = tx
+        await self.refresh_fees()
+        logger.debug(f"🧯 Unwind armado para {len(self._txs)}/{len(legs)} perna(s)")
+        return len(self._txs)
+
+    async def refresh_fees(self) -> None:
+        """Atualiza base fee e priority fee usados no disparo."""
+        eth = self.trader_client.async_web3.eth
+        try:
+            block, priority = await asyncio.gather(eth.get_block("latest"), eth.max_priority_fee)
+            self._base_fee = block.get("baseFeePerGas")
+            self._priority_fee = int(priority)
+        except Exception as e:
+            logger.debug(f"Unwind: falha ao atualizar taxas ({e})")
+
+    def start_refresh(self) -> None:
+        """Mantém as taxas atualizadas em background enquanto o par está aberto."""
+        if self._txs and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        set_task_priority(READ)
+        while self._txs:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh_fees()
+
+    def disarm(self) -> None:
+        self._txs.clear()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def _apply_fees(self, tx: Dict[str, Any]) -> None:
+        """
+        Eleva a priority fee para inclusão no próximo bloco.
+        Sem base fee conhecida a tx segue com as taxas montadas pelo SDK.
+        """
+        if self._priority_fee is None or self._base_fee is None:
+            return
+        priority = int(self._priority_fee * self.priority_multiplier)
+        base_fee = self._base_fee
+        if "gasPrice" in tx:
+            tx["gasPrice"] = max(tx["gasPrice"], base_fee + priority)
+        else:
+            tx["maxPriorityFeePerGas"] = priority
+            tx["maxFeePerGas"] = 2 * base_fee + priority
+
+    async def fire(self, reason: str) -> List[Leg]:
+        """
+        Assina e transmite todos os fechamentos armados imediatamente.
+
+        Returns:
+            Pernas que não foram confirmadas como fechadas (usar o caminho normal)
+        """
+        legs = list(self._txs)
+        if not legs:
+            return []
+        start = time.monotonic()
+        logger.warning(f"🧯 Unwind de emergência ({reason}): {len(legs)} perna(s)")
+
+        with rpc_priority(CRITICAL):
+            try:
+                nonce = await self.trader_client.async_web3.eth.get_transaction_count(self.trader, "pending")
+            except Exception as e:
+                logger.error(f"Unwind: falha ao obter nonce ({e})")
+                self.disarm()
+                return legs
+            if self._base_fee is None:
+                await self.refresh_fees()  # Refresh em background ainda não trouxe a base fee
+
+            txs = []
+            for offset, leg in enumerate(legs):
+                tx = dict(self._txs[leg])
+                tx["nonce"] = nonce + offset
+                self._apply_fees(tx)
+                txs.append(tx)
+            self.disarm()
+
+            hashes = await asyncio.gather(
+                *[sign_and_send(self.trader_client, tx) for tx in txs], return_exceptions=True
+            )
+            resolver = get_receipt_resolver(self.trader_client)
+
+            async def confirm(tx_hash, leg):
+                if isinstance(tx_hash, Exception):
+                    raise tx_hash
+                with ledger_leg(leg[0], leg[1]):
+                    return await resolver.wait(tx_hash)
+
+            receipts = await asyncio.gather(*[confirm(h, leg) for h, leg in zip(hashes, legs)], return_exceptions=True)
+
+        remaining = []
+        for leg, receipt in zip(legs, receipts):
+            if isinstance(receipt, Exception) or receipt.get("status") != 1:
+                logger.error(f"Unwind: perna {leg} não fechou ({receipt if isinstance(receipt, Exception) else 'revert'})")
+                remaining.append(leg)
+        logger.info(
+            f"🧯 Unwind: {len(legs) - len(remaining)}/{len(legs)} perna(s) fechadas em {time.monotonic() - start:.1f}s"
+        )
+        return remaining
@@ -4,8 +4,9 @@ Garante que SEMPRE há 1 long + 1 short ou 0 posições
 """
 import asyncio
 import time
+from typing import Dict, List, Optional, Set, Tuple
 from src.config.constants import logger
-from src.avantis.account import get_open_positions
+from src.avantis.account import OpenTradesABIError, get_open_positions, get_fleet_snapshots, get_fleet_trades
 
 
 class PositionWatchdog:
@@ -15,6 +16,7 @@ class PositionWatchdog:
         self.is_running = False
         self.last_check = 0
         self.check_interval = 5  # 5 segundos
+        self.last_snapshot = None  # Snapshot anterior (para diff)
         
     async def start_monitoring(self, duration_seconds):
         """
@@ -22,18 +24,25 @@ class PositionWatchdog:
         Se encontrar anomalia (1 posição, 3+), retorna False.
         """
         self.is_running = True
-        end_time = time.time() + duration_seconds
+        end_time = time.monotonic() + duration_seconds
+        next_tick = time.monotonic()
         anomaly_detected = False
         
         logger.info(f"🛡️ Watchdog iniciado - Monitor a cada {self.check_interval}s por {duration_seconds}s")
         
-        while time.time() < end_time and not anomaly_detected:
+        while time.monotonic() < end_time and not anomaly_detected:
             try:
                 positions = await get_open_positions(self.trader_client)
                 
-                # Contar long e short
-                long_count = sum(1 for p in positions if p["is_long"])
-                short_count = sum(1 for p in positions if not p["is_long"])
+                # Logar apenas mudanças em relação ao tick anterior
+                opened, closed = positions.diff(self.last_snapshot)
+                if self.last_snapshot is not None and (opened or closed):
+                    logger.warning(f"🛡️ Watchdog: posições mudaram (+{len(opened)} / -{len(closed)})")
+                self.last_snapshot = positions
+                
+                # Contar long e short (pré-calculado no snapshot)
+                long_count = positions.long_count
+                short_count = positions.short_count
                 total = len(positions)
                 
                 # Log a cada 30s
@@ -68,7 +77,9 @@ class PositionWatchdog:
             except Exception as e:
                 logger.warning(f"Watchdog erro: {e}")
             
-            await asyncio.sleep(self.check_interval)
+            # Ticks alinhados ao relógio monotônico (sem acumular o tempo da leitura)
+            next_tick += self.check_interval
+            await asyncio.sleep(max(min(next_tick, end_time) - time.monotonic(), 0))
         
         self.is_running = False
         
@@ -87,14 +98,19 @@ async def wait_for_positions_registered(trader_client, expected_count=2, max_wai
     """
     logger.info(f"⏳ Aguardando {expected_count} posições serem registradas...")
     
+    positions = []
     for attempt in range(max_wait // 2):
         await asyncio.sleep(2)
         
-        positions = await get_open_positions(trader_client)
+        try:
+            positions = await get_open_positions(trader_client)
+        except Exception as e:
+            logger.debug(f"   Tentativa {attempt+1}: posições indisponíveis ({e})")
+            continue
         
         if len(positions) == expected_count:
-            long_count = sum(1 for p in positions if p["is_long"])
-            short_count = sum(1 for p in positions if not p["is_long"])
+            long_count = positions.long_count
+            short_count = positions.short_count
             
             logger.success(f"✅ {expected_count} posições registradas ({long_count}L + {short_count}S)")
             return True
@@ -103,3 +119,155 @@ async def wait_for_positions_registered(trader_client, expected_count=2, max_wai
     
     logger.error(f"❌ Timeout: Esperava {expected_count}, encontrou {len(positions)}")
     return False
+
+
+class FleetWatchdog:
+    """
+    Watchdog único para todas as contas do processo.
+    Cada conta registra o estado esperado (pernas abertas ou flat); um só loop
+    lê todas as contas em lote (Multicall3) a cada tick e envia anomalias para a
+    fila da conta dona. Overhead por tick constante, independente do tamanho da frota.
+    """
+
+    def __init__(self, trader_client, check_interval: float = 5) -> None:
+        self.trader_client = trader_client
+        self.check_interval = check_interval
+        self.watch_pairs: Set[int] = set()  # Pares das pernas registradas
+        self._all_pairs: Optional[List[int]] = None  # Todos os pares do protocolo (detecta posições avulsas)
+        self._per_account = False  # ABI de openTrades inesperado: pernas lidas por conta (get_trades)
+        self._expected: Dict[str, List[Tuple[int, int, bool]]] = {}  # endereço -> [(par, índice, is_long)]
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.last_log = 0
+
+    def register(self, address: str, legs: List[Tuple[int, int, bool]]) -> asyncio.Queue:
+        """
+        Define o estado esperado da conta e retorna a fila de anomalias dela.
+
+        Args:
+            legs: Pernas que devem estar abertas [(pair_index, trade_index, is_long)]; [] = flat
+        """
+        self._expected[address] = list(legs)
+        self.watch_pairs.update(pair_index for pair_index, _, _ in legs)
+        queue = self._queues.setdefault(address, asyncio.Queue())
+        while not queue.empty():
+            queue.get_nowait()  # Anomalias do ciclo anterior não valem mais
+        self._ensure_running()
+        return queue
+
+    def unregister(self, address: str) -> None:
+        self._expected.pop(address, None)
+
+    async def watch(self, address: str, legs: List[Tuple[int, int, bool]], duration_seconds: Optional[float] = None) -> bool:
+        """
+        Registra a conta e aguarda até duration_seconds.
+
+        Args:
+            duration_seconds: None = até anomalia ou cancelamento (prazo controlado por HoldDeadline)
+
+        Returns:
+            True se o período terminou sem anomalias, False se houve anomalia
+        """
+        queue = self.register(address, legs)
+        period = f"por {duration_seconds:.0f}s" if duration_seconds is not None else "até o prazo do ciclo"
+        logger.info(f"🛡️ Fleet watchdog: {address[:10]} registrada ({len(legs)} pernas) {period}")
+        try:
+            anomaly = await asyncio.wait_for(queue.get(), timeout=duration_seconds)
+        except asyncio.TimeoutError:
+            logger.success("🛡️ Watchdog: OK - Ciclo completo sem anomalias")
+            return True
+        finally:
+            self.unregister(address)
+        logger.error(f"🛡️ Watchdog: ANOMALIA - {anomaly}")
+        return False
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        next_tick = time.monotonic()
+        while self._expected:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.warning(f"Fleet watchdog erro: {e}")
+            next_tick = max(next_tick + self.check_interval, time.monotonic())
+            await asyncio.sleep(next_tick - time.monotonic())
+
+    async def _counted_pairs(self) -> List[int]:
+        """Pares contados por conta: todos os do protocolo, para o total da conta incluir posições avulsas."""
+        if self._all_pairs is None:
+            try:
+                self._all_pairs = list(range(await self.trader_client.pairs_cache.get_pairs_count()))
+            except Exception as e:
+                logger.warning(f"Fleet watchdog: contagem de pares indisponível ({e}) - contando só os pares registrados")
+                return sorted(self.watch_pairs)
+        return sorted(set(self._all_pairs) | self.watch_pairs)
+
+    async def _tick(self) -> None:
+        expected = dict(self._expected)
+        addresses = list(expected)
+        legs = [(address, pair, index) for address in addresses for pair, index, _ in expected[address]]
+
+        snapshots, trades = await asyncio.gather(
+            get_fleet_snapshots(self.trader_client, addresses, await self._counted_pairs()),
+            self._read_trades(legs)
+        )
+
+        anomalies = 0
+        for address in addresses:
+            problem = self._check(address, expected[address], snapshots.get(address), trades)
+            if problem and address in self._queues:
+                anomalies += 1
+                self._queues[address].put_nowait(problem)
+
+        if time.time() - self.last_log > 30:
+            logger.info(f"🛡️ Fleet watchdog: {len(addresses)} conta(s) | {anomalies} anomalia(s)")
+            self.last_log = time.time()
+
+    async def _read_trades(self, legs: List[Tuple[str, int, int]]) -> Dict[Tuple[str, int, int], Optional[Dict]]:
+        """Pernas em lote (Multicall3); com ABI inesperado, uma leitura de posições por conta."""
+        if not self._per_account:
+            try:
+                return await get_fleet_trades(self.trader_client, legs)
+            except OpenTradesABIError as e:
+                logger.error(f"Fleet watchdog: {e} - checando as pernas por conta (get_trades)")
+                self._per_account = True
+        addresses = sorted({address for address, _, _ in legs})
+        snapshots = await asyncio.gather(*[get_open_positions(self.trader_client, address) for address in addresses])
+        open_legs = {
+            (address, pos.pair_index, pos.trade_index): {"buy": pos.is_long, "leverage": pos.leverage}
+            for address, snapshot in zip(addresses, snapshots) for pos in snapshot
+        }
+        return {leg: open_legs.get(leg) for leg in legs}
+
+    @staticmethod
+    def _check(address, legs, snapshot, trades) -> Optional[str]:
+        """Compara o estado lido com o esperado. Retorna a descrição da anomalia ou None."""
+        if snapshot is None:
+            return None
+        if snapshot.total_open != len(legs):
+            expected_pairs = {pair_index for pair_index, _, _ in legs}
+            stray = sorted(p for p, count in snapshot.open_trades.items() if count and p not in expected_pairs)
+            detail = f" (pares inesperados: {stray})" if stray else ""
+            return f"esperado {len(legs)} posições, encontrado {snapshot.total_open}{detail}"
+        for pair_index, trade_index, is_long in legs:
+            trade = trades.get((address, pair_index, trade_index))
+            side = "LONG" if is_long else "SHORT"
+            if trade is None:
+                return f"{side} (par {pair_index}, índice {trade_index}) não está mais aberto"
+            if "buy" in trade and bool(trade["buy"]) != is_long:
+                return f"RATIO INCORRETO - índice {trade_index} não é {side}"
+        return None
+
+
+_fleet_watchdog: Optional[FleetWatchdog] = None
+
+
+def get_fleet_watchdog(trader_client) -> FleetWatchdog:
+    """Watchdog compartilhado do processo (criado na primeira chamada)."""
+    global _fleet_watchdog
+    if _fleet_watchdog is None:
+        _fleet_watchdog = FleetWatchdog(trader_client)
+    return _fleet_watchdog